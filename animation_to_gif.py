@@ -1,10 +1,28 @@
 import bpy
 import os
-import subprocess
+import sys
+import argparse
 import shutil
 import json
 from mathutils import Vector
 
+# Plain-Python helpers live next to this script and in from_gcode/
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(_HERE)
+sys.path.append(os.path.join(_HERE, "from_gcode"))
+import numpy as np
+from render_cache import FrameCache, frame_key
+import gif_encoder
+import roi_render
+import follow_camera
+from toolpath import file_sha256, read_toolpath
+from kinematics import Kinematics
+from keyframes import key_property
+from decimate import decimate_channel
+import scene_meta
+import spans
+from spans import Span
+
 # ---------------------------------------------------------
 # CONFIG
 # ---------------------------------------------------------
@@ -13,7 +31,7 @@ OUTPUT_DIR = os.path.join(bpy.path.abspath("//"), "render_gif")
 # Final GIF path (relative to .blend folder)
 GIF_PATH = os.path.join(bpy.path.abspath("//"), "docs", "jubilee_test.gif")
 
-# Optional JSON config written by sacred_runner.py (same folder as .blend)
+# Optional JSON config (same folder as .blend); --config points elsewhere
 CONFIG_PATH = os.path.join(bpy.path.abspath("//"), "animation_config.json")
 
 # Name of object to frame/zoom on (adjust if you prefer another)
@@ -31,11 +49,50 @@ RENDER_RES_X = 800   # pixels
 RENDER_RES_Y = 800   # pixels
 RENDER_RES_PERCENT = 100  # 1–100
 
+# "keyframes" renders whatever animation is in the .blend; "handler" drives
+# the axes straight from a toolpath file (from_gcode/playback.py)
+PLAYBACK_MODE = "keyframes"
+TOOLPATH_PATH = os.path.join(bpy.path.abspath("//"), "from_gcode", "pathout.tpath")
+
+# Frame cache: skip rendering frames whose pixels have been rendered before
+RENDER_CACHE = False
+RENDER_CACHE_DIR = os.path.join(bpy.path.abspath("//"), "render_cache")
+RENDER_CACHE_MAX_MB = 2048
+# Objects whose world pose decides what a frame looks like
+AXIS_OBJECT_NAMES = ("Y-axis", "X-axis", "XY-carriage", "Z-axis")
+
+# Render runs of frames where nothing moves once and hard-link the copies
+DEDUPE_POSES = True
+
+# False streams each rendered frame straight into the GIF encoder instead of
+# keeping a PNG sequence (only the first frame is kept, as a preview)
+KEEP_PNGS = True
+
+# Render the static scene once as a plate and per frame only the region the
+# moving axes cover (RoiRenderer)
+ROI_RENDER = False
+
+# Camera that tracks the target over the whole toolpath: None, "dolly"
+# (moves with it) or "pan" (stays put and turns); see follow_camera.py
+CAMERA_FOLLOW = None
+CAMERA_DEAD_ZONE_MM = 10.0
+CAMERA_SMOOTHING_S = 0.5
+# Set the lens to the tightest framing that keeps the target in view
+CAMERA_FOLLOW_FIT = False
+# Keys are dropped while the camera stays this close to the line between
+# the kept ones (metres for location, radians for rotation)
+CAMERA_KEY_TOLERANCE = 1e-4
+# (n_samples, 6) camera location and rotation per toolpath sample once baked
+_camera_path = None
+
 
 def load_config_from_json():
     """If animation_config.json exists, override defaults from it."""
     global TEST_MODE, TEST_MAX_FRAMES, FPS, SCALE_WIDTH
     global RENDER_RES_X, RENDER_RES_Y, RENDER_RES_PERCENT, TARGET_OBJECT_NAME
+    global PLAYBACK_MODE, TOOLPATH_PATH
+    global RENDER_CACHE, RENDER_CACHE_DIR, RENDER_CACHE_MAX_MB, DEDUPE_POSES, KEEP_PNGS, ROI_RENDER
+    global CAMERA_FOLLOW, CAMERA_DEAD_ZONE_MM, CAMERA_SMOOTHING_S, CAMERA_FOLLOW_FIT
 
     if not os.path.exists(CONFIG_PATH):
         print(f"[config] No JSON config at {CONFIG_PATH}, using defaults.")
@@ -58,6 +115,37 @@ def load_config_from_json():
     RENDER_RES_Y = int(cfg.get("render_res_y", RENDER_RES_Y))
     RENDER_RES_PERCENT = int(cfg.get("render_res_percent", RENDER_RES_PERCENT))
     TARGET_OBJECT_NAME = str(cfg.get("target_object_name", TARGET_OBJECT_NAME))
+    PLAYBACK_MODE = str(cfg.get("playback_mode", PLAYBACK_MODE))
+    TOOLPATH_PATH = bpy.path.abspath(str(cfg.get("toolpath", TOOLPATH_PATH)))
+    RENDER_CACHE = bool(cfg.get("render_cache", RENDER_CACHE))
+    RENDER_CACHE_DIR = bpy.path.abspath(str(cfg.get("render_cache_dir", RENDER_CACHE_DIR)))
+    RENDER_CACHE_MAX_MB = float(cfg.get("render_cache_max_mb", RENDER_CACHE_MAX_MB))
+    DEDUPE_POSES = bool(cfg.get("dedupe_poses", DEDUPE_POSES))
+    KEEP_PNGS = bool(cfg.get("keep_pngs", KEEP_PNGS))
+    ROI_RENDER = bool(cfg.get("roi_render", ROI_RENDER))
+    CAMERA_FOLLOW = cfg.get("camera_follow", CAMERA_FOLLOW) or None
+    CAMERA_DEAD_ZONE_MM = float(cfg.get("camera_follow_dead_zone_mm", CAMERA_DEAD_ZONE_MM))
+    CAMERA_SMOOTHING_S = float(cfg.get("camera_follow_smoothing_s", CAMERA_SMOOTHING_S))
+    CAMERA_FOLLOW_FIT = bool(cfg.get("camera_follow_fit", CAMERA_FOLLOW_FIT))
+
+
+def parse_args():
+    """Options after '--' on the Blender command line (used by render_parallel.py workers)."""
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="animation_to_gif.py")
+    parser.add_argument("--frame-start", type=int, help="first frame to render")
+    parser.add_argument("--frame-end", type=int, help="last frame to render")
+    parser.add_argument("--frame-step", type=int, help="render every Nth frame")
+    parser.add_argument("--output-dir", help="folder for the PNG frames")
+    parser.add_argument("--config", help="JSON config to read instead of animation_config.json")
+    parser.add_argument("--gif", help="where to write the GIF")
+    parser.add_argument("--spans", help="JSON-lines file for the timing spans")
+    parser.add_argument("--no-gif", action="store_true", help="render PNGs only, skip ffmpeg")
+    parser.add_argument("--stream", dest="keep_pngs", action="store_false", default=None,
+                        help="pipe frames into the GIF encoder instead of keeping PNGs")
+    parser.add_argument("--keep-pngs", dest="keep_pngs", action="store_true",
+                        help="keep the PNG sequence and encode it afterwards")
+    return parser.parse_args(argv)
 
 
 def setup_camera(scene, target_object_name, camera_offset=None, camera_lens=None):
@@ -101,6 +189,71 @@ def setup_camera(scene, target_object_name, camera_offset=None, camera_lens=None
     print(f"[camera] Framed '{target_object_name}' from {cam_obj.location}.")
 
 
+def target_radius(obj):
+    """Radius around obj's origin that holds its meshes and its children's."""
+    origin = np.array(obj.matrix_world.translation)
+    radius = 0.0
+    for o in [obj, *obj.children_recursive]:
+        if o.type != 'MESH':
+            continue
+        corners = np.array([tuple(o.matrix_world @ Vector(c)) for c in o.bound_box])
+        radius = max(radius, float(np.linalg.norm(corners - origin, axis=1).max()))
+    return radius
+
+
+def bake_follow_camera(scene, target_object_name, camera_offset=None):
+    """Key the camera to track the target over the whole toolpath.
+
+    Target positions come from the kinematics model and the toolpath, not
+    from evaluating the scene frame by frame, and every camera channel is
+    decimated and written as one bulk F-curve. Returns True if keyed.
+    """
+    global _camera_path
+    model = Kinematics.from_objects(bpy.data.objects)
+    if target_object_name not in model.links:
+        print(f"[camera] '{target_object_name}' is not an axis empty; camera_follow needs one of "
+              f"{', '.join(model.links)}. Keeping a fixed camera.")
+        return False
+    if not os.path.exists(TOOLPATH_PATH):
+        print(f"[camera] No toolpath at {TOOLPATH_PATH}; keeping a fixed camera.")
+        return False
+
+    toolpath = read_toolpath(TOOLPATH_PATH)
+    target = model.world_positions(toolpath.xyz, names=(target_object_name,))[target_object_name]
+    location, rotation = follow_camera.follow_path(
+        target, camera_offset if camera_offset is not None else (0.7, -1.2, 1.1), CAMERA_FOLLOW,
+        fps=toolpath.fps or FPS, dead_zone_m=CAMERA_DEAD_ZONE_MM / 1000.0, smoothing_s=CAMERA_SMOOTHING_S)
+
+    _camera_path = np.hstack((location, rotation))
+    cam_obj = scene.camera
+    cam_obj.animation_data_clear()
+    cam_obj.rotation_mode = 'XYZ'
+    # sample i is frame i + 1, as keyed by animate_path.py and playback.py
+    frames = np.arange(1, len(target) + 1, dtype=np.float64)
+    keys = 0
+    for data_path, values in (("location", location), ("rotation_euler", rotation)):
+        for index in range(3):
+            kf, v, interp = decimate_channel(frames, values[:, index], CAMERA_KEY_TOLERANCE)
+            key_property(cam_obj, bpy.data.actions, data_path, index, kf, v, interp)
+            keys += len(kf)
+    print(f"[camera] '{CAMERA_FOLLOW}' follow of '{target_object_name}': {keys} keys for {len(frames)} frames.")
+
+    if CAMERA_FOLLOW_FIT and isinstance(cam_obj.data, bpy.types.Camera):
+        render = scene.render
+        lens = follow_camera.fit_lens(target, location, rotation,
+                                      target_radius(bpy.data.objects[target_object_name]),
+                                      cam_obj.data.sensor_width,
+                                      render.resolution_x * render.pixel_aspect_x,
+                                      render.resolution_y * render.pixel_aspect_y)
+        if lens is None:
+            print("[camera] The target passes behind the camera; lens left as is.")
+        else:
+            cam_obj.data.sensor_fit = 'AUTO'
+            cam_obj.data.lens = lens
+            print(f"[camera] Lens fitted to {lens:.1f} mm.")
+    return True
+
+
 def setup_brightness(scene):
     """Make the render brighter and cleaner for GIF output."""
     # Use Eevee for fast, bright renders
@@ -123,11 +276,352 @@ def setup_brightness(scene):
     print("[brightness] Using Eevee with boosted exposure and brighter world.")
 
 
+def frame_state(scene, blend_hash):
+    """Everything that decides the current frame's pixels, as plain JSON data."""
+    def matrix(obj):
+        return [round(v, 6) for row in obj.matrix_world for v in row]
+
+    poses = {}
+    for name in AXIS_OBJECT_NAMES:
+        obj = bpy.data.objects.get(name)
+        if obj is not None:
+            poses[name] = matrix(obj)
+
+    cam = scene.camera
+    camera = None
+    if cam is not None:
+        camera = {"matrix": matrix(cam)}
+        if isinstance(cam.data, bpy.types.Camera):
+            camera.update(lens=round(cam.data.lens, 6), type=cam.data.type,
+                          sensor=round(cam.data.sensor_width, 6))
+
+    world_strength = None
+    world = scene.world
+    if world and world.use_nodes and world.node_tree:
+        for node in world.node_tree.nodes:
+            if node.type == 'BACKGROUND':
+                world_strength = round(node.inputs[1].default_value, 6)
+                break
+
+    render = scene.render
+    view = scene.view_settings
+    return {
+        "blend": blend_hash,
+        "poses": poses,
+        "camera": camera,
+        "resolution": [render.resolution_x, render.resolution_y, render.resolution_percentage],
+        "engine": render.engine,
+        "exposure": {"view_transform": view.view_transform, "look": view.look,
+                     "exposure": round(view.exposure, 6), "gamma": round(view.gamma, 6),
+                     "world_strength": world_strength},
+        "format": render.image_settings.file_format,
+    }
+
+
+def pose_table(scene, frames):
+    """Evaluate every moving transform for all frames up front.
+
+    Returns an (n_frames, k) array. Toolpath playback is sampled straight
+    from the memory-mapped path (plus the baked follow camera, if any);
+    otherwise each frame is evaluated once and the world matrices of the
+    axis objects, the camera and any other animated object are read back.
+    """
+    import playback
+    if playback.active():
+        poses = playback.sample_poses(frames)
+        if _camera_path is not None:
+            i = np.clip(np.asarray(frames, dtype=np.int64) - 1, 0, len(_camera_path) - 1)
+            poses = np.hstack((poses, _camera_path[i]))
+        return poses
+    objs = {bpy.data.objects.get(n) for n in AXIS_OBJECT_NAMES}
+    objs.update(o for o in bpy.data.objects if o.animation_data is not None)
+    objs.add(scene.camera)
+    objs = [o for o in objs if o is not None]
+    table = np.empty((len(frames), 16 * len(objs)))
+    for i, frame in enumerate(frames):
+        scene.frame_set(frame)
+        table[i] = [v for o in objs for row in o.matrix_world for v in row]
+    return table
+
+
+def group_identical_frames(table, frames):
+    """Split frames into runs of consecutive frames with identical poses.
+
+    Returns a list of frame lists; the first frame of each run is rendered.
+    """
+    table = np.round(np.asarray(table), 6)
+    starts = np.ones(len(frames), dtype=bool)
+    starts[1:] = np.any(table[1:] != table[:-1], axis=1)
+    bounds = list(np.flatnonzero(starts)) + [len(frames)]
+    return [list(frames[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def link_frame(src, dst):
+    """Hard-link (or copy) a rendered frame to another frame's filename."""
+    if os.path.exists(dst):
+        os.unlink(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def read_pixels(path):
+    """(h, w, 4) float32 pixels of an image file, bottom row first."""
+    img = bpy.data.images.load(path, check_existing=False)
+    try:
+        w, h = img.size
+        buf = np.empty(w * h * 4, dtype=np.float32)
+        img.pixels.foreach_get(buf)
+    finally:
+        bpy.data.images.remove(img)
+    return buf.reshape(h, w, 4)
+
+
+def write_pixels(pixels, path):
+    h, w = pixels.shape[:2]
+    img = bpy.data.images.new("jubilee_roi_frame", w, h, alpha=True)
+    try:
+        img.pixels.foreach_set(np.ascontiguousarray(pixels, dtype=np.float32).ravel())
+        img.filepath_raw = path
+        img.file_format = 'PNG'
+        img.save()
+    finally:
+        bpy.data.images.remove(img)
+
+
+class RoiRenderer:
+    """Frames as a static background plate plus the moving parts' region.
+
+    The plate is the scene with the axes and everything parented to them
+    hidden, rendered once. Per frame, the static objects become holdouts (so
+    they still hide moving parts behind them), the render border is set to
+    the screen rectangle of the moving meshes' bounding boxes and the RGBA
+    crop is composited over the plate. Moving parts cast no shadows onto
+    static geometry in this mode.
+    """
+
+    def __init__(self, scene, work_dir):
+        self.scene = scene
+        self.work_dir = work_dir
+        render = scene.render
+        self.width = render.resolution_x * render.resolution_percentage // 100
+        self.height = render.resolution_y * render.resolution_percentage // 100
+        moving = set()
+        for name in AXIS_OBJECT_NAMES:
+            root = bpy.data.objects.get(name)
+            if root is not None:
+                moving.add(root)
+                moving.update(root.children_recursive)
+        self.moving = list(moving)
+        self.static = [o for o in scene.objects if o not in moving and o.type not in {'CAMERA', 'LIGHT'}]
+        self.geometry = [o for o in self.moving if o.type == 'MESH']
+        self.corners = np.array([roi_render.box_corners(o.bound_box) for o in self.geometry]).reshape(-1, 8, 4)
+        self.plate = None
+        self.saved = None
+        self.areas = []
+
+    def _save_state(self):
+        render = self.scene.render
+        self.saved = {
+            "render": {k: getattr(render, k) for k in (
+                "use_border", "use_crop_to_border", "film_transparent", "filepath",
+                "border_min_x", "border_max_x", "border_min_y", "border_max_y")},
+            "color_mode": render.image_settings.color_mode,
+            "hide_render": {o.name: o.hide_render for o in self.moving},
+            "is_holdout": {o.name: o.is_holdout for o in self.static},
+        }
+
+    def start(self, cache=None, blend_hash=None):
+        """Render (or fetch) the plate and switch the scene to region renders."""
+        os.makedirs(self.work_dir, exist_ok=True)
+        self._save_state()
+        render = self.scene.render
+        plate_path = os.path.join(self.work_dir, "plate.png")
+        key = None
+        if cache is not None:
+            key = frame_key(dict(frame_state(self.scene, blend_hash), poses=None, layer="roi_plate"))
+        if key is None or not cache.fetch(key, plate_path):
+            with Span("gif/roi_plate"):
+                for o in self.moving:
+                    o.hide_render = True
+                render.filepath = plate_path
+                bpy.ops.render.render(write_still=True)
+                for o in self.moving:
+                    o.hide_render = self.saved["hide_render"][o.name]
+            if key is not None:
+                cache.store(key, plate_path)
+        self.plate = read_pixels(plate_path)
+
+        for o in self.static:
+            o.is_holdout = True
+        render.film_transparent = True
+        render.image_settings.color_mode = 'RGBA'
+        render.use_border = True
+        render.use_crop_to_border = True
+
+    def region(self):
+        """Pixel rectangle of the moving meshes in the current frame, or None."""
+        cam = self.scene.camera
+        render = self.scene.render
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        proj = cam.calc_matrix_camera(depsgraph, x=self.width, y=self.height,
+                                      scale_x=render.pixel_aspect_x, scale_y=render.pixel_aspect_y)
+        view_proj = np.array(proj @ cam.matrix_world.inverted())
+        matrices = np.array([np.array(o.matrix_world) for o in self.geometry]).reshape(-1, 4, 4)
+        return roi_render.project_region(view_proj, matrices, self.corners, self.width, self.height)
+
+    def render(self, path):
+        """Render the current frame to path (full size, composited)."""
+        region = self.region()
+        self.areas.append(roi_render.area_fraction(region, self.width, self.height))
+        if region is None:
+            write_pixels(self.plate, path)
+            return
+        x0, y0, x1, y1 = region
+        render = self.scene.render
+        render.border_min_x, render.border_max_x = x0 / self.width, x1 / self.width
+        render.border_min_y, render.border_max_y = y0 / self.height, y1 / self.height
+        crop_path = os.path.join(self.work_dir, "region.png")
+        render.filepath = crop_path
+        bpy.ops.render.render(write_still=True)
+        write_pixels(roi_render.composite(self.plate, read_pixels(crop_path), x0, y0), path)
+
+    def finish(self):
+        """Put the scene's render settings and objects back as they were."""
+        if self.saved is None:
+            return
+        render = self.scene.render
+        for k, v in self.saved["render"].items():
+            setattr(render, k, v)
+        render.image_settings.color_mode = self.saved["color_mode"]
+        for o in self.moving:
+            o.hide_render = self.saved["hide_render"][o.name]
+        for o in self.static:
+            o.is_holdout = self.saved["is_holdout"][o.name]
+        self.saved = None
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def stats(self):
+        areas = np.asarray(self.areas)
+        return {"frames": len(areas),
+                "mean_area": float(areas.mean()) if len(areas) else 0.0,
+                "max_area": float(areas.max()) if len(areas) else 0.0}
+
+
+def render_frames(scene, output_dir, cache=None, dedupe=True, encoder=None, roi=None):
+    """Render start..end frame by frame.
+
+    With dedupe, runs of identical poses are rendered once and linked; with
+    a cache, frames rendered by earlier runs are reused. With an encoder
+    (gif_encoder.GifStreamEncoder), each frame's PNG bytes are sent to it and
+    only the first frame is left on disk. With roi (a RoiRenderer), frames
+    are rendered as plate plus moving region. Writes render_stats.json next
+    to the frames.
+    """
+    frames = list(range(scene.frame_start, scene.frame_end + 1, scene.frame_step))
+    if dedupe:
+        groups = group_identical_frames(pose_table(scene, frames), frames)
+    else:
+        groups = [[f] for f in frames]
+    blend_hash = None
+    if cache is not None and bpy.data.filepath:
+        blend_hash = file_sha256(bpy.data.filepath)
+
+    if roi is not None:
+        roi.start(cache, blend_hash)
+    try:
+        for n, group in enumerate(groups):
+            frame = group[0]
+            scene.frame_set(frame)
+            path = os.path.join(output_dir, f"frame_{frame:04d}.png")
+            key = None
+            if cache is not None:
+                state = frame_state(scene, blend_hash)
+                if roi is not None:
+                    # no moving-part shadows on the plate: not the same pixels
+                    state["roi"] = True
+                key = frame_key(state)
+            if key is None or not cache.fetch(key, path):
+                if roi is not None:
+                    roi.render(path)
+                else:
+                    scene.render.filepath = path
+                    bpy.ops.render.render(write_still=True)
+                if key is not None:
+                    cache.store(key, path)
+            if encoder is not None:
+                with open(path, "rb") as f:
+                    encoder.write_frame(f.read(), repeat=len(group))
+                if n > 0:
+                    os.unlink(path)
+                continue
+            for dup in group[1:]:
+                link_frame(path, os.path.join(output_dir, f"frame_{dup:04d}.png"))
+    finally:
+        if roi is not None:
+            roi.finish()
+
+    stats = {"frames": len(frames), "unique_poses": len(groups), "duplicated": len(frames) - len(groups)}
+    print(f"[render] {len(frames)} frames, {len(groups)} unique poses rendered or cached.")
+    if cache is not None:
+        stats["cache"] = cache.stats()
+        print(f"[cache] {cache.hits} hits, {cache.misses} misses, {cache.evictions} evictions.")
+    if roi is not None:
+        stats["roi"] = roi.stats()
+        print(f"[roi] Moving parts covered {stats['roi']['mean_area']:.0%} of the frame on average.")
+    with open(os.path.join(output_dir, "render_stats.json"), "w", encoding="utf-8") as f:
+        json.dump(stats, f, indent=2)
+
+
+def time_frames():
+    """Log a gif/frame span for every frame Blender renders; returns a
+    function that removes the handlers again."""
+    running = {}
+
+    def pre(scene, *_):
+        running["span"] = Span("gif/frame", frame=scene.frame_current)
+
+    def post(scene, *_):
+        span = running.pop("span", None)
+        if span is not None:
+            span.stop()
+
+    bpy.app.handlers.render_pre.append(pre)
+    bpy.app.handlers.render_post.append(post)
+
+    def remove():
+        bpy.app.handlers.render_pre.remove(pre)
+        bpy.app.handlers.render_post.remove(post)
+    return remove
+
+
 def main():
+    """Render and encode; returns the artifact paths (frames_dir, gif)."""
+    args = parse_args()
+    if args.spans:
+        spans.set_path(args.spans)
+    with Span("gif/main"):
+        return render_gif(args)
+
+
+def render_gif(args):
+    global CONFIG_PATH, GIF_PATH
+    setup_span = Span("gif/setup")
+    if args.config:
+        CONFIG_PATH = os.path.abspath(args.config)
+    if args.gif:
+        GIF_PATH = os.path.abspath(args.gif)
     # Load overrides from JSON if available
     load_config_from_json()
 
     scene = bpy.context.scene
+    # Keep the sidecar for Blender-free tools in step with this .blend
+    scene_meta.refresh(bpy.data, scene, bpy.data.filepath)
+
+    if PLAYBACK_MODE == "handler":
+        import playback
+        playback.install(scene, TOOLPATH_PATH)
 
     # Set render resolution explicitly
     scene.render.resolution_x = RENDER_RES_X
@@ -137,8 +631,7 @@ def main():
     # Improve visibility/brightness and framing before rendering
     setup_brightness(scene)
     # Load camera config from JSON if available
-    import os, json
-    config_path = os.path.join(os.path.dirname(__file__), "animation_config.json")
+    config_path = CONFIG_PATH
     camera_offset = None
     camera_lens = None
     if os.path.exists(config_path):
@@ -150,6 +643,10 @@ def main():
         except Exception as e:
             print(f"[camera] Could not read camera config: {e}")
     setup_camera(scene, TARGET_OBJECT_NAME, camera_offset, camera_lens)
+    following = False
+    if CAMERA_FOLLOW and scene.camera is not None:
+        with Span("gif/camera_follow", mode=CAMERA_FOLLOW):
+            following = bake_follow_camera(scene, TARGET_OBJECT_NAME, camera_offset)
 
     # Use current timeline range; optionally clamp for quick tests
     orig_start = scene.frame_start
@@ -159,14 +656,24 @@ def main():
         scene.frame_end = min(orig_end, orig_start + TEST_MAX_FRAMES - 1)
         print(f"[frames] TEST_MODE on: rendering {scene.frame_start}–{scene.frame_end} (was {orig_start}–{orig_end})")
 
+    # An explicit sub-range (parallel worker) wins over the timeline
+    if args.frame_start is not None:
+        scene.frame_start = args.frame_start
+    if args.frame_end is not None:
+        scene.frame_end = args.frame_end
+    if args.frame_step is not None:
+        scene.frame_step = args.frame_step
+    output_dir = args.output_dir or OUTPUT_DIR
+
     start = scene.frame_start
     end = scene.frame_end
 
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(GIF_PATH), exist_ok=True)
 
     # Clear any existing content in the render folder so we don't mix old/new frames
-    for name in os.listdir(OUTPUT_DIR):
-        path = os.path.join(OUTPUT_DIR, name)
+    for name in os.listdir(output_dir):
+        path = os.path.join(output_dir, name)
         try:
             if os.path.isfile(path) or os.path.islink(path):
                 os.unlink(path)
@@ -174,34 +681,75 @@ def main():
                 shutil.rmtree(path)
         except Exception as e:
                 print(f"[warn] Could not remove '{path}': {e}")
-        os.makedirs(os.path.dirname(GIF_PATH), exist_ok=True)
 
     # Configure render settings for PNG sequence
     scene.render.image_settings.file_format = 'PNG'
     # Blender will append frame numbers: frame_0001.png, frame_0002.png, ...
-    scene.render.filepath = os.path.join(OUTPUT_DIR, "frame_")
+    scene.render.filepath = os.path.join(output_dir, "frame_")
+
+    keep_pngs = KEEP_PNGS if args.keep_pngs is None else args.keep_pngs
+    stream = not keep_pngs and not args.no_gif
+    if stream and shutil.which("ffmpeg") is None:
+        print("WARNING: ffmpeg not found on PATH; keeping PNG frames instead of streaming.")
+        stream = False
+
+    cache = None
+    if RENDER_CACHE:
+        cache = FrameCache(RENDER_CACHE_DIR, max_bytes=RENDER_CACHE_MAX_MB * 1024 * 1024)
+    roi = None
+    if ROI_RENDER and following:
+        print("[roi] The background plate needs a fixed camera; rendering full frames.")
+    elif ROI_RENDER:
+        roi = RoiRenderer(scene, os.path.join(output_dir, "_roi"))
+
+    setup_span.stop()
+
+    print(f"Rendering frames {start}–{end} (step {scene.frame_step}) to {output_dir} ...")
+    untime_frames = time_frames()
+    if stream:
+        # Uncached PNGs only live until ffmpeg has read them, so skip compressing
+        # them; cached ones are kept and stay compressed
+        if cache is None:
+            scene.render.image_settings.compression = 0
+        encoder = gif_encoder.GifStreamEncoder(GIF_PATH, FPS, SCALE_WIDTH,
+                                               os.path.join(output_dir, "_gif"))
+        try:
+            with Span("gif/render", stream=True):
+                render_frames(scene, output_dir, cache=cache, dedupe=DEDUPE_POSES, encoder=encoder, roi=roi)
+        except BaseException:
+            encoder.abort()
+            raise
+        finally:
+            untime_frames()
+        with Span("gif/encode"):
+            encoder.close()
+        print("GIF written to:", GIF_PATH)
+        return {"frames_dir": output_dir, "gif": GIF_PATH}
 
-    print(f"Rendering frames {start}–{end} to {OUTPUT_DIR} ...")
-    bpy.ops.render.render(animation=True)
+    try:
+        with Span("gif/render", stream=False):
+            if RENDER_CACHE or DEDUPE_POSES or ROI_RENDER:
+                render_frames(scene, output_dir, cache=cache, dedupe=DEDUPE_POSES, roi=roi)
+            else:
+                bpy.ops.render.render(animation=True)
+    finally:
+        untime_frames()
+
+    if args.no_gif:
+        print("PNG frames are ready in:", output_dir)
+        return {"frames_dir": output_dir, "gif": None}
 
     if shutil.which("ffmpeg") is None:
         print("WARNING: ffmpeg not found on PATH.")
-        print("PNG frames are ready in:", OUTPUT_DIR)
-        return
+        print("PNG frames are ready in:", output_dir)
+        return {"frames_dir": output_dir, "gif": None}
 
-    input_pattern = os.path.join(OUTPUT_DIR, "frame_%04d.png")
-    cmd = [
-        "ffmpeg", "-y",
-        "-framerate", str(FPS),
-        "-i", input_pattern,
-        "-vf", f"fps={FPS},scale={SCALE_WIDTH}:-1:flags=lanczos",
-        GIF_PATH,
-    ]
-
-    print("Running:", " ".join(cmd))
-    subprocess.run(cmd, check=True)
+    input_pattern = os.path.join(output_dir, "frame_%04d.png")
+    with Span("gif/encode"):
+        gif_encoder.encode_png_sequence(input_pattern, GIF_PATH, FPS, SCALE_WIDTH,
+                                        os.path.join(output_dir, "_gif"), start_number=start)
     print("GIF written to:", GIF_PATH)
-
+    return {"frames_dir": output_dir, "gif": GIF_PATH}
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Keyframe writer benchmark: per-point keyframe_insert() vs bulk foreach_set().
+
+Without Blender it runs against benchmarks/fake_bpy.py and reports timings
+plus the number of bpy calls each path makes:
+
+    python benchmarks/bench_keyframes.py [n_points ...]
+
+Inside Blender it uses real empties:
+
+    blender -b -P benchmarks/bench_keyframes.py -- [n_points ...]
+"""
+import os
+import sys
+import time
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(os.path.dirname(HERE), "from_gcode"))
+sys.path.append(HERE)
+from keyframes import key_location
+
+try:
+    import bpy
+    FAKE = False
+except ImportError:
+    import fake_bpy as bpy
+    FAKE = True
+
+DEFAULT_SIZES = (1_000, 10_000, 50_000)
+
+
+def make_axes():
+    """Three fresh X/Y/Z driver objects."""
+    if FAKE:
+        bpy.reset()
+        return [bpy.add_object(f"bench-{a}") for a in "XYZ"]
+    objs = []
+    for a in "XYZ":
+        obj = bpy.data.objects.new(f"bench-{a}", None)
+        bpy.context.scene.collection.objects.link(obj)
+        objs.append(obj)
+    return objs
+
+
+def drop_axes(objs):
+    if not FAKE:
+        for obj in objs:
+            bpy.data.objects.remove(obj)
+
+
+def per_point(objs, points):
+    """What animate_path.py used to do: set location, key all channels, per frame."""
+    for frame, (x, y, z) in enumerate(points, start=1):
+        objs[0].location.x = x
+        objs[0].keyframe_insert(data_path="location", frame=frame)
+        objs[1].location.y = y
+        objs[1].keyframe_insert(data_path="location", frame=frame)
+        objs[2].location.z = z
+        objs[2].keyframe_insert(data_path="location", frame=frame)
+
+
+def bulk(objs, points):
+    frames = np.arange(1, len(points) + 1, dtype=np.float64)
+    for i, obj in enumerate(objs):
+        key_location(obj, bpy.data.actions, frames, {i: points[:, i]})
+
+
+def run(sizes):
+    rng = np.random.default_rng(0)
+    results = []
+    for n in sizes:
+        points = rng.random((n, 3))
+        row = {"n_points": n, "backend": "fake_bpy" if FAKE else "bpy"}
+        for name, fn in (("per_point", per_point), ("bulk", bulk)):
+            objs = make_axes()
+            if FAKE:
+                bpy.calls.clear()
+            t0 = time.perf_counter()
+            fn(objs, points)
+            row[f"{name}_s"] = time.perf_counter() - t0
+            if FAKE:
+                row[f"{name}_calls"] = sum(bpy.calls.values())
+            drop_axes(objs)
+        results.append(row)
+        print(row)
+    return results
+
+
+def main(argv):
+    sizes = [int(a) for a in argv] or list(DEFAULT_SIZES)
+    run(sizes)
+
+
+if __name__ == "__main__":
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    main(argv)
@@ -0,0 +1,199 @@
+"""
+Pipeline benchmark: G-code parser, limit validation, motion planning and
+resampling, toolpath file I/O and the keyframe writer, on synthetic jobs
+from gen_gcode.py. Runs with plain Python; keyframes go to
+benchmarks/fake_bpy.py, which also counts the bpy calls made.
+
+    python benchmarks/bench_pipeline.py [--sizes 1e3 1e4 1e5] [--patterns corners serpentine]
+                                        [--skip validate] [--out report.json] [--compare base.json]
+
+The report (benchmarks/results/<branch>-<commit>.json by default) is one
+JSON object: "meta" (commit, branch, Python/NumPy versions, machine) and
+"results", one row per pattern, size and stage with wall time, throughput
+and peak RSS. --compare prints each stage's time relative to an earlier
+report, e.g. one taken on master.
+
+Stages in BUDGET_US_PER_ITEM have a time limit per item; a run that goes
+over it (a stage that stopped scaling linearly, like the RDP decimation
+that once took 90 s to key a 1e4-move job) exits with status 1.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(HERE)
+sys.path.append(os.path.join(REPO_ROOT, "from_gcode"))
+sys.path.append(HERE)
+from gcodedata import parse_gcode
+from motion import plan_motion, sample_at_fps
+from toolpath import write_toolpath, read_toolpath
+from keyframes import key_channel
+from decimate import decimate_channel
+from kinematics import Kinematics, DEFAULT_SPEC
+from validate import check_travel
+from spans import peak_rss_mb
+from gen_gcode import PATTERNS, cached_job
+import fake_bpy
+
+DEFAULT_SIZES = (1_000, 10_000)
+# Stages that nothing else depends on and can be left out of big runs
+OPTIONAL_STAGES = ("validate", "keyframes")
+FPS = 24.0
+# Sparse jobs (long corner moves) would give hours of frames at FPS; the
+# frame rate is lowered so downstream stages see at most this many samples
+# per move and scale with the job size
+MAX_SAMPLES_PER_MOVE = 20
+KEY_TOLERANCE_MM = 0.01
+# Generous per-item limits (about 5x the times measured when they were set)
+BUDGET_US_PER_ITEM = {"parse": 50.0, "keyframes": 10.0}
+RESULTS_DIR = os.path.join(HERE, "results")
+
+
+def git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def key_toolpath(toolpath, model):
+    """Decimate and key every axis channel on fake_bpy empties, like
+    animate_path.py; returns (keys written, bpy calls made)."""
+    fake_bpy.reset()
+    frames = np.arange(1, len(toolpath) + 1, dtype=np.float64)
+    keys = 0
+    for axis, link, index, _, _ in model.axes:
+        obj = fake_bpy.add_object(f"bench-{link.name}")
+        kf, mm, interp = decimate_channel(frames, np.asarray(toolpath["xyz"[axis]]), KEY_TOLERANCE_MM)
+        key_channel(obj, fake_bpy.data.actions, index, kf, model.axis_locations(axis, mm), interp)
+        keys += len(kf)
+    return keys, sum(fake_bpy.calls.values())
+
+
+def bench_job(pattern, n, work_dir, skip=()):
+    """Time every stage (but those in skip) on one synthetic job; returns result rows."""
+    gcode = cached_job(pattern, n)
+    rows = []
+
+    def row(stage, wall_s, items, **extra):
+        r = {"pattern": pattern, "moves": n, "stage": stage, "wall_s": wall_s, "items": items,
+             "items_per_s": items / wall_s if wall_s > 0 else None, "peak_rss_mb": peak_rss_mb(), **extra}
+        budget = BUDGET_US_PER_ITEM.get(stage)
+        # small jobs are dominated by fixed costs
+        if budget is not None and items >= 10_000:
+            r["over_budget"] = wall_s > budget * 1e-6 * items
+        rows.append(r)
+        flag = "  OVER BUDGET" if r.get("over_budget") else ""
+        print(f"[bench] {pattern:<10} {n:>9} {stage:<14} {wall_s * 1e3:10.1f} ms  {items:>9} items{flag}")
+
+    path, wall = timed(parse_gcode, gcode)
+    row("parse", wall, len(path), bytes=os.path.getsize(gcode))
+
+    model = Kinematics.from_spec(DEFAULT_SPEC)
+    xyz = path.xyz
+    if "validate" not in skip:
+        report, wall = timed(check_travel, xyz, path.line, model)
+        row("validate", wall, len(path), violations=sum(a["count"] for a in report.axes.values()))
+
+    plan, wall = timed(plan_motion, xyz, path.f)
+    row("plan", wall, len(path), job_s=plan.total_time)
+    fps = min(FPS, MAX_SAMPLES_PER_MOVE * len(path) / max(plan.total_time, 1e-9))
+    (frames, vertex), wall = timed(sample_at_fps, plan, fps)
+    row("resample", wall, len(frames), fps=fps)
+
+    line = path.line[np.minimum(vertex + 1, len(path) - 1)]
+    tpath = os.path.join(work_dir, f"{pattern}_{n}.tpath")
+    _, wall = timed(write_toolpath, tpath, frames, line=line, fps=fps)
+    row("toolpath_write", wall, len(frames), bytes=os.path.getsize(tpath))
+    t0 = time.perf_counter()
+    toolpath = read_toolpath(tpath)
+    checksum = sum(float(np.sum(toolpath[c], dtype=np.float64)) for c in "xyz")
+    row("toolpath_read", time.perf_counter() - t0, len(toolpath), checksum=checksum)
+    if "keyframes" not in skip:
+        (keys, calls), wall = timed(key_toolpath, toolpath, model)
+        row("keyframes", wall, len(toolpath), keys=keys, bpy_calls=calls)
+    del toolpath
+    os.unlink(tpath)
+    return rows
+
+
+def compare(results, base):
+    """Print each stage's wall time against the same stage in base."""
+    before = {(r["pattern"], r["moves"], r["stage"]): r["wall_s"] for r in base["results"]}
+    meta = base.get("meta", {})
+    print(f"[bench] vs {meta.get('branch')}@{meta.get('commit')}  (ratio < 1 is faster)")
+    for r in results:
+        old = before.get((r["pattern"], r["moves"], r["stage"]))
+        if old:
+            print(f"[bench] {r['pattern']:<10} {r['moves']:>9} {r['stage']:<14} "
+                  f"{old * 1e3:10.1f} -> {r['wall_s'] * 1e3:10.1f} ms  x{r['wall_s'] / old:.2f}")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="bench_pipeline.py")
+    parser.add_argument("--sizes", type=float, nargs="+", default=DEFAULT_SIZES,
+                        help="moves per job, up to 1e7")
+    parser.add_argument("--patterns", nargs="+", choices=PATTERNS, default=PATTERNS)
+    parser.add_argument("--skip", nargs="+", choices=OPTIONAL_STAGES, default=(),
+                        help="stages to leave out")
+    parser.add_argument("--out", help="report path (default: benchmarks/results/<branch>-<commit>.json)")
+    parser.add_argument("--compare", help="earlier report to compare against")
+    args = parser.parse_args(argv)
+
+    meta = environment()
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for n in (int(s) for s in args.sizes):
+            for pattern in args.patterns:
+                results.extend(bench_job(pattern, n, work_dir, args.skip))
+
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        name = f"{meta['branch'] or 'nogit'}-{meta['commit'] or 'unknown'}.json".replace("/", "_")
+        out = os.path.join(RESULTS_DIR, name)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"[bench] Report written to {out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+    over = [r for r in results if r.get("over_budget")]
+    for r in over:
+        print(f"[bench] {r['stage']} on {r['pattern']} x{r['moves']} took "
+              f"{r['wall_s'] / r['items'] * 1e6:.1f} us/item, over its {BUDGET_US_PER_ITEM[r['stage']]} us budget")
+    if over:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,213 @@
+"""
+Minimal stand-in for the parts of bpy the from_gcode scripts touch.
+
+It records every API call in `calls` so benchmarks (and anyone checking the
+bulk writers on Linux without Blender) can see how much work a code path
+asks Blender to do. Only the legacy action.fcurves API is modelled.
+"""
+from collections import Counter
+import numpy as np
+
+calls = Counter()
+
+
+class Vector(list):
+    """Three floats with .x/.y/.z access."""
+
+    def __init__(self, xyz=(0.0, 0.0, 0.0)):
+        super().__init__(float(v) for v in xyz)
+
+    x = property(lambda s: s[0], lambda s, v: s.__setitem__(0, float(v)))
+    y = property(lambda s: s[1], lambda s, v: s.__setitem__(1, float(v)))
+    z = property(lambda s: s[2], lambda s, v: s.__setitem__(2, float(v)))
+
+
+class _Keyframe:
+    """One key, viewed through its KeyframePoints (interpolation by name, as in bpy)."""
+
+    def __init__(self, points, i):
+        self._points = points
+        self._i = i
+
+    @property
+    def co(self):
+        return self._points.co[self._i]
+
+    @co.setter
+    def co(self, value):
+        calls["keyframe.set"] += 1
+        self._points.co[self._i] = value
+
+    @property
+    def interpolation(self):
+        return ("CONSTANT", "LINEAR", "BEZIER")[self._points.interpolation[self._i]]
+
+    @interpolation.setter
+    def interpolation(self, name):
+        calls["keyframe.set"] += 1
+        self._points.interpolation[self._i] = ("CONSTANT", "LINEAR", "BEZIER").index(name)
+
+
+class KeyframePoints:
+    """Keys held in growable arrays; co and interpolation are views of the used part."""
+
+    def __init__(self):
+        self._co = np.zeros((16, 2), dtype=np.float32)
+        self._interp = np.zeros(16, dtype=np.int32)
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        return _Keyframe(self, range(self._n)[i])
+
+    co = property(lambda s: s._co[:s._n])
+    interpolation = property(lambda s: s._interp[:s._n])
+
+    def _grow(self, count):
+        need = self._n + count
+        if need > len(self._co):
+            size = max(need, 2 * len(self._co))
+            self._co = np.resize(self._co, (size, 2))
+            self._interp = np.resize(self._interp, size)
+        self._n = need
+
+    def add(self, count):
+        calls["keyframe_points.add"] += 1
+        start = self._n
+        self._grow(count)
+        self._co[start:self._n] = 0.0
+        self._interp[start:self._n] = 2  # BEZIER, Blender's default
+
+    def insert(self, frame, value):
+        calls["keyframe_points.insert"] += 1
+        co = self.co
+        # Blender replaces a key on the same frame and keeps keys sorted
+        i = int(np.searchsorted(co[:, 0], frame))
+        if i < self._n and co[i, 0] == frame:
+            co[i, 1] = value
+            return
+        self._grow(1)
+        self._co[i + 1:self._n] = self._co[i:self._n - 1].copy()
+        self._interp[i + 1:self._n] = self._interp[i:self._n - 1].copy()
+        self._co[i] = (frame, value)
+        self._interp[i] = 2
+
+    def foreach_set(self, attr, seq):
+        calls["keyframe_points.foreach_set"] += 1
+        target = getattr(self, attr)
+        target.flat[:] = np.asarray(seq, dtype=target.dtype)
+
+    def foreach_get(self, attr, seq):
+        calls["keyframe_points.foreach_get"] += 1
+        seq[:] = getattr(self, attr).ravel()
+
+
+class FCurve:
+    def __init__(self, data_path, index):
+        self.data_path = data_path
+        self.array_index = index
+        self.keyframe_points = KeyframePoints()
+
+    def update(self):
+        calls["fcurve.update"] += 1
+
+    def evaluate(self, frame):
+        co = self.keyframe_points.co
+        return float(np.interp(frame, co[:, 0], co[:, 1])) if len(co) else 0.0
+
+
+class FCurves(list):
+    def new(self, data_path, index=0, action_group=""):
+        calls["fcurves.new"] += 1
+        fc = FCurve(data_path, index)
+        self.append(fc)
+        return fc
+
+    def find(self, data_path, index=0):
+        for fc in self:
+            if fc.data_path == data_path and fc.array_index == index:
+                return fc
+        return None
+
+
+class Action:
+    def __init__(self, name):
+        self.name = name
+        self.fcurves = FCurves()
+
+
+class Actions(list):
+    def new(self, name):
+        calls["actions.new"] += 1
+        action = Action(name)
+        self.append(action)
+        return action
+
+
+class AnimData:
+    def __init__(self):
+        self.action = None
+
+
+class Object:
+    def __init__(self, name, location=(0.0, 0.0, 0.0), parent=None):
+        self.name = name
+        self.location = Vector(location)
+        self.parent = parent
+        self.matrix_parent_inverse = np.eye(4).tolist()
+        self.animation_data = None
+        self.constraints = []
+
+    @property
+    def matrix_basis(self):
+        """Translation only; rotation and scale are not modelled."""
+        m = np.eye(4)
+        m[:3, 3] = self.location
+        return m.tolist()
+
+    def animation_data_create(self):
+        self.animation_data = AnimData()
+        return self.animation_data
+
+    def animation_data_clear(self):
+        self.animation_data = None
+
+    def keyframe_insert(self, data_path="location", frame=0):
+        calls["keyframe_insert"] += 1
+        ad = self.animation_data or self.animation_data_create()
+        if ad.action is None:
+            ad.action = data.actions.new(f"{self.name}Action")
+        for index, value in enumerate(getattr(self, data_path)):
+            fc = ad.action.fcurves.find(data_path, index) or ad.action.fcurves.new(data_path, index)
+            fc.keyframe_points.insert(frame, value)
+
+
+class Objects(dict):
+    def get(self, name, default=None):
+        return super().get(name, default)
+
+
+class Data:
+    def __init__(self):
+        self.objects = Objects()
+        self.actions = Actions()
+        self.filepath = ""
+        self.is_dirty = False
+
+
+data = Data()
+
+
+def reset():
+    """Forget all objects, actions and recorded calls."""
+    global data
+    data = Data()
+    calls.clear()
+
+
+def add_object(name, location=(0.0, 0.0, 0.0), parent=None):
+    obj = Object(name, location, data.objects.get(parent))
+    data.objects[name] = obj
+    return obj
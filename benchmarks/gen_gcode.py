@@ -0,0 +1,126 @@
+"""
+Synthetic Jubilee jobs for the benchmarks.
+
+    python benchmarks/gen_gcode.py PATTERN N_MOVES [-o out.gcode] [--seed 0]
+
+Patterns, all inside the nominal 300 x 300 x 200 mm travel:
+
+- corners     the bed and top corners in turn, each move preceded by G90,
+              like the RecordingTransport log in from_gcode/path.gcode
+- wellplate   96-well plate sweeps: travel over each well at a safe height,
+              dip, rise, with slow Z and fast XY feeds
+- serpentine  a dense raster of short G1 segments, row by row, back and forth
+
+Moves are generated with NumPy and written in chunks, so 10^7-move files
+(a few hundred MB) take seconds and little memory.
+"""
+import os
+import sys
+import argparse
+import numpy as np
+
+PATTERNS = ("corners", "wellplate", "serpentine")
+CHUNK_MOVES = 200_000
+
+HEADER = ["; synthetic benchmark job", "G90", "M82", "G92 X0 Y0 Z0 E0", "T-1",
+          "G28 Y", "G28 X", "G28 Z", "G90"]
+
+# 96-well plate: 8 rows x 12 columns, 9 mm pitch, A1 at (40, 60)
+WELL_ORIGIN = (40.0, 60.0)
+WELL_PITCH = 9.0
+WELL_SAFE_Z = 40.0
+WELL_DIP_Z = 5.0
+
+
+def corners(first, n, rng):
+    corner = np.array([[5, 5, 0], [5, 295, 0], [295, 5, 0], [295, 295, 0],
+                       [5, 5, 200], [5, 295, 200], [295, 5, 200], [295, 295, 200]], dtype=np.float64)
+    xyz = corner[np.arange(first, first + n) % len(corner)]
+    return xyz, np.full(n, 4000.0)
+
+
+def wellplate(first, n, rng):
+    # three moves per well: over it at safe Z, down, back up
+    k = np.arange(first, first + n)
+    well, step = np.divmod(k, 3)
+    row, col = np.divmod(well % 96, 12)
+    xyz = np.empty((n, 3))
+    xyz[:, 0] = WELL_ORIGIN[0] + col * WELL_PITCH
+    xyz[:, 1] = WELL_ORIGIN[1] + row * WELL_PITCH
+    xyz[:, 2] = np.where(step == 1, WELL_DIP_Z, WELL_SAFE_Z)
+    feed = np.where(step == 0, 6000.0, 600.0)
+    return xyz, feed
+
+
+def serpentine(first, n, rng, total=None):
+    # about sqrt(total) segments per row, rows spaced to fill 280 mm
+    total = total or n
+    per_row = max(2, int(np.sqrt(total)))
+    rows = max(1, -(-total // per_row))
+    k = np.arange(first, first + n)
+    row, seg = np.divmod(k, per_row)
+    u = (seg + 1) / per_row
+    x = np.where(row % 2 == 0, u, 1.0 - u) * 280.0 + 10.0
+    y = 10.0 + row * (280.0 / rows)
+    z = 0.2 + 0.01 * rng.standard_normal(n)
+    return np.column_stack((x, y, z)), np.full(n, 3000.0)
+
+
+def generate_moves(pattern, n, seed=0):
+    """Yield (xyz, feed) chunks of the pattern's first n moves."""
+    rng = np.random.default_rng(seed)
+    for first in range(0, n, CHUNK_MOVES):
+        count = min(CHUNK_MOVES, n - first)
+        if pattern == "serpentine":
+            yield serpentine(first, count, rng, total=n)
+        else:
+            yield globals()[pattern](first, count, rng)
+
+
+def format_moves(pattern, xyz, feed):
+    if pattern == "corners":
+        return [f"G90\nG0 Z{z:.2f} X{x:.2f} Y{y:.2f} F{f:.2f}"
+                for (x, y, z), f in zip(xyz.tolist(), feed.tolist())]
+    return [f"G1 X{x:.3f} Y{y:.3f} Z{z:.3f} F{f:.0f}" for (x, y, z), f in zip(xyz.tolist(), feed.tolist())]
+
+
+def write_gcode(path, pattern, n, seed=0):
+    """Write a synthetic job of n moves to path; returns path."""
+    if pattern not in PATTERNS:
+        raise ValueError(f"Unknown pattern '{pattern}' (expected one of {', '.join(PATTERNS)})")
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("\n".join(HEADER) + "\n")
+        for xyz, feed in generate_moves(pattern, n, seed):
+            f.write("\n".join(format_moves(pattern, xyz, feed)) + "\n")
+    return path
+
+
+def cached_job(pattern, n, seed=0, directory=None):
+    """Path to the job in benchmarks/data/, generating it on first use."""
+    directory = directory or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{pattern}_{n}_{seed}.gcode")
+    if not os.path.exists(path):
+        tmp = path + ".tmp"
+        write_gcode(tmp, pattern, n, seed)
+        os.replace(tmp, path)
+    return path
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="gen_gcode.py")
+    parser.add_argument("pattern", choices=PATTERNS)
+    parser.add_argument("moves", type=float, help="number of moves (1e6 works)")
+    parser.add_argument("-o", "--output", help="G-code file (default: benchmarks/data/...)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    n = int(args.moves)
+    if args.output:
+        path = write_gcode(args.output, args.pattern, n, args.seed)
+    else:
+        path = cached_job(args.pattern, n, args.seed)
+    print(f"[bench] {n} {args.pattern} moves in {path} ({os.path.getsize(path) / 2**20:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
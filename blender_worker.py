@@ -0,0 +1,131 @@
+"""
+Long-lived background Blender that keeps jubilee.blend loaded and runs
+render jobs sent over a local socket, so short runs skip Blender start-up.
+
+    blender -b jubilee.blend -P blender_worker.py -- [--port 7420]
+
+Each request is one JSON line: {"cmd": "run", "script": ..., "args": [...]}
+runs the script's main() as if Blender had been started with
+`-P script -- args` and replies with its artifact paths; {"cmd": "ping"} and
+{"cmd": "shutdown"} do what they say. After every job the scene is reset by
+reloading the .blend (warm in the OS cache), so jobs never see each other's
+changes; persistent handlers the job installed are removed as well.
+
+Requests must carry the token start_worker() passed in the environment
+(a worker started by hand makes its own and saves it where clients look),
+and only scripts inside this repository are run.
+
+Helper modules stay imported between jobs: restart the worker after
+changing them. worker_client.py is the plain-Python side.
+"""
+import bpy
+import os
+import sys
+import hmac
+import json
+import time
+import socket
+import secrets
+import runpy
+import argparse
+import traceback
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(_HERE)
+sys.path.append(os.path.join(_HERE, "from_gcode"))
+from worker_client import HOST, PORT, TOKEN_ENV, write_token, token_path, repo_script
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="blender_worker.py")
+    parser.add_argument("--port", type=int, default=PORT)
+    return parser.parse_args(argv)
+
+
+def run_job(job):
+    """Run job["script"]'s main() with job["args"] after '--'; returns its result."""
+    if not repo_script(job["script"]):
+        raise PermissionError(f"{job['script']} is not a script in {_HERE}")
+    argv = sys.argv
+    sys.argv = [argv[0], "-b", bpy.data.filepath, "-P", job["script"], "--", *job.get("args", [])]
+    try:
+        module = runpy.run_path(job["script"], run_name="blender_worker_job")
+        return module["main"]()
+    finally:
+        sys.argv = argv
+
+
+def reset_scene():
+    """Drop whatever the last job changed: handlers, then the whole file."""
+    playback = sys.modules.get("playback")
+    if playback is not None:
+        playback.uninstall()
+    bpy.ops.wm.revert_mainfile()
+
+
+def handle(request):
+    cmd = request.get("cmd")
+    if cmd == "ping":
+        return {"ok": True, "blend": bpy.data.filepath, "pid": os.getpid()}
+    if cmd != "run":
+        return {"ok": False, "error": f"Unknown command '{cmd}'"}
+    t0 = time.perf_counter()
+    try:
+        result = run_job(request)
+        return {"ok": True, "result": result, "wall_s": time.perf_counter() - t0}
+    except Exception as e:
+        traceback.print_exc()
+        return {"ok": False, "error": f"{type(e).__name__}: {e}", "wall_s": time.perf_counter() - t0}
+
+
+def serve(port=PORT):
+    # jobs' own subprocesses don't need the token
+    token = os.environ.pop(TOKEN_ENV, None)
+    if not token:
+        token = secrets.token_hex(16)
+        write_token(port, token)
+        print(f"[worker] Token saved to {token_path(port)}")
+    server = socket.create_server((HOST, port))
+    print(f"[worker] {bpy.data.filepath} loaded, listening on {HOST}:{port}")
+    while True:
+        conn, _ = server.accept()
+        ran = False
+        # a bad request or a client that hangs up only costs its connection
+        try:
+            with conn, conn.makefile("rwb") as stream:
+                line = stream.readline()
+                if not line:
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = None
+                if not isinstance(request, dict):
+                    stream.write(b'{"ok": false, "error": "Bad request"}\n')
+                    stream.flush()
+                    continue
+                if not hmac.compare_digest(str(request.get("token", "")).encode(), token.encode()):
+                    stream.write(b'{"ok": false, "error": "Bad or missing worker token"}\n')
+                    stream.flush()
+                    continue
+                if request.get("cmd") == "shutdown":
+                    stream.write(b'{"ok": true}\n')
+                    stream.flush()
+                    break
+                ran = request.get("cmd") == "run"
+                reply = handle(request)
+                stream.write(json.dumps(reply, default=str).encode() + b"\n")
+                stream.flush()
+        except OSError as e:
+            print(f"[worker] Connection dropped: {e}")
+        if ran:
+            t0 = time.perf_counter()
+            reset_scene()
+            print(f"[worker] Scene reset in {time.perf_counter() - t0:.2f} s")
+    server.close()
+    print("[worker] Shut down.")
+
+
+if __name__ == "__main__":
+    serve(parse_args().port)
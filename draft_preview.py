@@ -0,0 +1,173 @@
+"""
+Draft preview: where the carriage goes, without Blender or Eevee.
+
+    python draft_preview.py [toolpath] [-o docs/jubilee_draft.gif] [--size 240] [--max-frames 600]
+
+Reads the same .tpath and kinematics (scene sidecar, axis limits) as
+animate_path.py and rasterizes two orthographic views side by side straight
+into NumPy frame buffers: top (world X/Y) and side (world X/Z). Each view
+shows the travel envelope, the whole toolpath, the part already travelled,
+the XY-carriage and, in the side view, the Z-axis (bed) height. Frames are
+piped raw into the two-pass ffmpeg encoder (gif_encoder.py).
+
+Long jobs are shown time-lapsed: at most --max-frames evenly spaced samples
+become GIF frames, but the travelled trail still follows every sample.
+
+Plain Python (no bpy); sacred_runner.py uses it for runs with draft=True.
+"""
+import os
+import sys
+import argparse
+import numpy as np
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(_HERE, "from_gcode"))
+import gif_encoder
+from kinematics import load_model
+from toolpath import read_toolpath
+from utils import load_config
+from render_parallel import blend_relative
+
+BLEND_PATH = os.path.join(_HERE, "jubilee.blend")
+DRAFT_GIF_PATH = os.path.join(_HERE, "docs", "jubilee_draft.gif")
+DRAFT_SIZE = 240          # pixels per view (square)
+DRAFT_MAX_FRAMES = 600
+MARGIN = 8                # pixels around the envelope
+
+BACKGROUND = (24, 24, 28)
+ENVELOPE = (96, 96, 110)
+PATH = (58, 84, 120)
+TRAIL = (240, 170, 60)
+CARRIAGE = (255, 255, 255)
+BED = (110, 190, 110)
+
+
+class View:
+    """Orthographic projection of two world axes onto a square panel."""
+
+    def __init__(self, u_axis, v_axis, lo, hi, size, left):
+        self.u_axis, self.v_axis = u_axis, v_axis
+        self.size, self.left = size, left
+        lo, hi = np.asarray(lo, dtype=np.float64), np.asarray(hi, dtype=np.float64)
+        extent = max(hi[u_axis] - lo[u_axis], hi[v_axis] - lo[v_axis], 1e-9)
+        self.scale = (size - 2 * MARGIN - 1) / extent
+        # centre the box in the panel
+        self.u0 = lo[u_axis] - ((size - 2 * MARGIN - 1) / self.scale - (hi[u_axis] - lo[u_axis])) / 2
+        self.v0 = lo[v_axis] - ((size - 2 * MARGIN - 1) / self.scale - (hi[v_axis] - lo[v_axis])) / 2
+
+    def pixels(self, world):
+        """(rows, cols) int32 for world points (n, 3); v points up."""
+        world = np.atleast_2d(world)
+        col = MARGIN + (world[:, self.u_axis] - self.u0) * self.scale
+        row = self.size - 1 - MARGIN - (world[:, self.v_axis] - self.v0) * self.scale
+        return (np.clip(np.rint(row), 0, self.size - 1).astype(np.int32),
+                np.clip(np.rint(col), 0, self.size - 1).astype(np.int32) + self.left)
+
+
+def draw_polyline(img, rows, cols, color):
+    """Connect consecutive pixels with straight runs (all segments at once)."""
+    if len(rows) == 0:
+        return
+    if len(rows) == 1:
+        img[rows, cols] = color
+        return
+    dr, dc = np.diff(rows), np.diff(cols)
+    steps = np.maximum(np.abs(dr), np.abs(dc)) + 1
+    seg = np.repeat(np.arange(len(dr)), steps)
+    t = (np.arange(len(seg)) - np.repeat(np.cumsum(steps) - steps, steps)) / np.maximum(steps[seg] - 1, 1)
+    img[np.rint(rows[seg] + dr[seg] * t).astype(np.int32),
+        np.rint(cols[seg] + dc[seg] * t).astype(np.int32)] = color
+
+
+def draw_box(img, view, lo, hi, color):
+    corners = np.array([[lo[0], lo[1], lo[2]], [hi[0], hi[1], hi[2]]])
+    (r0, r1), (c0, c1) = view.pixels(corners)
+    rows = np.array([r0, r0, r1, r1, r0])
+    cols = np.array([c0, c1, c1, c0, c0])
+    draw_polyline(img, rows, cols, color)
+
+
+def draw_marker(img, row, col, half, color):
+    img[max(row - half, 0):row + half + 1, max(col - half, 0):col + half + 1] = color
+
+
+def envelope(model, carriage, bed):
+    """World-space (lo, hi) box covering the full travel of the carriage and
+    the bed, falling back to the toolpath's extent on free axes."""
+    lo_mm, hi_mm = model.travel_mm()
+    corners = np.array([[x, y, z] for x in (lo_mm[0], hi_mm[0])
+                        for y in (lo_mm[1], hi_mm[1]) for z in (lo_mm[2], hi_mm[2])])
+    points = [carriage, bed]
+    if np.all(np.isfinite(corners)):
+        world = model.world_positions(corners, names=("XY-carriage", "Z-axis"))
+        points += [world["XY-carriage"], world["Z-axis"]]
+    points = np.concatenate(points)
+    return points.min(axis=0), points.max(axis=0)
+
+
+def render_preview(toolpath_path, gif_path=DRAFT_GIF_PATH, fps=24, size=DRAFT_SIZE,
+                   max_frames=DRAFT_MAX_FRAMES, model=None, work_dir=None):
+    """Write the two-view draft GIF for a toolpath; returns the GIF path."""
+    model = model or load_model()
+    toolpath = read_toolpath(toolpath_path)
+    n = len(toolpath)
+    if n == 0:
+        raise ValueError(f"{toolpath_path} has no samples")
+    world = model.world_positions(toolpath.xyz, names=("XY-carriage", "Z-axis"))
+    carriage, bed = world["XY-carriage"], world["Z-axis"]
+    lo, hi = envelope(model, carriage, bed)
+
+    top = View(0, 1, lo, hi, size, left=0)
+    side = View(0, 2, lo, hi, size, left=size)
+    base = np.empty((size, 2 * size, 3), dtype=np.uint8)
+    base[:] = BACKGROUND
+    draw_box(base, top, lo, hi, ENVELOPE)
+    draw_box(base, side, lo, hi, ENVELOPE)
+    top_px, side_px = top.pixels(carriage), side.pixels(carriage)
+    bed_rows = side.pixels(bed)[0]
+    draw_polyline(base, *top_px, PATH)
+    draw_polyline(base, *side_px, PATH)
+
+    shown = np.unique(np.linspace(0, n - 1, min(n, max_frames)).round().astype(np.int64))
+    print(f"[draft] {n} samples -> {len(shown)} frames of {2 * size}x{size} px")
+    bed_cols = slice(side.pixels(lo)[1][0], side.pixels(hi)[1][0] + 1)
+    half = max(1, size // 80)
+
+    encoder = gif_encoder.GifStreamEncoder(gif_path, fps, 2 * size,
+                                           work_dir or os.path.join(os.path.dirname(os.path.abspath(gif_path)), "_draft"),
+                                           frame_size=(2 * size, size))
+    try:
+        prev = 0
+        for i in shown:
+            # the trail layer only ever gains the samples since the last frame
+            draw_polyline(base, top_px[0][prev:i + 1], top_px[1][prev:i + 1], TRAIL)
+            draw_polyline(base, side_px[0][prev:i + 1], side_px[1][prev:i + 1], TRAIL)
+            prev = i
+            frame = base.copy()
+            frame[bed_rows[i], bed_cols] = BED
+            draw_marker(frame, top_px[0][i], top_px[1][i], half, CARRIAGE)
+            draw_marker(frame, side_px[0][i], side_px[1][i], half, CARRIAGE)
+            encoder.write_frame(frame.tobytes())
+    except BaseException:
+        encoder.abort()
+        raise
+    encoder.close()
+    print("[draft] GIF written to:", gif_path)
+    return gif_path
+
+
+def main():
+    cfg = load_config()
+    parser = argparse.ArgumentParser(prog="draft_preview.py")
+    parser.add_argument("toolpath", nargs="?",
+                        default=blend_relative(cfg.get("toolpath", "//from_gcode/pathout.tpath"), BLEND_PATH))
+    parser.add_argument("-o", "--output", default=DRAFT_GIF_PATH)
+    parser.add_argument("--size", type=int, default=int(cfg.get("draft_size", DRAFT_SIZE)))
+    parser.add_argument("--max-frames", type=int, default=int(cfg.get("draft_max_frames", DRAFT_MAX_FRAMES)))
+    parser.add_argument("--fps", type=float, default=float(cfg.get("fps", 24)))
+    args = parser.parse_args()
+    render_preview(args.toolpath, args.output, args.fps, args.size, args.max_frames)
+
+
+if __name__ == "__main__":
+    main()
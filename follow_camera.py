@@ -0,0 +1,125 @@
+"""
+Follow camera: the camera's path for a whole toolpath, in one pass.
+
+animation_to_gif.py normally aims the camera at the target once. With
+camera_follow set, it takes the target's world position at every frame from
+the headless kinematics model and the toolpath (no frame_set), and this
+module turns those positions into camera keys:
+
+- a dead zone: the aim point only moves once the target is more than
+  dead_zone away from it, per world axis, so small moves don't shake the view
+- smoothing: a centred moving average over smoothing_s seconds
+- "dolly" keeps camera_offset from the aim point (fixed orientation);
+  "pan" stays in one place above the middle of the travel and turns
+- fit_lens(): the longest lens that still keeps the target in view on every
+  frame, so a smaller render shows the carriage as large as possible
+
+Rotations are XYZ Euler angles with no roll, like to_track_quat('-Z', 'Y').
+
+Plain Python (no bpy).
+"""
+import numpy as np
+
+FOLLOW_MODES = ("dolly", "pan")
+# Share of the frame the target may use at most after fit_lens()
+FIT_MARGIN = 0.9
+
+
+def dead_zone(values, radius):
+    """Per-column play operator: out[t] = clip(out[t-1], v[t] - r, v[t] + r).
+
+    The clamps compose into clamps, so every prefix is reduced with a
+    log-step (Hillis-Steele) scan instead of a loop over frames.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if radius <= 0 or len(values) < 2:
+        return values.copy()
+    lo, hi = values - radius, values + radius
+    shift = 1
+    while shift < len(values):
+        # compose the clamp of [t - shift] under the clamp of [t]
+        new_lo = np.clip(lo[:-shift], lo[shift:], hi[shift:])
+        new_hi = np.clip(hi[:-shift], lo[shift:], hi[shift:])
+        lo[shift:], hi[shift:] = new_lo, new_hi
+        shift *= 2
+    return np.clip(values[0], lo, hi)
+
+
+def smooth(values, window):
+    """Centred moving average over window samples (edges held)."""
+    values = np.asarray(values, dtype=np.float64)
+    window = int(window)
+    if window < 2 or len(values) < 2:
+        return values.copy()
+    half = window // 2
+    padded = np.concatenate([np.repeat(values[:1], half, axis=0), values,
+                             np.repeat(values[-1:], window - half - 1, axis=0)])
+    csum = np.cumsum(padded, axis=0)
+    csum = np.concatenate([np.zeros((1,) + values.shape[1:]), csum])
+    return (csum[window:] - csum[:-window]) / window
+
+
+def look_euler(direction):
+    """(n, 3) XYZ Euler angles that point a camera's -Z along direction (n, 3)."""
+    d = np.atleast_2d(np.asarray(direction, dtype=np.float64))
+    euler = np.zeros(d.shape)
+    euler[:, 0] = np.arctan2(np.hypot(d[:, 0], d[:, 1]), -d[:, 2])
+    euler[:, 2] = np.unwrap(np.arctan2(-d[:, 0], d[:, 1]))
+    return euler
+
+
+def euler_matrices(euler):
+    """(n, 3, 3) rotation matrices for XYZ Euler angles with no Y rotation."""
+    euler = np.atleast_2d(euler)
+    cx, sx = np.cos(euler[:, 0]), np.sin(euler[:, 0])
+    cz, sz = np.cos(euler[:, 2]), np.sin(euler[:, 2])
+    m = np.zeros((len(euler), 3, 3))
+    # Rz @ Rx
+    m[:, 0, 0], m[:, 0, 1], m[:, 0, 2] = cz, -sz * cx, sz * sx
+    m[:, 1, 0], m[:, 1, 1], m[:, 1, 2] = sz, cz * cx, -cz * sx
+    m[:, 2, 1], m[:, 2, 2] = sx, cx
+    return m
+
+
+def follow_path(target, offset, mode="dolly", fps=24.0, dead_zone_m=0.01, smoothing_s=0.5):
+    """Camera locations and rotations (each (n, 3)) for target positions (n, 3).
+
+    offset is the camera position relative to the aim point, as in
+    setup_camera(); "pan" applies it to the middle of the target's travel.
+    """
+    if mode not in FOLLOW_MODES:
+        raise ValueError(f"Unknown follow mode '{mode}' (expected one of {', '.join(FOLLOW_MODES)})")
+    target = np.asarray(target, dtype=np.float64)
+    offset = np.asarray(offset, dtype=np.float64)
+    aim = smooth(dead_zone(target, dead_zone_m), round(smoothing_s * fps))
+    if mode == "dolly":
+        location = aim + offset
+        rotation = np.repeat(look_euler(-offset), len(aim), axis=0)
+    else:
+        centre = (target.min(axis=0) + target.max(axis=0)) / 2
+        location = np.repeat((centre + offset)[None], len(aim), axis=0)
+        rotation = look_euler(aim - location)
+    return location, rotation
+
+
+def fit_lens(target, location, rotation, radius, sensor_width, width, height, margin=FIT_MARGIN):
+    """Longest focal length (mm) that keeps a sphere of radius around every
+    target position inside the frame (sensor_fit AUTO).
+
+    Returns None if the target ever gets behind the camera.
+    """
+    rel = np.asarray(target, dtype=np.float64) - location
+    m = euler_matrices(rotation)
+    cam = np.einsum("nji,nj->ni", m, rel)  # world -> camera axes
+    depth = -cam[:, 2]
+    if np.any(depth <= radius):
+        return None
+    u = np.abs(cam[:, 0]) / depth + radius / depth
+    v = np.abs(cam[:, 1]) / depth + radius / depth
+    # the sensor width spans the longer side of the frame
+    aspect = width / float(height)
+    if aspect >= 1:
+        need = max(u.max(), v.max() * aspect)
+    else:
+        need = max(u.max() / aspect, v.max())
+    return margin * sensor_width / (2 * need)
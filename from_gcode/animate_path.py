@@ -1,16 +1,34 @@
 
 
 import bpy
-import csv
 import sys
 import os
 import numpy as np
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from utils import get_axis_min, get_axis_max
+from utils import load_config
+from kinematics import Kinematics
+import scene_meta
+from toolpath import read_toolpath, DEFAULT_PATH
+from keyframes import key_channel, append_channel, last_key_frame
+from decimate import decimate_channel
+from spans import Span
 
-# Path to the CSV file (relative to the .blend file)
-csv_path = bpy.path.abspath("//from_gcode/pathout.csv")
+# Path to the toolpath written by path_follower.py (relative to the .blend file)
+toolpath_path = bpy.path.abspath("//from_gcode/" + DEFAULT_PATH)
+
+cfg = load_config()
+
+# Keys are dropped while the carriage stays within this many mm of the
+# straight line between the kept ones (0 keys every frame)
+KEY_TOLERANCE_MM = float(cfg.get("key_tolerance_mm", 0.01))
+
+# "keyframes" bakes the path into F-curves; "handler" plays it straight from
+# the toolpath file (playback.py) without any keys
+PLAYBACK_MODE = str(cfg.get("playback_mode", "keyframes"))
+
+# Re-running after path_follower.py --tail keys only the new samples
+TAIL_FOLLOW = bool(cfg.get("tail_follow", False))
 
 # Animate 'X-axis' in X, 'Y-axis' in Y, and 'Z-axis' in Z if present
 x_axis = bpy.data.objects.get("X-axis")
@@ -21,61 +39,85 @@ if x_axis is None:
 if y_axis is None:
     raise Exception("No object named 'Y-axis' in the scene!")
 
-# Clean up existing actions/keyframes
-for obj in [x_axis, y_axis, z_axis]:
-    if obj is not None:
-        obj.animation_data_clear()
-
-# Read all points to determine minimums
-points = []
-with open(csv_path, newline='') as csvfile:
-    reader = csv.reader(csvfile)
-    for row in reader:
-        points.append(tuple(map(float, row)))
-points = np.array(points)
-
-# Read all points
-points = []
-with open(csv_path, newline='') as csvfile:
-    reader = csv.reader(csvfile)
-    for row in reader:
-        points.append(tuple(map(float, row)))
-points = np.array(points)
-
-
+load_span = Span("animate_path/load")
 
+# Keep the sidecar for Blender-free tools in step with this .blend (before
+# anything below moves the axes)
+scene_meta.refresh(bpy.data, bpy.context.scene, bpy.data.filepath)
 
-x_min = get_axis_min(x_axis, 'X')
-y_min = get_axis_min(y_axis, 'Y')
-z_max = get_axis_max(z_axis, 'Z') if z_axis is not None else 0.0
+# Memory-mapped, nothing is parsed or copied up front
+toolpath = read_toolpath(toolpath_path)
 
+# Axis origins (X/Y min, Z max) and the mm -> m / Z inversion mapping
+model = Kinematics.from_objects(bpy.data.objects)
+x_min, y_min, z_max = model.origin()
 
-# Move axes to minimum positions at start
-x_axis.location.x = x_min
-y_axis.location.y = y_min
-if z_axis is not None:
-    z_axis.location.z = z_max
+scene = bpy.context.scene
+n_points = len(toolpath)
+load_span.stop(samples=n_points)
+
+# Tail-following: keys that an earlier run baked up to frame_end stay, and
+# only the samples appended to the toolpath since are keyed after them
+append_from = None
+if TAIL_FOLLOW and PLAYBACK_MODE != "handler":
+    # (flat stretches decimate away, so a channel's last key may come earlier)
+    ends = [last_key_frame(bpy.data.objects[link.name], index) for _, link, index, _, _ in model.axes]
+    if None not in ends and max(ends) == scene.frame_end and n_points >= scene.frame_end:
+        append_from = scene.frame_end
+
+if append_from is None:
+    # Clean up existing actions/keyframes
+    for obj in [x_axis, y_axis, z_axis]:
+        if obj is not None:
+            obj.animation_data_clear()
+
+    # Move axes to minimum positions at start
+    x_axis.location.x = x_min
+    y_axis.location.y = y_min
+    if z_axis is not None:
+        z_axis.location.z = z_max
 
 print(f"Axis minimums: X={x_min}, Y={y_min}, Z={z_max}")
 
 
-
-# Animate with shifted origin and spread keyframes
-for frame, (x, y, z) in enumerate(points, start=1):
-    keyframe = frame
-    x_axis.location.x = x/1000 + x_min
-    #print("X:", x_axis.location.x)
-    x_axis.keyframe_insert(data_path="location", frame=keyframe)
-    y_axis.location.y = y/1000 + y_min
-    #print("Y:", y_axis.location.y)
-    y_axis.keyframe_insert(data_path="location", frame=keyframe)
-    if z_axis is not None:
-        z_axis.location.z = z_max - z/1000
-        #print("Z:", z_axis.location.z)
-        z_axis.keyframe_insert(data_path="location", frame=keyframe)
-
-    print(frame)
-
-# Set scene end frame to match animation
-scene = bpy.context.scene
-scene.frame_end = len(points)
\ No newline at end of file
+key_span = Span("animate_path/key", mode=PLAYBACK_MODE, samples=n_points)
+
+if PLAYBACK_MODE == "handler":
+    import playback
+    playback.install(scene, toolpath_path)
+elif append_from == n_points:
+    print("[tail] No new samples to key.")
+elif append_from is not None:
+    # Decimate only the new samples, starting from the last keyed frame
+    frames = np.arange(append_from, n_points + 1, dtype=np.float64)
+    for axis, link, index, _, _ in model.axes:
+        obj = bpy.data.objects[link.name]
+        mm = toolpath["xyz"[axis]][append_from - 1:]
+        if KEY_TOLERANCE_MM > 0:
+            key_frames, key_mm, interp = decimate_channel(frames, mm, KEY_TOLERANCE_MM)
+        else:
+            key_frames, key_mm, interp = frames, mm, "LINEAR"
+        fc = append_channel(obj, bpy.data.actions, index, key_frames, model.axis_locations(axis, key_mm), interp)
+        print(f"{obj.name}: {len(fc.keyframe_points)} keys after appending frames {append_from + 1}-{n_points}")
+    scene.frame_end = n_points
+else:
+    # Animate with shifted origin: decimate each driven channel (in mm), then
+    # write it as one bulk F-curve with LINEAR/CONSTANT keys
+    frames = np.arange(1, n_points + 1, dtype=np.float64)
+    for axis, link, index, _, _ in model.axes:
+        obj = bpy.data.objects[link.name]
+        mm = toolpath["xyz"[axis]]
+        if KEY_TOLERANCE_MM > 0:
+            key_frames, key_mm, interp = decimate_channel(frames, mm, KEY_TOLERANCE_MM)
+        else:
+            key_frames, key_mm, interp = frames, mm, "LINEAR"
+        key_channel(obj, bpy.data.actions, index, key_frames, model.axis_locations(axis, key_mm), interp)
+        print(f"{obj.name}: {len(key_frames)} keys for {n_points} frames")
+
+    # Set scene end frame to match animation
+    scene.frame_end = n_points
+    # Time-sampled paths play back in machine time at the fps they were sampled for
+    if toolpath.fps:
+        scene.render.fps = int(round(toolpath.fps))
+
+key_span.stop()
@@ -0,0 +1,77 @@
+"""
+Keyframe decimation for single animation channels.
+
+A Ramer-Douglas-Peucker pass over (frame, value) keeps only the keys needed
+to reproduce the channel within a tolerance under linear interpolation. The
+error is measured vertically (value error at each frame), which is what
+shows on screen. All intervals are refined together, one NumPy pass per
+RDP level, so there is no Python recursion per point.
+
+Each pass splits an interval at every local peak of its error above the
+tolerance, not only at the worst one. Plain RDP splits off one corner per
+level on repetitive paths (every corner of a back-and-forth move is about
+as far from the first chord), which takes as many passes as there are
+corners; splitting at all of them at once keeps the pass count close to
+the depth of a single move's curve.
+"""
+import numpy as np
+
+from keyframes import INTERPOLATION
+
+
+def rdp_mask(frames, values, tolerance):
+    """Boolean mask of the keys to keep so that linear interpolation between
+    them stays within tolerance of every original value."""
+    frames = np.asarray(frames, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    if n < 3:
+        return keep
+    idx = np.arange(n)
+    while True:
+        kept = np.flatnonzero(keep)
+        # interval id of every sample: index of the kept key at or before it
+        seg = np.searchsorted(kept, idx, side="right") - 1
+        seg = np.minimum(seg, len(kept) - 2)
+        i0, i1 = kept[seg], kept[seg + 1]
+        span = frames[i1] - frames[i0]
+        frac = np.divide(frames - frames[i0], span, out=np.zeros(n), where=span != 0)
+        err = np.abs(values - (values[i0] + (values[i1] - values[i0]) * frac))
+        err[keep] = 0.0
+        # worst sample of every interval (intervals are contiguous runs of seg)
+        starts = kept[:-1]
+        worst = np.maximum.reduceat(err, starts)
+        split = worst > tolerance
+        if not split.any():
+            return keep
+        # split every such interval at its first sample reaching the maximum
+        cand = np.flatnonzero((err == worst[seg]) & split[seg])
+        cseg = seg[cand]
+        keep[cand[np.concatenate(([True], cseg[1:] != cseg[:-1]))]] = True
+        # ... and at every other peak of the error over the tolerance
+        peak = np.zeros(n, dtype=bool)
+        peak[1:-1] = (err[1:-1] > tolerance) & (err[1:-1] > err[:-2]) & (err[1:-1] >= err[2:])
+        keep |= peak
+
+
+def decimate_channel(frames, values, tolerance):
+    """Reduce one channel to its significant keys.
+
+    Returns (frames, values, interpolation) where interpolation holds
+    Keyframe.interpolation enum values: CONSTANT on holds (the next key has
+    the same value), LINEAR elsewhere. A channel that never moves by more
+    than tolerance collapses to a single key.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) and np.ptp(values) <= tolerance:
+        return frames[:1], values[:1], np.full(1, INTERPOLATION["CONSTANT"], dtype=np.int32)
+    keep = rdp_mask(frames, values, tolerance)
+    f, v = frames[keep], values[keep]
+    interp = np.full(len(v), INTERPOLATION["LINEAR"], dtype=np.int32)
+    interp[:-1][v[1:] == v[:-1]] = INTERPOLATION["CONSTANT"]
+    return f, v, interp
@@ -2,5 +2,385 @@
 gcodedata helpers for path_follower
 Adapted from: https://github.com/TanmayChhatbar/blender_3d_print_animation/blob/main/gcodedata.py
 Original author: Tanmay Chhatbar
+
+Streaming G-code parser. The file is read in chunks of lines, each chunk is
+tokenised once and the modal state (G90/G91, G92 offsets, G28 homing,
+feedrate) is resolved with NumPy over whole runs of moves. The result is
+columnar: contiguous float64 X/Y/Z/F arrays plus the 1-based source line of
+every move, in machine coordinates (mm from home).
+
+G2/G3 arcs (I/J centre or R radius form, XY plane, helical Z) are
+tessellated into chords no further than arc_tolerance from the true arc,
+so tight arcs get more points per mm than gentle ones; each arc is capped
+at arc_max_segments chords.
 """
-# (No content: original gcodedata.py does not exist in source. Add helpers here if needed.)
+import os
+import re
+import numpy as np
+
+# Amount of text handed to readlines() per chunk
+CHUNK_BYTES = 1 << 22
+
+# Largest distance (mm) between an arc and the chords that replace it
+ARC_TOLERANCE_MM = 0.01
+# Upper bound on chords per G2/G3 move
+ARC_MAX_SEGMENTS = 128
+
+# Event kinds produced by the tokeniser
+_MOVE, _ABS, _REL, _SET, _HOME, _CW, _CCW = range(7)
+_KINDS = {"G0": _MOVE, "G00": _MOVE, "G1": _MOVE, "G01": _MOVE,
+          "G2": _CW, "G02": _CW, "G3": _CCW, "G03": _CCW,
+          "G90": _ABS, "G91": _REL, "G92": _SET, "G28": _HOME}
+# Token columns: X Y Z F, then the arc words I J R
+_WORD_COLS = {"X": 0, "Y": 1, "Z": 2, "F": 3, "I": 4, "J": 5, "R": 6,
+              "x": 0, "y": 1, "z": 2, "f": 3, "i": 4, "j": 5, "r": 6}
+_N_COLS = 7
+_NAN = float("nan")
+
+# Fallback for packed or spaced words ("G1X5Y3", "X 5"); G28 axes may have no number
+_CODE_RE = re.compile(r"\s*([GgMm]\d+)(.*)")
+_WORD_RE = re.compile(r"([A-Za-z])\s*([-+]?(?:\d+\.?\d*|\.\d+))?")
+_COLUMNS = ("x", "y", "z", "f", "line")
+# Host/firmware framing around a command: a leading line number, a trailing checksum
+_LINENO_RE = re.compile(r"[Nn]\d+")
+
+
+class ParserState:
+    """Modal machine state carried across chunks (and across runs).
+
+    pos: machine position in mm, offset: G92 shift (machine = work + offset),
+    relative: True after G91, feed: last F word in mm/min.
+    """
+
+    def __init__(self, pos=(0.0, 0.0, 0.0), offset=(0.0, 0.0, 0.0), relative=False, feed=0.0):
+        self.pos = np.array(pos, dtype=np.float64)
+        self.offset = np.array(offset, dtype=np.float64)
+        self.relative = bool(relative)
+        self.feed = float(feed)
+
+    def copy(self):
+        return ParserState(self.pos, self.offset, self.relative, self.feed)
+
+    def to_dict(self):
+        return {"pos": self.pos.tolist(), "offset": self.offset.tolist(),
+                "relative": self.relative, "feed": self.feed}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["pos"], d["offset"], d["relative"], d["feed"])
+
+
+class GcodePath:
+    """Columnar parse result, one row per move (per chord for arcs)."""
+
+    def __init__(self, x, y, z, f, line):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.f = f
+        self.line = line
+
+    def __len__(self):
+        return len(self.line)
+
+    @property
+    def xyz(self):
+        """(n, 3) float64 array of positions."""
+        return np.column_stack((self.x, self.y, self.z))
+
+
+def _words(rest, home):
+    """Slow path: regex-split the words after a command into a token row."""
+    row = [_NAN] * _N_COLS
+    for letter, num in _WORD_RE.findall(rest):
+        c = _WORD_COLS.get(letter)
+        if home:
+            if c is not None and c < 3:
+                row[c] = 0.0
+        elif c is not None and num:
+            row[c] = float(num)
+    if home and not rest.strip():
+        # A bare G28 homes every axis
+        row[:3] = [0.0, 0.0, 0.0]
+    return row
+
+
+def _tokenise(lines, first_line):
+    """Turn a list of text lines into event kinds, X/Y/Z/F/I/J/R words and line numbers.
+
+    Words are split on whitespace (what every slicer and science-jubilee
+    emit); anything unusual drops to the regex path. A leading N<line>
+    word and a trailing *<checksum> (sender logs) are stripped first.
+    """
+    kinds = []
+    rows = []
+    linenos = []
+    for n, raw in enumerate(lines, start=first_line):
+        text = raw.split(";", 1)[0]
+        if "*" in text:
+            text = text.split("*", 1)[0]
+        words = text.split()
+        if not words:
+            continue
+        if words[0][0] in "Nn":
+            m = _LINENO_RE.match(words[0])
+            if m:
+                rest = words[0][m.end():]
+                words = [rest] + words[1:] if rest else words[1:]
+                if not words:
+                    continue
+        kind = _KINDS.get(words[0].upper())
+        if kind is None:
+            m = _CODE_RE.match(words[0])
+            kind = _KINDS.get(m.group(1).upper()) if m else None
+            if kind is None:
+                continue
+            rest = m.group(2) + " " + " ".join(words[1:])
+            row = _words(rest, kind == _HOME)
+        elif kind == _ABS or kind == _REL:
+            row = None
+        elif kind == _HOME:
+            row = _words(" ".join(words[1:]), True)
+        else:
+            row = [_NAN] * _N_COLS
+            try:
+                for w in words[1:]:
+                    c = _WORD_COLS.get(w[0])
+                    if c is not None:
+                        row[c] = float(w[1:])
+            except ValueError:
+                row = _words(" ".join(words[1:]), False)
+        kinds.append(kind)
+        linenos.append(n)
+        rows.append(row or (_NAN,) * _N_COLS)
+
+    vals = np.array(rows, dtype=np.float64).reshape(-1, _N_COLS)
+    return np.array(kinds, dtype=np.int8), vals, np.array(linenos, dtype=np.int64)
+
+
+def _ffill(v, initial):
+    """Forward-fill NaNs in v, seeding the leading run with initial."""
+    idx = np.where(np.isnan(v), -1, np.arange(len(v)))
+    np.maximum.accumulate(idx, out=idx)
+    return np.where(idx >= 0, v[np.maximum(idx, 0)], initial)
+
+
+def _arc_centres(start, end, ij, r, ccw):
+    """XY centres of arcs from start to end, from I/J offsets or (where I
+    and J are both absent) the signed R word."""
+    centre = start[:, :2] + np.nan_to_num(ij)
+    use_r = np.isnan(ij).all(axis=1) & ~np.isnan(r)
+    if use_r.any():
+        d = end[use_r, :2] - start[use_r, :2]
+        chord = np.hypot(d[:, 0], d[:, 1])
+        rr = r[use_r]
+        # distance from the chord midpoint to the centre, over the chord;
+        # negative R takes the long way round, G3 mirrors the side
+        h = np.sqrt(np.maximum(4 * rr * rr - chord * chord, 0.0)) / np.maximum(chord, 1e-12)
+        h = np.where(ccw[use_r] != (rr < 0), h, -h)
+        centre[use_r, 0] = start[use_r, 0] + 0.5 * (d[:, 0] - d[:, 1] * h)
+        centre[use_r, 1] = start[use_r, 1] + 0.5 * (d[:, 1] + d[:, 0] * h)
+    return centre
+
+
+def _tessellate(out, linenos, arc, ij, r, ccw, before, tolerance, max_segments):
+    """Replace the arc rows of out (endpoints) with their chord points.
+
+    before is the position ahead of the first row; every other arc starts
+    at the row above it. Chords per arc follow from the sagitta: a chord
+    spanning angle a on radius rad deviates rad * (1 - cos(a / 2)).
+    """
+    rows = np.flatnonzero(arc)
+    if len(rows) == 0:
+        return out, linenos
+    prev = np.vstack((before.reshape(1, 3), out[:-1, :3]))
+    start, end = prev[rows], out[rows, :3]
+    centre = _arc_centres(start, end, ij, r, ccw)
+    r0 = np.hypot(start[:, 0] - centre[:, 0], start[:, 1] - centre[:, 1])
+    r1 = np.hypot(end[:, 0] - centre[:, 0], end[:, 1] - centre[:, 1])
+    a0 = np.arctan2(start[:, 1] - centre[:, 1], start[:, 0] - centre[:, 0])
+    a1 = np.arctan2(end[:, 1] - centre[:, 1], end[:, 0] - centre[:, 0])
+    sweep = np.where(ccw, np.mod(a1 - a0, 2 * np.pi), -np.mod(a0 - a1, 2 * np.pi))
+    # same start and end with I/J is a full circle
+    closed = np.all(np.abs(end[:, :2] - start[:, :2]) < 1e-9, axis=1) & ~np.isnan(ij).all(axis=1)
+    sweep = np.where(closed, np.where(ccw, 2 * np.pi, -2 * np.pi), sweep)
+
+    rad = np.maximum(r0, r1)
+    step = 2 * np.arccos(np.clip(1 - tolerance / np.maximum(rad, 1e-12), -1.0, 1.0))
+    n = np.ceil(np.abs(sweep) / np.maximum(step, 1e-12))
+    n = np.where(rad > 1e-9, np.clip(n, 1, max_segments), 1).astype(np.int64)
+
+    counts = np.ones(len(out), dtype=np.int64)
+    counts[rows] = n
+    expanded = np.repeat(out, counts, axis=0)
+    lines = np.repeat(linenos, counts)
+    first = np.cumsum(counts) - counts
+    # chord k of n ends at k / n of the way along the arc
+    k = np.arange(int(n.sum())) - np.repeat(np.cumsum(n) - n, n) + 1
+    t = k / np.repeat(n, n).astype(np.float64)
+    arc_of = np.repeat(np.arange(len(rows)), n)
+    ang = a0[arc_of] + sweep[arc_of] * t
+    radius = r0[arc_of] + (r1 - r0)[arc_of] * t
+    dest = np.repeat(first[rows], n) + k - 1
+    expanded[dest, 0] = centre[arc_of, 0] + radius * np.cos(ang)
+    expanded[dest, 1] = centre[arc_of, 1] + radius * np.sin(ang)
+    expanded[dest, 2] = start[arc_of, 2] + (end - start)[arc_of, 2] * t
+    # land exactly on the commanded endpoint
+    expanded[first[rows] + n - 1, :3] = end
+    return expanded, lines
+
+
+def _resolve(kinds, vals, linenos, state, arc_tolerance=ARC_TOLERANCE_MM, arc_max_segments=ARC_MAX_SEGMENTS):
+    """Resolve modal state for one tokenised chunk; updates state in place."""
+    is_home = kinds == _HOME
+    is_arc = (kinds == _CW) | (kinds == _CCW)
+    before = state.pos.copy()
+    # G28 only produces a row when it actually moves X/Y/Z
+    emits = (kinds == _MOVE) | is_arc | (is_home & ~np.isnan(vals[:, :3]).all(axis=1))
+    row_of = np.cumsum(emits) - 1
+    out = np.empty((int(emits.sum()), 4))
+
+    # Distance mode in force at every event; only real changes matter
+    is_mode = (kinds == _ABS) | (kinds == _REL)
+    mode = _ffill(np.where(is_mode, kinds == _REL, np.nan), float(state.relative)).astype(bool)
+    prev_mode = np.concatenate(([state.relative], mode[:-1]))
+    control = np.flatnonzero((kinds == _SET) | is_home | (is_mode & (mode != prev_mode)))
+
+    start = 0
+    for stop in list(control) + [len(kinds)]:
+        moves = np.flatnonzero((kinds[start:stop] == _MOVE) | is_arc[start:stop]) + start
+        if len(moves):
+            rows = row_of[moves]
+            v = vals[moves, :3]
+            if state.relative:
+                seg = state.pos + np.cumsum(np.nan_to_num(v), axis=0)
+            else:
+                seg = np.column_stack([_ffill(v[:, a] + state.offset[a], state.pos[a]) for a in range(3)])
+            out[rows, :3] = seg
+            state.pos = seg[-1].copy()
+        if stop == len(kinds):
+            break
+        k = kinds[stop]
+        v = vals[stop, :3]
+        given = ~np.isnan(v)
+        if k == _SET:
+            # machine position is unchanged; work coordinates are renamed
+            state.offset[given] = state.pos[given] - v[given]
+        elif k == _HOME:
+            state.pos[given] = 0.0
+            state.offset[given] = 0.0
+            if given.any():
+                out[row_of[stop], :3] = state.pos
+        else:
+            state.relative = bool(k == _REL)
+        start = stop + 1
+
+    if len(out):
+        feed = _ffill(vals[emits, 3], state.feed)
+        out[:, 3] = feed
+        state.feed = float(feed[-1])
+    arc = is_arc[emits]
+    return _tessellate(out, linenos[emits], arc, vals[emits][arc, 4:6], vals[emits][arc, 6],
+                       kinds[emits][arc] == _CCW, before, arc_tolerance, arc_max_segments)
+
+
+def _start_row(state):
+    return np.concatenate((state.pos, [state.feed])).reshape(1, 4), np.zeros(1, dtype=np.int64)
+
+
+def _finish(blocks, lines):
+    if blocks:
+        data = np.concatenate(blocks)
+        line = np.concatenate(lines)
+    else:
+        data = np.empty((0, 4))
+        line = np.empty(0, dtype=np.int64)
+    return GcodePath(*(np.ascontiguousarray(data[:, c]) for c in range(4)), line)
+
+
+def parse_lines(lines, state=None, first_line=1, include_start=True,
+                arc_tolerance=ARC_TOLERANCE_MM, arc_max_segments=ARC_MAX_SEGMENTS):
+    """Parse an in-memory sequence of G-code lines into a GcodePath."""
+    state = ParserState() if state is None else state
+    blocks, linecols = [], []
+    if include_start:
+        b, l = _start_row(state)
+        blocks.append(b)
+        linecols.append(l)
+    out, ln = _resolve(*_tokenise(list(lines), first_line), state, arc_tolerance, arc_max_segments)
+    blocks.append(out)
+    linecols.append(ln)
+    return _finish(blocks, linecols)
+
+
+def _line_chunks(path, chunk_bytes, end=None):
+    """Lists of text lines from path, about chunk_bytes at a time.
+
+    With end set, only the first end bytes are read (end should fall just
+    past a newline, so a line still being written is left out).
+    """
+    with open(path, "rb") as f:
+        carry = b""
+        left = end
+        while left is None or left > 0:
+            data = f.read(chunk_bytes if left is None else min(chunk_bytes, left))
+            if not data:
+                break
+            if left is not None:
+                left -= len(data)
+            data = carry + data
+            cut = data.rfind(b"\n") + 1
+            carry = data[cut:]
+            if cut:
+                yield data[:cut - 1].decode("utf-8", errors="replace").split("\n")
+        if carry:
+            yield [carry.decode("utf-8", errors="replace")]
+
+
+def parse_gcode(path, state=None, chunk_bytes=CHUNK_BYTES, spill_prefix=None, include_start=True,
+                arc_tolerance=ARC_TOLERANCE_MM, arc_max_segments=ARC_MAX_SEGMENTS, end=None):
+    """Stream-parse a G-code file into a GcodePath.
+
+    Only one chunk of text is held at a time. With spill_prefix set, each
+    chunk's columns are appended to '<spill_prefix>.<column>' raw files and
+    the result holds read-only memmaps, so the output need not fit in RAM
+    either. With end set, only the first end bytes of the file are parsed.
+    """
+    state = ParserState() if state is None else state
+    blocks, linecols = [], []
+    spills = None
+    if spill_prefix is not None:
+        spills = {c: open(f"{spill_prefix}.{c}", "wb") for c in _COLUMNS}
+
+    def emit(data, line):
+        if spills is None:
+            blocks.append(data)
+            linecols.append(line)
+            return
+        for c, name in enumerate(_COLUMNS[:4]):
+            spills[name].write(np.ascontiguousarray(data[:, c], dtype="<f8").tobytes())
+        spills["line"].write(line.astype("<i8").tobytes())
+
+    try:
+        if include_start:
+            emit(*_start_row(state))
+        first_line = 1
+        for lines in _line_chunks(path, chunk_bytes, end):
+            emit(*_resolve(*_tokenise(lines, first_line), state, arc_tolerance, arc_max_segments))
+            first_line += len(lines)
+    finally:
+        if spills is not None:
+            for fh in spills.values():
+                fh.close()
+
+    if spills is None:
+        return _finish(blocks, linecols)
+    cols = []
+    for name in _COLUMNS:
+        fn = f"{spill_prefix}.{name}"
+        dtype = "<i8" if name == "line" else "<f8"
+        if os.path.getsize(fn) == 0:
+            cols.append(np.empty(0, dtype=dtype))
+        else:
+            cols.append(np.memmap(fn, dtype=dtype, mode="r"))
+    return GcodePath(*cols)
@@ -0,0 +1,144 @@
+"""
+Bulk keyframe writer.
+
+Instead of one keyframe_insert() per point, the location F-curves are created
+directly, pre-sized with keyframe_points.add(n) and filled with a single
+foreach_set() per attribute. Nothing here imports bpy: the caller passes the
+object and bpy.data.actions, so the same code runs against the fake bpy in
+benchmarks/ on machines without Blender.
+"""
+import numpy as np
+
+# Keyframe.interpolation enum values as seen by foreach_set()
+INTERPOLATION = {"CONSTANT": 0, "LINEAR": 1, "BEZIER": 2}
+INTERPOLATION_NAMES = {v: k for k, v in INTERPOLATION.items()}
+
+
+def ensure_action(obj, actions):
+    """Return obj's action, creating one (and its slot on Blender >= 4.4) if needed."""
+    ad = obj.animation_data or obj.animation_data_create()
+    if ad.action is None:
+        ad.action = actions.new(f"{obj.name}Action")
+    action = ad.action
+    if hasattr(action, "slots") and getattr(ad, "action_slot", None) is None:
+        ad.action_slot = action.slots.new(id_type='OBJECT', name=obj.name)
+    return action
+
+
+def _fcurves(obj, action):
+    """The F-curve collection for obj: legacy action.fcurves or the slot's channelbag."""
+    if hasattr(action, "layers"):
+        from bpy_extras import anim_utils
+        return anim_utils.action_ensure_channelbag_for_slot(action, obj.animation_data.action_slot).fcurves
+    return action.fcurves
+
+
+def write_fcurve(fcurves, data_path, index, frames, values, interpolation="LINEAR"):
+    """Replace (or create) one F-curve with len(frames) keys in bulk.
+
+    interpolation is a name from INTERPOLATION or a per-key array of its values.
+    """
+    fc = fcurves.find(data_path, index=index)
+    if fc is not None:
+        fcurves.remove(fc)
+    fc = fcurves.new(data_path, index=index)
+    n = len(frames)
+    co = np.empty((n, 2), dtype=np.float32)
+    co[:, 0] = frames
+    co[:, 1] = values
+    kps = fc.keyframe_points
+    kps.add(n)
+    kps.foreach_set("co", co.ravel())
+    if isinstance(interpolation, str):
+        interpolation = np.full(n, INTERPOLATION[interpolation], dtype=np.int32)
+    kps.foreach_set("interpolation", np.asarray(interpolation, dtype=np.int32))
+    fc.update()
+    return fc
+
+
+def append_fcurve(fcurves, data_path, index, frames, values, interpolation="LINEAR"):
+    """Extend an F-curve past its last key.
+
+    frames[0] is normally the curve's current last key: it only takes
+    interpolation[0] (it now leads into the new keys) and the remaining keys
+    are added after it. If the curve ends earlier (a hold decimated away),
+    every key is added. foreach_set() only takes whole collections, so when
+    the curve already holds more keys than are added, the new ones are set
+    one by one; otherwise the whole curve is rewritten in bulk. Either way
+    the cost follows the number of new keys.
+    """
+    fc = fcurves.find(data_path, index=index)
+    if fc is None or len(fc.keyframe_points) == 0:
+        return write_fcurve(fcurves, data_path, index, frames, values, interpolation)
+    kps = fc.keyframe_points
+    n = len(frames)
+    if isinstance(interpolation, str):
+        interpolation = np.full(n, INTERPOLATION[interpolation], dtype=np.int32)
+    interpolation = np.asarray(interpolation, dtype=np.int32)
+    n_old = len(kps)
+    last = kps[n_old - 1]
+    skip = 1 if last.co[0] >= frames[0] else 0
+    k = n - skip
+
+    if k < n_old:
+        if skip:
+            last.interpolation = INTERPOLATION_NAMES[int(interpolation[0])]
+        kps.add(k)
+        new = zip(frames[skip:].tolist(), np.asarray(values[skip:], dtype=np.float64).tolist(),
+                  interpolation[skip:].tolist())
+        for i, (f, v, it) in enumerate(new, start=n_old):
+            kp = kps[i]
+            kp.co = (f, v)
+            kp.interpolation = INTERPOLATION_NAMES[it]
+    else:
+        co_old = np.empty(2 * n_old, dtype=np.float32)
+        kps.foreach_get("co", co_old)
+        interp_old = np.empty(n_old, dtype=np.int32)
+        kps.foreach_get("interpolation", interp_old)
+        if skip:
+            interp_old[-1] = interpolation[0]
+        co = np.empty((k, 2), dtype=np.float32)
+        co[:, 0] = frames[skip:]
+        co[:, 1] = values[skip:]
+        kps.add(k)
+        kps.foreach_set("co", np.concatenate((co_old, co.ravel())))
+        kps.foreach_set("interpolation", np.concatenate((interp_old, interpolation[skip:])))
+    fc.update()
+    return fc
+
+
+def last_key_frame(obj, index):
+    """Frame of the last location key on one channel of obj, or None."""
+    ad = obj.animation_data
+    if ad is None or ad.action is None:
+        return None
+    fc = _fcurves(obj, ad.action).find("location", index=index)
+    if fc is None or len(fc.keyframe_points) == 0:
+        return None
+    return fc.keyframe_points[-1].co[0]
+
+
+def key_property(obj, actions, data_path, index, frames, values, interpolation="LINEAR"):
+    """Write one channel of any animatable vector property of obj."""
+    action = ensure_action(obj, actions)
+    return write_fcurve(_fcurves(obj, action), data_path, index, frames, values, interpolation)
+
+
+def key_channel(obj, actions, index, frames, values, interpolation="LINEAR"):
+    """Write one location channel (0=X, 1=Y, 2=Z) of obj."""
+    return key_property(obj, actions, "location", index, frames, values, interpolation)
+
+
+def append_channel(obj, actions, index, frames, values, interpolation="LINEAR"):
+    """Extend one location channel of obj (see append_fcurve)."""
+    action = ensure_action(obj, actions)
+    return append_fcurve(_fcurves(obj, action), "location", index, frames, values, interpolation)
+
+
+def key_location(obj, actions, frames, channels, interpolation="LINEAR"):
+    """Write location keys for obj.
+
+    channels maps a location index (0=X, 1=Y, 2=Z) to the values at frames.
+    """
+    for index, values in channels.items():
+        key_channel(obj, actions, index, frames, values, interpolation)
@@ -0,0 +1,254 @@
+"""
+Headless kinematic model of the Jubilee axis stack.
+
+Mirrors the empties in jubilee.blend: Z-axis on its own, and Y-axis ->
+X-axis -> XY-carriage parented on top of each other. Each empty keeps its
+rest transform (location, rotation/scale, parent inverse) and its Limit
+Location range; G-code drives one location channel of X-axis, Y-axis and
+Z-axis. Poses for any number of samples take a few array operations, so
+toolpaths can be checked, previewed and timed without Blender.
+
+Plain NumPy. spec_from_objects() reads a live scene; the caller passes
+bpy.data.objects, as in keyframes.py. Without Blender, load_model() reads
+the spec from the scene sidecar (scene_meta.py).
+"""
+import numpy as np
+
+# Machine axis -> (object, driven location channel, sign). Z is inverted:
+# G-code Z counts down from the Z-axis max limit (see animate_path.py)
+AXES = (("X-axis", 0, 1.0), ("Y-axis", 1, 1.0), ("Z-axis", 2, -1.0))
+# Empties of the model and their parents (None for scene roots)
+STACK = (("Z-axis", None), ("Y-axis", None), ("X-axis", "Y-axis"), ("XY-carriage", "X-axis"))
+# Blender units are metres, G-code is mm
+MM_PER_UNIT = 1000.0
+
+_IDENTITY = [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]]
+
+# Nominal 300 mm travel per axis with every empty at the origin; only used
+# when no snapshot of jubilee.blend is available
+DEFAULT_SPEC = {
+    "units": "m",
+    "links": [
+        {"name": "Z-axis", "parent": None, "min": [None, None, 0.0], "max": [None, None, 0.3]},
+        {"name": "Y-axis", "parent": None, "min": [None, 0.0, None], "max": [None, 0.3, None]},
+        {"name": "X-axis", "parent": "Y-axis", "min": [0.0, None, None], "max": [0.3, None, None]},
+        {"name": "XY-carriage", "parent": "X-axis"},
+    ],
+}
+
+
+class Link:
+    """One empty: rest transform relative to its parent plus location limits.
+
+    parent_matrix is matrix_parent_inverse (pre-multiplied by the parent's
+    world matrix when the parent is not part of the model). min/max hold
+    None where Limit Location leaves a channel free.
+    """
+
+    def __init__(self, name, parent=None, location=(0.0, 0.0, 0.0), rotation=None,
+                 parent_matrix=None, min=(None, None, None), max=(None, None, None)):
+        self.name = name
+        self.parent = parent
+        self.location = np.asarray(location, dtype=np.float64)
+        self.rotation = np.eye(3) if rotation is None else np.asarray(rotation, dtype=np.float64)
+        self.parent_matrix = np.asarray(_IDENTITY if parent_matrix is None else parent_matrix,
+                                        dtype=np.float64)
+        self.min = list(min)
+        self.max = list(max)
+
+    def lower(self, channel):
+        """Like get_axis_min(): the min limit, 0.0 when unset."""
+        return 0.0 if self.min[channel] is None else float(self.min[channel])
+
+    def upper(self, channel):
+        """Like get_axis_max(): the max limit, 0.0 when unset."""
+        return 0.0 if self.max[channel] is None else float(self.max[channel])
+
+    def bounds(self, channel):
+        """(lo, hi) of a channel, +-inf where it is free."""
+        lo = -np.inf if self.min[channel] is None else float(self.min[channel])
+        hi = np.inf if self.max[channel] is None else float(self.max[channel])
+        return lo, hi
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "parent": self.parent,
+            "location": self.location.tolist(),
+            "rotation": self.rotation.tolist(),
+            "parent_matrix": self.parent_matrix.tolist(),
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class Kinematics:
+    """Batched forward kinematics of the axis stack.
+
+    Only translations are animated, so every empty's world rotation is
+    constant and its world position is affine in the driven channels.
+    """
+
+    def __init__(self, links):
+        self.links = {}
+        pending = list(links)
+        # Parents first
+        while pending:
+            ready = [l for l in pending if l.parent is None or l.parent in self.links]
+            if not ready:
+                raise ValueError(f"Unresolved parents: {[l.parent for l in pending]}")
+            for link in ready:
+                self.links[link.name] = link
+                pending.remove(link)
+
+        # world_t = parent_t + A @ location + b, world rotation W (constant)
+        self._rot, self._a, self._b = {}, {}, {}
+        for name, link in self.links.items():
+            w_parent = np.eye(3) if link.parent is None else self._rot[link.parent]
+            self._a[name] = w_parent @ link.parent_matrix[:3, :3]
+            self._b[name] = w_parent @ link.parent_matrix[:3, 3]
+            self._rot[name] = self._a[name] @ link.rotation
+
+        # (axis, link, channel, origin, sign) of the axes present in the model
+        self.axes = []
+        for axis, (name, channel, sign) in enumerate(AXES):
+            link = self.links.get(name)
+            if link is None:
+                continue
+            origin = link.lower(channel) if sign > 0 else link.upper(channel)
+            self.axes.append((axis, link, channel, origin, sign))
+
+    @classmethod
+    def from_spec(cls, spec):
+        return cls([Link(**d) for d in spec["links"]])
+
+    def to_spec(self):
+        return {"units": "m", "links": [l.to_dict() for l in self.links.values()]}
+
+    @classmethod
+    def from_objects(cls, objects):
+        """Model of the live scene (objects is bpy.data.objects)."""
+        return cls.from_spec(spec_from_objects(objects))
+
+    def origin(self):
+        """(3,) channel value at machine zero per axis: X/Y min, Z max (Blender units)."""
+        out = np.zeros(3)
+        for axis, _, _, origin, _ in self.axes:
+            out[axis] = origin
+        return out
+
+    def travel_mm(self):
+        """(lo, hi) machine coordinates in mm the limits allow, per axis."""
+        lo = np.full(3, -np.inf)
+        hi = np.full(3, np.inf)
+        for axis, link, channel, origin, sign in self.axes:
+            a, b = ((v - origin) * sign * MM_PER_UNIT for v in link.bounds(channel))
+            lo[axis], hi[axis] = min(a, b) + 0.0, max(a, b) + 0.0  # no -0.0
+        return lo, hi
+
+    def axis_locations(self, axis, mm):
+        """Channel values of one machine axis (0=X, 1=Y, 2=Z) for positions in mm."""
+        for a, _, _, origin, sign in self.axes:
+            if a == axis:
+                return origin + sign * np.asarray(mm, dtype=np.float64) / MM_PER_UNIT
+        raise KeyError(f"Axis {'XYZ'[axis]} is not in the model")
+
+    def locations(self, xyz_mm):
+        """Driven channel values (n, 3) for machine positions (n, 3) in mm."""
+        xyz_mm = np.asarray(xyz_mm, dtype=np.float64)
+        out = np.zeros(xyz_mm.shape)
+        for axis, *_ in self.axes:
+            out[:, axis] = self.axis_locations(axis, xyz_mm[:, axis])
+        return out
+
+    def machine_xyz(self, locations):
+        """Inverse of locations()."""
+        locations = np.asarray(locations, dtype=np.float64)
+        out = np.zeros(locations.shape)
+        for axis, _, _, origin, sign in self.axes:
+            out[:, axis] = (locations[:, axis] - origin) * sign * MM_PER_UNIT
+        return out
+
+    def clamp(self, locations):
+        """Apply the Limit Location constraints, as Blender would."""
+        out = np.array(locations, dtype=np.float64)
+        for axis, link, channel, _, _ in self.axes:
+            np.clip(out[:, axis], *link.bounds(channel), out=out[:, axis])
+        return out
+
+    def world_positions(self, xyz_mm, names=None, clamp=True):
+        """World positions (n, 3) of each empty for machine positions (n, 3) in mm.
+
+        Returns {name: positions} for names (default: every empty).
+        """
+        locations = self.locations(xyz_mm)
+        if clamp:
+            locations = self.clamp(locations)
+        n = len(locations)
+        driven = {link.name: (axis, channel) for axis, link, channel, _, _ in self.axes}
+        pos = {}
+        for name, link in self.links.items():
+            base = self._a[name] @ link.location + self._b[name]
+            p = np.broadcast_to(base, (n, 3))
+            if link.parent is not None:
+                p = pos[link.parent] + base
+            if name in driven:
+                axis, channel = driven[name]
+                delta = locations[:, axis] - link.location[channel]
+                p = p + delta[:, None] * self._a[name][:, channel]
+            pos[name] = p
+        names = list(self.links) if names is None else names
+        return {name: np.ascontiguousarray(pos[name]) for name in names}
+
+    def world_rotation(self, name):
+        """Constant (3, 3) world rotation/scale of an empty."""
+        return self._rot[name]
+
+
+def _matrix(m):
+    return [[float(v) for v in row] for row in m]
+
+
+def spec_from_objects(objects):
+    """Snapshot the STACK empties of a scene as a spec dict."""
+    links = []
+    modelled = {name for name, _ in STACK if objects.get(name) is not None}
+    for name, _ in STACK:
+        obj = objects.get(name)
+        if obj is None:
+            continue
+        parent_matrix = np.array(_matrix(obj.matrix_parent_inverse))
+        parent = obj.parent.name if obj.parent is not None else None
+        if parent is not None and parent not in modelled:
+            parent_matrix = np.array(_matrix(obj.parent.matrix_world)) @ parent_matrix
+            parent = None
+        lo, hi = [None] * 3, [None] * 3
+        for c in obj.constraints:
+            if c.type == 'LIMIT_LOCATION':
+                for i, a in enumerate("xyz"):
+                    if getattr(c, f"use_min_{a}"):
+                        lo[i] = float(getattr(c, f"min_{a}"))
+                    if getattr(c, f"use_max_{a}"):
+                        hi[i] = float(getattr(c, f"max_{a}"))
+                break
+        links.append({
+            "name": name,
+            "parent": parent,
+            "location": [float(v) for v in obj.location],
+            "rotation": np.array(_matrix(obj.matrix_basis))[:3, :3].tolist(),
+            "parent_matrix": parent_matrix.tolist(),
+            "min": lo,
+            "max": hi,
+        })
+    return {"units": "m", "links": links}
+
+
+def load_model(blend_file=None):
+    """Model from the scene sidecar of blend_file (default jubilee.blend), or
+    the nominal DEFAULT_SPEC if there is none."""
+    from scene_meta import load_scene_meta, BLEND_PATH
+    meta = load_scene_meta(blend_file or BLEND_PATH)
+    if meta is not None:
+        return Kinematics.from_spec(meta["kinematics"])
+    print("[kinematics] No scene metadata, using nominal 300 mm travel.")
+    return Kinematics.from_spec(DEFAULT_SPEC)
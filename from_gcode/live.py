@@ -0,0 +1,63 @@
+"""
+Live mode: the axes follow G-code as a sender streams it.
+
+    blender jubilee.blend --python from_gcode/live.py
+
+then point a sender (science-jubilee, or live_sender.py for testing) at
+127.0.0.1:7410. A bpy.app.timers callback pumps livefeed.LiveFeed once per
+viewport refresh and moves the empties to the newest position. Needs the
+interactive UI: timers do not run in background (-b) mode.
+"""
+import bpy
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from kinematics import Kinematics, MM_PER_UNIT
+from livefeed import LiveFeed, PORT, PUMP_INTERVAL
+from utils import load_config
+
+# Everything the timer needs, filled by start(). Kept in the driver namespace
+# so running the script again closes the previous listener and unregisters
+# the previous run's timer ("pump"; a reload defines a new _pump function).
+_state = bpy.app.driver_namespace.setdefault("jubilee_live", {})
+
+
+def _apply(pos):
+    for obj, index, axis, origin, sign in _state["drives"]:
+        obj.location[index] = origin + sign * float(pos[axis]) / MM_PER_UNIT
+
+
+def _pump():
+    feed = _state.get("feed")
+    if feed is None:
+        return None
+    feed.pump(_apply)
+    return PUMP_INTERVAL
+
+
+def start(port=PORT):
+    """Listen for G-code and drive the axes from it (clears their animation)."""
+    stop()
+    model = Kinematics.from_objects(bpy.data.objects)
+    drives = []
+    for axis, link, index, origin, sign in model.axes:
+        obj = bpy.data.objects[link.name]
+        obj.animation_data_clear()
+        drives.append((obj, index, axis, origin, sign))
+    _state.update(feed=LiveFeed(port=port), drives=drives, pump=_pump)
+    bpy.app.timers.register(_pump, first_interval=PUMP_INTERVAL, persistent=True)
+
+
+def stop():
+    feed = _state.pop("feed", None)
+    if feed is not None:
+        feed.close()
+    pump = _state.pop("pump", None)
+    if pump is not None and bpy.app.timers.is_registered(pump):
+        bpy.app.timers.unregister(pump)
+    _state.clear()
+
+
+if __name__ == "__main__":
+    start(int(load_config().get("live_port", PORT)))
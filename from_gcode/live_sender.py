@@ -0,0 +1,101 @@
+"""
+Stand-in for a live G-code sender (science-jubilee's transport), for testing
+live mode without a machine.
+
+    python live_sender.py [gcode] [--port N] [--rate LINES_PER_S] [--window N] [--check]
+
+Streams the file line by line to the listener (live.py in Blender, or
+`python livefeed.py` headless) and times each line from send to "ok".
+--rate paces the lines (0 sends as fast as the socket takes them), --window
+caps unacknowledged lines like a firmware planner buffer, and --check exits
+with status 1 when the 95th percentile misses the latency target.
+"""
+import sys
+import time
+import socket
+import argparse
+import threading
+import numpy as np
+
+from livefeed import HOST, PORT, LATENCY_TARGET_MS
+
+
+def send(lines, host=HOST, port=PORT, rate=0.0, window=0):
+    """Send lines and return per-line latency in ms (ack time - send time)."""
+    n = len(lines)
+    sent = np.full(n, np.nan)
+    acked = np.full(n, np.nan)
+    done = threading.Event()
+    progress = threading.Condition()
+    state = {"acked": 0}
+
+    sock = socket.create_connection((host, port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def read_acks():
+        buf = b""
+        while state["acked"] < n:
+            try:
+                data = sock.recv(4096)
+            except OSError:
+                break
+            if not data:
+                break
+            buf += data
+            *replies, buf = buf.split(b"\n")
+            now = time.perf_counter()
+            for r in replies:
+                if r.startswith(b"ok "):
+                    upto = min(int(r[3:]), n)
+                    with progress:
+                        acked[state["acked"]:upto] = now
+                        state["acked"] = max(state["acked"], upto)
+                        progress.notify_all()
+        done.set()
+
+    reader = threading.Thread(target=read_acks, daemon=True)
+    reader.start()
+    t0 = time.perf_counter()
+    for i, line in enumerate(lines):
+        if window:
+            with progress:
+                progress.wait_for(lambda: i - state["acked"] < window or done.is_set())
+        if rate:
+            delay = t0 + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        sent[i] = time.perf_counter()
+        sock.sendall(line.rstrip("\r\n").encode() + b"\n")
+    done.wait(timeout=10.0)
+    sock.close()
+    return (acked - sent) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="live_sender.py")
+    parser.add_argument("gcode", nargs="?", default="path.gcode")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--rate", type=float, default=0.0, help="lines per second (0: unpaced)")
+    parser.add_argument("--window", type=int, default=0, help="max unacknowledged lines (0: no limit)")
+    parser.add_argument("--check", action="store_true", help="fail if p95 latency misses the target")
+    args = parser.parse_args()
+
+    with open(args.gcode, "r", errors="replace") as f:
+        lines = f.readlines()
+    t0 = time.perf_counter()
+    lat = send(lines, args.host, args.port, args.rate, args.window)
+    elapsed = time.perf_counter() - t0
+    got = lat[np.isfinite(lat)]
+    if len(got) == 0:
+        print("[sender] No acknowledgements received.")
+        sys.exit(1)
+    p50, p95, worst = np.percentile(got, [50, 95, 100])
+    print(f"[sender] {len(lines)} lines in {elapsed:.2f} s, {len(got)} acked; latency "
+          f"p50 {p50:.1f} ms, p95 {p95:.1f} ms, max {worst:.1f} ms (target {LATENCY_TARGET_MS:g} ms)")
+    if args.check and (p95 > LATENCY_TARGET_MS or len(got) < len(lines)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
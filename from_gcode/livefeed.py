@@ -0,0 +1,158 @@
+"""
+Live G-code feed: a local TCP listener that turns G-code lines into machine
+positions as they arrive.
+
+LiveFeed never blocks. Each pump() accepts connections, reads what is
+waiting (up to MAX_BYTES_PER_PUMP), parses the complete lines with the
+streaming parser and hands only the newest position to the caller. Moves
+that arrived during the same pump are coalesced into that one pose. The
+sender then gets "ok <line>" for the last line included. Anything past the
+read budget stays in the socket, so a sender that outruns the twin is held
+back by TCP flow control rather than by a growing queue here.
+
+The budget keeps a pump to about half a 60 Hz frame (32 KB of moves parse
+in ~9 ms), which caps the drain at roughly 2 MB/s. The 50 ms latency target
+therefore holds for senders that wait for acks (a planner window) or pace
+below that rate. An unpaced burst queues in the socket, and its latency grows
+with the burst: a 20,000-line flood sees a p95 of about 250 ms.
+
+Plain Python: live.py pumps it from a bpy.app.timers callback inside
+Blender. `python livefeed.py` pumps it headless, which is what
+live_sender.py is tested against.
+"""
+import sys
+import time
+import socket
+import selectors
+import numpy as np
+
+from gcodedata import parse_lines, ParserState
+
+HOST = "127.0.0.1"
+PORT = 7410
+# One pump per viewport refresh at 60 Hz
+PUMP_INTERVAL = 1 / 60
+# Read budget per pump, sized to keep a pump within half a frame; the rest
+# waits in the socket (backpressure)
+MAX_BYTES_PER_PUMP = 1 << 15
+# End-to-end target, line sent -> pose applied -> ack received
+LATENCY_TARGET_MS = 50.0
+
+
+class LiveFeed:
+    """Non-blocking G-code listener with a modal parser state shared by all senders."""
+
+    def __init__(self, host=HOST, port=PORT, state=None):
+        self.state = ParserState() if state is None else state
+        self.server = socket.create_server((host, port))
+        self.server.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.server, selectors.EVENT_READ)
+        # socket -> [pending bytes, lines received so far]
+        self.clients = {}
+        self.stats = {"lines": 0, "moves": 0, "poses": 0, "coalesced": 0, "pumps": 0, "max_pump_ms": 0.0}
+        print(f"[live] Listening on {host}:{port}")
+
+    def _accept(self):
+        conn, addr = self.server.accept()
+        conn.setblocking(False)
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.selector.register(conn, selectors.EVENT_READ)
+        self.clients[conn] = [bytearray(), 0]
+        print(f"[live] Sender connected from {addr[0]}:{addr[1]}")
+
+    def _drop(self, conn):
+        self.selector.unregister(conn)
+        del self.clients[conn]
+        conn.close()
+        print("[live] Sender disconnected")
+
+    def pump(self, apply):
+        """Read and parse what has arrived, call apply(pos) once with the
+        newest machine position (mm) if anything moved, then ack the senders.
+
+        Returns the number of moves parsed.
+        """
+        t0 = time.perf_counter()
+        budget = MAX_BYTES_PER_PUMP
+        batch = []
+        for key, _ in self.selector.select(timeout=0):
+            conn = key.fileobj
+            if conn is self.server:
+                self._accept()
+                continue
+            if budget <= 0:
+                continue
+            try:
+                data = conn.recv(budget)
+            except (BlockingIOError, InterruptedError):
+                continue
+            except OSError:
+                data = b""
+            if not data:
+                self._drop(conn)
+                continue
+            budget -= len(data)
+            buf = self.clients[conn][0]
+            buf += data
+            end = buf.rfind(b"\n")
+            if end < 0:
+                continue
+            lines = buf[:end].decode("utf-8", errors="replace").split("\n")
+            del buf[:end + 1]
+            self.clients[conn][1] += len(lines)
+            batch.append((conn, lines))
+
+        n_moves = 0
+        if batch:
+            lines = [l for _, ls in batch for l in ls]
+            path = parse_lines(lines, state=self.state, include_start=False)
+            n_moves = len(path)
+            self.stats["lines"] += len(lines)
+            self.stats["moves"] += n_moves
+            if n_moves:
+                apply(self.state.pos.copy())
+                self.stats["poses"] += 1
+                self.stats["coalesced"] += n_moves - 1
+            for conn, _ in batch:
+                try:
+                    conn.sendall(f"ok {self.clients[conn][1]}\n".encode())
+                except OSError:
+                    self._drop(conn)
+
+        self.stats["pumps"] += 1
+        ms = (time.perf_counter() - t0) * 1000
+        self.stats["max_pump_ms"] = max(self.stats["max_pump_ms"], ms)
+        return n_moves
+
+    def close(self):
+        for conn in list(self.clients):
+            self._drop(conn)
+        self.selector.unregister(self.server)
+        self.server.close()
+        print(f"[live] {self.stats}")
+
+
+def main():
+    # livefeed.py [port]: headless stand-in for the Blender side
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    feed = LiveFeed(port=port)
+    pose = {}
+
+    def apply(pos):
+        pose["pos"] = pos
+
+    try:
+        while True:
+            feed.pump(apply)
+            time.sleep(PUMP_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        feed.close()
+        if "pos" in pose:
+            print(f"[live] Last position {np.round(pose['pos'], 3).tolist()} mm")
+
+
+if __name__ == "__main__":
+    main()
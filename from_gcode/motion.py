@@ -0,0 +1,142 @@
+"""
+Feedrate- and acceleration-aware timing for parsed toolpaths.
+
+Every move gets a trapezoidal velocity profile: accelerate from its entry
+speed, cruise at the commanded feedrate (capped by the per-axis speed
+limits), decelerate into the next move. Junction speeds follow the
+RepRapFirmware "jerk" model (maximum instantaneous per-axis speed change,
+M566), and the classic forward/backward reachability passes are done as
+min-plus prefix scans so the whole plan is vectorized over moves.
+
+Units: mm, s. Feedrates in the G-code are mm/min.
+"""
+import numpy as np
+
+# Jubilee defaults (RepRapFirmware config.g: M201, M566, M203), per X/Y/Z axis
+DEFAULT_ACCEL = (1000.0, 1000.0, 100.0)      # mm/s^2
+DEFAULT_JERK = (15.0, 15.0, 1.0)             # mm/s
+DEFAULT_MAX_SPEED = (216.0, 216.0, 16.0)     # mm/s
+DEFAULT_FEED = 3000.0                        # mm/min, used until the first F word
+
+
+class MotionPlan:
+    """Per-move velocity profiles for a polyline.
+
+    Only moves with non-zero length are planned; `vertex` maps each of them
+    back to the index of its starting vertex in the input polyline.
+    """
+
+    def __init__(self, start, unit, length, accel, v0, vp, v1, vertex):
+        self.start = start
+        self.unit = unit
+        self.length = length
+        self.accel = accel
+        self.v0 = v0
+        self.vp = vp
+        self.v1 = v1
+        self.vertex = vertex
+        self.t_acc = (vp - v0) / accel
+        self.t_dec = (vp - v1) / accel
+        d_acc = (vp ** 2 - v0 ** 2) / (2 * accel)
+        d_dec = (vp ** 2 - v1 ** 2) / (2 * accel)
+        cruise = np.maximum(length - d_acc - d_dec, 0.0)
+        self.t_cruise = np.divide(cruise, vp, out=np.zeros_like(vp), where=vp > 0)
+        duration = self.t_acc + self.t_cruise + self.t_dec
+        self.t_start = np.concatenate(([0.0], np.cumsum(duration)))[:-1]
+        self.duration = duration
+
+    def __len__(self):
+        return len(self.length)
+
+    @property
+    def total_time(self):
+        """Estimated job time in seconds."""
+        return float(self.t_start[-1] + self.duration[-1])
+
+
+def plan_motion(xyz, feed, accel=DEFAULT_ACCEL, jerk=DEFAULT_JERK,
+                max_speed=DEFAULT_MAX_SPEED, default_feed=DEFAULT_FEED):
+    """Build a MotionPlan for an (n, 3) polyline with at least one vertex.
+
+    feed[i] is the feedrate (mm/min) in force for the move ending at vertex i;
+    zeros (no F seen yet) fall back to default_feed.
+    """
+    xyz = np.asarray(xyz, dtype=np.float64)
+    feed = np.asarray(feed, dtype=np.float64)
+    accel = np.asarray(accel, dtype=np.float64)
+    jerk = np.asarray(jerk, dtype=np.float64)
+    max_speed = np.asarray(max_speed, dtype=np.float64)
+
+    delta = np.diff(xyz, axis=0)
+    length = np.linalg.norm(delta, axis=1)
+    keep = np.flatnonzero(length > 1e-9)
+    if len(keep) == 0:
+        # nothing moves: a single zero-length, zero-time move at the first vertex
+        zero = np.zeros(1)
+        return MotionPlan(xyz[:1], np.zeros((1, 3)), zero, np.ones(1), zero, zero, zero,
+                          np.zeros(1, dtype=np.int64))
+    delta, length = delta[keep], length[keep]
+    unit = delta / length[:, None]
+    au = np.abs(unit)
+
+    def axis_cap(limits, u):
+        # largest scalar s with s * u_i <= limits_i on every moving axis
+        with np.errstate(divide="ignore"):
+            return np.min(np.where(u > 1e-12, limits / np.maximum(u, 1e-12), np.inf), axis=1)
+
+    f = feed[keep + 1]
+    cruise = np.minimum(np.where(f > 0, f, default_feed) / 60.0, axis_cap(max_speed, au))
+    seg_accel = axis_cap(accel, au)
+
+    # Squared speed limits at the n+1 junctions; like the firmware, the path starts
+    # and stops at the jerk speed rather than from rest
+    j = np.empty(len(keep) + 1)
+    j[0] = min(axis_cap(jerk, au[:1])[0], cruise[0])
+    j[-1] = min(axis_cap(jerk, au[-1:])[0], cruise[-1])
+    j[1:-1] = np.minimum(axis_cap(jerk, np.abs(np.diff(unit, axis=0))),
+                         np.minimum(cruise[:-1], cruise[1:]))
+    j = j ** 2
+
+    # w_k <= w_{k-1} + 2 a L and w_k <= w_{k+1} + 2 a L as prefix scans:
+    # forward  w_k = P_k + min_{m<=k}(J_m - P_m)
+    # backward w_k = min_{m>=k}(J_m + P_m) - P_k
+    p = np.concatenate(([0.0], np.cumsum(2 * seg_accel * length)))
+    fwd = p + np.minimum.accumulate(j - p)
+    bwd = np.minimum.accumulate((j + p)[::-1])[::-1] - p
+    w = np.maximum(np.minimum(fwd, bwd), 0.0)
+    v = np.sqrt(w)
+    v0, v1 = v[:-1], v[1:]
+
+    # Peak speed: cruise if reachable, otherwise the triangle apex
+    apex = np.sqrt(np.maximum((2 * seg_accel * length + v0 ** 2 + v1 ** 2) / 2, 0.0))
+    vp = np.maximum(np.minimum(cruise, apex), np.maximum(v0, v1))
+    return MotionPlan(xyz[keep], unit, length, seg_accel, v0, vp, v1, keep)
+
+
+def sample_plan(plan, t):
+    """Positions along the plan at times t (seconds).
+
+    Returns (points, vertex) where vertex is the starting polyline vertex of
+    the move that each sample falls in.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    k = np.clip(np.searchsorted(plan.t_start, t, side="right") - 1, 0, len(plan) - 1)
+    tau = np.clip(t - plan.t_start[k], 0.0, plan.duration[k])
+    a, v0, vp, v1 = plan.accel[k], plan.v0[k], plan.vp[k], plan.v1[k]
+    t_acc, t_cruise = plan.t_acc[k], plan.t_cruise[k]
+
+    ta = np.minimum(tau, t_acc)
+    tc = np.clip(tau - t_acc, 0.0, t_cruise)
+    td = np.clip(tau - t_acc - t_cruise, 0.0, plan.t_dec[k])
+    d = v0 * ta + 0.5 * a * ta ** 2 + vp * tc + vp * td - 0.5 * a * td ** 2
+    d = np.minimum(d, plan.length[k])
+    return plan.start[k] + plan.unit[k] * d[:, None], plan.vertex[k]
+
+
+def sample_at_fps(plan, fps):
+    """One sample per rendered frame at the given fps, ending on the last pose."""
+    total = plan.total_time
+    t = np.arange(0.0, total, 1.0 / fps)
+    if len(t) == 0 or t[-1] < total:
+        t = np.append(t, total)
+    return sample_plan(plan, t)
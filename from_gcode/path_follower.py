@@ -3,64 +3,137 @@ path_follower.py
 Adapted from: https://github.com/TanmayChhatbar/blender_3d_print_animation/blob/main/path_follower.py
 Original author: Tanmay Chhatbar
 """
+import os
 import sys
 import numpy as np
 from utils import *
 from gcodedata import *
+from motion import plan_motion, sample_at_fps, DEFAULT_ACCEL, DEFAULT_JERK, DEFAULT_MAX_SPEED, DEFAULT_FEED
+from toolpath import write_toolpath, append_toolpath, read_toolpath, DEFAULT_PATH
+from tail import Checkpoint, load_checkpoint, read_new_lines, count_complete_lines
+from validate import check_travel
+from spans import Span
 
 def parse_locs(lines):
-    cur = [np.array([0.,0.,0.,0.])]
-    for line in lines:
-        # record all G0 and G1 moves
-        if line.startswith("G0") or line.startswith("G1"):
-            cur.append(find_coord(line, cur[-1]))
-    return cur
+    # (n, 4) array of X, Y, Z, F; row 0 is the start pose
+    p = parse_lines(lines)
+    return np.column_stack((p.x, p.y, p.z, p.f))
 
 def get_frame_locs(locs, dps):
-    locs_frame = [locs[0][0:3]]
-    pr_loc = locs[0]
-    dslp = 0.0
-    lenloc = len(locs)
-    i = 1
-    loc = locs[1]
-    pr_loc = locs[0]
-    while i <= lenloc:
-        cdd = dis(loc[0:3], pr_loc[0:3])
-        md = dps-dslp
-        if cdd < md:
-            dslp = dslp + cdd
-            if i == lenloc-1:
-                break
-            else:
-                i += 1
-            pr_loc = loc
-            loc = locs[i]
-        else:
-            nl = pr_loc[0:3] + (loc[0:3]-pr_loc[0:3])*md/cdd
-            dslp = 0.0
-            pr_loc = nl
-            locs_frame.append(nl)
-    return locs_frame
+    # one sample every dps mm of travel, plus the final pose;
+    # returns (points, index of the vertex starting each sample's segment)
+    xyz = np.asarray(locs, dtype=np.float64)[:, 0:3]
+    s = arc_length(xyz)
+    t = np.arange(0.0, s[-1], dps) if len(s) else np.zeros(0)
+    if len(s) and (len(t) == 0 or t[-1] < s[-1]):
+        t = np.append(t, s[-1])
+    return interp_polyline(xyz, s, t)
 
-def main():
-    if len(sys.argv) == 1:
-        fn = 'path.gcode'
+def get_timed_locs(locs, cfg):
+    # one sample per rendered frame, following the trapezoidal motion plan
+    plan = plan_motion(locs[:, 0:3], locs[:, 3],
+                       accel=cfg.get("axis_accel", DEFAULT_ACCEL),
+                       jerk=cfg.get("axis_jerk", DEFAULT_JERK),
+                       max_speed=cfg.get("axis_max_speed", DEFAULT_MAX_SPEED),
+                       default_feed=cfg.get("default_feed", DEFAULT_FEED))
+    fps = float(cfg.get("fps", 24))
+    frames, vertex = sample_at_fps(plan, fps)
+    print(f"[motion] Estimated job time {plan.total_time:.1f} s -> {len(frames)} frames at {fps:g} fps")
+    return frames, vertex
+
+def sample(locs, cfg, distance_per_step):
+    # (points, vertex) in the chosen sampling mode
+    if distance_per_step is None:
+        return get_timed_locs(locs, cfg)
+    return get_frame_locs(locs, distance_per_step)
+
+def arc_options(cfg):
+    # chord tolerance and cap for G2/G3 tessellation
+    return {"arc_tolerance": float(cfg.get("arc_tolerance_mm", ARC_TOLERANCE_MM)),
+            "arc_max_segments": int(cfg.get("arc_max_segments", ARC_MAX_SEGMENTS))}
+
+def sampling_mode(cfg, distance_per_step):
+    # everything that decides the samples, so a checkpoint is only resumed
+    # when refreshing would sample the same way
+    if distance_per_step is not None:
+        return {"distance_per_step": distance_per_step, **arc_options(cfg)}
+    mode = {k: cfg.get(k) for k in ("fps", "axis_accel", "axis_jerk", "axis_max_speed", "default_feed")}
+    return {**mode, **arc_options(cfg)}
+
+def check_limits(path, cfg):
+    # "fail" stops here, before any sampling or Blender time is spent
+    limit_check = cfg.get("limit_check", "warn")
+    if limit_check != "off":
+        with Span("path_follower/validate", points=len(path)):
+            report = check_travel(path.xyz, path.line)
+        print(report.summary())
+        if limit_check == "fail" and not report.ok:
+            sys.exit(1)
+
+def refresh_tail(fn, cfg, distance_per_step):
+    # parse only the lines appended since the last run and append their samples
+    mode = sampling_mode(cfg, distance_per_step)
+    fps = None if distance_per_step is not None else float(cfg.get("fps", 24))
+    ck = load_checkpoint(DEFAULT_PATH) if os.path.exists(DEFAULT_PATH) else None
+    if ck is not None and ck.resumes(fn, mode, len(read_toolpath(DEFAULT_PATH))):
+        lines, offset = read_new_lines(fn, ck.offset)
+        if not lines:
+            print(f"[tail] {fn}: no new lines.")
+            return
+        state, first_line = ck.state, ck.line
+        # the start row is the last pose already in the toolpath
+        path = parse_lines(lines, state=state, first_line=first_line, **arc_options(cfg))
+        check_limits(path, cfg)
+        frames, vertex = sample(np.column_stack((path.x, path.y, path.z, path.f)), cfg, distance_per_step)
+        line = path.line[np.minimum(vertex + 1, len(path) - 1)]
+        samples = append_toolpath(DEFAULT_PATH, frames[1:], line=line[1:], source_sha256=None)
+        n_lines = len(lines)
+        print(f"[tail] {n_lines} new lines from line {first_line} -> {len(frames) - 1} new samples "
+              f"({samples} in {DEFAULT_PATH})")
     else:
-        fn = sys.argv[1]
+        # streamed: only complete lines, counted first so the checkpoint
+        # matches what was parsed even while the log keeps growing
+        n_lines, offset = count_complete_lines(fn)
+        state, first_line = ParserState(), 1
+        path = parse_gcode(fn, state=state, end=offset, **arc_options(cfg))
+        check_limits(path, cfg)
+        frames, vertex = sample(np.column_stack((path.x, path.y, path.z, path.f)), cfg, distance_per_step)
+        line = path.line[np.minimum(vertex + 1, len(path) - 1)]
+        write_toolpath(DEFAULT_PATH, frames, line=line, fps=fps, source=fn)
+        samples = len(frames)
+        print(f"[tail] Full pass: {n_lines} lines -> {samples} samples in {DEFAULT_PATH}")
+    Checkpoint(fn, offset, first_line + n_lines, state, samples, mode).save(DEFAULT_PATH)
+
+def main():
+    # path_follower.py [gcode] [distance_per_step] [--tail]
+    # Without distance_per_step, frames are sampled in machine time at the
+    # fps from animation_config.json. --tail (or "tail_follow" in the config)
+    # only processes lines appended since the previous run.
+    args = [a for a in sys.argv[1:] if a != "--tail"]
+    fn = args[0] if args else 'path.gcode'
     try:
-        distance_per_step = float(sys.argv[2])
+        distance_per_step = float(args[1])
     except:
-        distance_per_step = 100.0
-    with open(fn, 'r') as f:
-        locs = parse_locs(f.readlines())
-        locs_frames = get_frame_locs(locs, distance_per_step)
-    with open('pathout.csv','w') as f2:
-        e = 1
-        for loc in locs:
-            if e != 1:
-                f2.write('\n')
-            f2.write(f"{loc[0]},{loc[1]},{loc[2]}")
-            e += 1
+        distance_per_step = None
+    cfg = load_config()
+    if "--tail" in sys.argv or cfg.get("tail_follow", False):
+        with Span("path_follower/tail"):
+            refresh_tail(fn, cfg, distance_per_step)
+        return
+    with Span("path_follower/parse") as s:
+        path = parse_gcode(fn, **arc_options(cfg))
+        s.fields["points"] = len(path)
+    check_limits(path, cfg)
+    locs = np.column_stack((path.x, path.y, path.z, path.f))
+    fps = None if distance_per_step is not None else float(cfg.get("fps", 24))
+    with Span("path_follower/sample") as s:
+        locs_frames, vertex = sample(locs, cfg, distance_per_step)
+        s.fields["samples"] = len(locs_frames)
+    # the G-code line that commands each sample's move
+    line = path.line[np.minimum(vertex + 1, len(path) - 1)]
+    with Span("path_follower/write"):
+        write_toolpath(DEFAULT_PATH, locs_frames, line=line, fps=fps, source=fn)
+    print(f"[toolpath] Wrote {len(locs_frames)} samples to {DEFAULT_PATH}")
 
 if __name__ == "__main__":
     main()
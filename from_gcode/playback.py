@@ -0,0 +1,112 @@
+"""
+Keyframe-free playback of a toolpath.
+
+A frame_change_pre handler looks the current frame up in the memory-mapped
+toolpath and sets the X-axis / Y-axis / Z-axis locations directly. Nothing
+is baked into the .blend, so installing it costs the same for ten frames or
+fifty million. Sub-frames (motion blur) are interpolated linearly. When
+path_follower.py appends to the file, the handler re-opens it on the next
+frame change.
+
+The handler is not saved with the file: every Blender session that should
+play the path (interactive or `blender -b ... -P animation_to_gif.py`)
+calls install().
+"""
+import bpy
+import numpy as np
+from bpy.app.handlers import persistent
+
+from toolpath import read_header, read_toolpath
+from kinematics import Kinematics, MM_PER_UNIT
+
+# Everything the handler needs, filled by install()
+_state = {}
+
+
+def _refresh():
+    """Re-open the toolpath if append_toolpath() grew or rewrote it since."""
+    try:
+        header, _ = read_header(_state["path"])
+    except (OSError, ValueError):
+        return  # gone or mid-write; keep the columns already open
+    if (header["count"], header.get("capacity")) == (_state["count"], _state["capacity"]):
+        return
+    toolpath = read_toolpath(_state["path"])
+    _state.update(count=len(toolpath), capacity=toolpath.header.get("capacity"),
+                  drives=[(obj, index, toolpath[name], origin, sign)
+                          for (obj, index, _, origin, sign), name in zip(_state["drives"], _state["names"])])
+
+
+@persistent
+def jubilee_toolpath_playback(scene, depsgraph=None):
+    if "path" in _state:
+        _refresh()
+    n = _state.get("count", 0)
+    if n == 0:
+        return
+    t = scene.frame_current_final - _state["first_frame"]
+    i = int(np.clip(np.floor(t), 0, n - 1))
+    j = min(i + 1, n - 1)
+    w = float(np.clip(t - i, 0.0, 1.0))
+    for obj, index, column, origin, sign in _state["drives"]:
+        mm = float(column[i]) * (1.0 - w) + float(column[j]) * w
+        obj.location[index] = origin + sign * mm / MM_PER_UNIT
+
+
+def active():
+    """True while install() is driving the axes."""
+    return _state.get("count", 0) > 0
+
+
+def sample_poses(frames):
+    """Axis locations the handler would set at each (integer) frame, vectorized.
+
+    Returns an (n_frames, n_drives) array in Blender units.
+    """
+    n = _state["count"]
+    i = np.clip(np.asarray(frames, dtype=np.int64) - _state["first_frame"], 0, n - 1)
+    return np.column_stack([origin + sign * np.asarray(column[i], dtype=np.float64) / MM_PER_UNIT
+                            for _, _, column, origin, sign in _state["drives"]])
+
+
+def install(scene, toolpath_path, first_frame=1):
+    """Drive the axis empties from toolpath_path and size the scene to fit.
+
+    Clears their location animation so keys don't fight the handler.
+    Returns the number of samples.
+    """
+    uninstall()
+    toolpath = read_toolpath(toolpath_path)
+    model = Kinematics.from_objects(bpy.data.objects)
+    if not {0, 1} <= {axis for axis, *_ in model.axes}:
+        raise RuntimeError("Objects 'X-axis' and 'Y-axis' are required for playback.")
+
+    drives = [(bpy.data.objects[link.name], index, toolpath["xyz"[axis]], origin, sign)
+              for axis, link, index, origin, sign in model.axes]
+    for obj, *_ in drives:
+        obj.animation_data_clear()
+
+    _state.update(count=len(toolpath), first_frame=first_frame, drives=drives,
+                  names=["xyz"[axis] for axis, *_ in model.axes], path=toolpath_path,
+                  capacity=toolpath.header.get("capacity"))
+    bpy.app.handlers.frame_change_pre.append(jubilee_toolpath_playback)
+
+    # the handler changes objects during renders too; lock the UI so it
+    # doesn't read them at the same time (Blender's advice for such handlers)
+    scene.render.use_lock_interface = True
+    scene.frame_start = first_frame
+    scene.frame_end = first_frame + max(len(toolpath), 1) - 1
+    if toolpath.fps:
+        scene.render.fps = int(round(toolpath.fps))
+    jubilee_toolpath_playback(scene)
+    print(f"[playback] Driving axes from {toolpath_path} ({len(toolpath)} frames, no keyframes).")
+    return len(toolpath)
+
+
+def uninstall():
+    """Remove the handler (also any copy left by an earlier run of the script)."""
+    handlers = bpy.app.handlers.frame_change_pre
+    for h in list(handlers):
+        if getattr(h, "__name__", "") == jubilee_toolpath_playback.__name__:
+            handlers.remove(h)
+    _state.clear()
@@ -14,6 +14,11 @@ copy "%SRC_GCODE%" "%DST_GCODE%" /Y
 
 REM Run the animation preparation script (uses local utils.py)
 python "%ANIM_SCRIPT%" "%DST_GCODE%"
+if errorlevel 1 (
+    echo Toolpath rejected, Blender not started.
+    pause
+    exit /b 1
+)
 
 REM Run Blender to animate the toolpath
 set "BLEND_FILE=..\jubilee.blend"
@@ -0,0 +1,158 @@
+"""
+Sidecar with what the scripts need to know about jubilee.blend.
+
+Axis names, the parent hierarchy, Limit Location ranges, rest poses (the
+kinematics.py spec), the camera and the scene's frame range are dumped to
+<name>.scene.json next to the .blend, keyed by the .blend's SHA-256. Tools
+without Blender (parser, validator, estimator, Sacred runner) read it in
+milliseconds; it is only regenerated when the .blend content changes.
+
+Plain Python. extract() takes bpy.data and the scene from the caller, as in
+keyframes.py. To (re)generate it by hand:
+
+    blender -b jubilee.blend -P from_gcode/scene_meta.py
+"""
+import os
+import sys
+import json
+import subprocess
+
+# Blender's -P does not put this folder on sys.path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from toolpath import file_sha256
+from kinematics import spec_from_objects, STACK
+
+# Bump when the layout below changes; older sidecars are regenerated
+VERSION = 1
+
+# jubilee.blend in the repo root
+BLEND_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "jubilee.blend")
+
+
+def sidecar_path(blend_file=BLEND_PATH):
+    return os.path.splitext(blend_file)[0] + ".scene.json"
+
+
+def _stat(blend_file):
+    st = os.stat(blend_file)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _matrix(m):
+    return [[float(v) for v in row] for row in m]
+
+
+def extract(data, scene):
+    """Scene metadata as a dict (data is bpy.data)."""
+    cam = scene.camera
+    camera = None
+    if cam is not None:
+        camera = {
+            "name": cam.name,
+            "matrix_world": _matrix(cam.matrix_world),
+            "type": cam.data.type,
+            "lens": float(cam.data.lens),
+            "sensor_width": float(cam.data.sensor_width),
+            "sensor_fit": cam.data.sensor_fit,
+            "clip_start": float(cam.data.clip_start),
+            "clip_end": float(cam.data.clip_end),
+        }
+    r = scene.render
+    return {
+        "version": VERSION,
+        "kinematics": spec_from_objects(data.objects),
+        "rest_world": {name: _matrix(data.objects[name].matrix_world)
+                       for name, _ in STACK if data.objects.get(name) is not None},
+        "camera": camera,
+        "scene": {
+            "frame_start": scene.frame_start,
+            "frame_end": scene.frame_end,
+            "frame_step": scene.frame_step,
+            "fps": r.fps,
+            "resolution": [r.resolution_x, r.resolution_y, r.resolution_percent],
+            "engine": r.engine,
+        },
+    }
+
+
+def write(blend_file, meta):
+    """Store meta as blend_file's sidecar, stamped with its hash."""
+    meta = dict(meta, blend={"sha256": file_sha256(blend_file), **_stat(blend_file)})
+    return _dump(sidecar_path(blend_file), meta)
+
+
+def _dump(path, meta):
+    # Per-process temp name: concurrent runs (sweep.py) may refresh it at once
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+def _read(blend_file):
+    try:
+        with open(sidecar_path(blend_file), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_current(blend_file, meta):
+    """True if meta was extracted from blend_file as it is now.
+
+    Size and mtime matching skips hashing; otherwise the .blend is hashed.
+    """
+    if meta is None or meta.get("version") != VERSION or "blend" not in meta:
+        return False
+    stamp = meta["blend"]
+    stat = _stat(blend_file)
+    if stat["size"] == stamp["size"] and stat["mtime_ns"] == stamp["mtime_ns"]:
+        return True
+    if stat["size"] != stamp["size"] or file_sha256(blend_file) != stamp["sha256"]:
+        return False
+    # Same content, new mtime (checkout, copy): refresh the stamp
+    stamp.update(stat)
+    _dump(sidecar_path(blend_file), meta)
+    return True
+
+
+def regenerate(blend_file, blender_exe):
+    """Run a background Blender once to rewrite the sidecar."""
+    print(f"[scene] Extracting scene metadata from {blend_file} ...")
+    subprocess.run([blender_exe, "-b", blend_file, "-P", os.path.abspath(__file__)],
+                   check=True, capture_output=True)
+    return _read(blend_file)
+
+
+def load_scene_meta(blend_file=BLEND_PATH, blender_exe=None):
+    """The sidecar for blend_file, regenerated with blender_exe if it is stale.
+
+    Returns None when there is no current sidecar and no Blender to make one.
+    """
+    if not os.path.exists(blend_file):
+        return None
+    meta = _read(blend_file)
+    if is_current(blend_file, meta):
+        return meta
+    if blender_exe is None:
+        print(f"[scene] {sidecar_path(blend_file)} is missing or stale.")
+        return None
+    meta = regenerate(blend_file, blender_exe)
+    return meta if is_current(blend_file, meta) else None
+
+
+def refresh(data, scene, blend_file):
+    """From inside Blender: rewrite the sidecar if blend_file has changed.
+
+    Skipped while the file has unsaved edits, which the hash would not cover.
+    """
+    if data.is_dirty:
+        return
+    if blend_file and os.path.exists(blend_file) and not is_current(blend_file, _read(blend_file)):
+        print("[scene] Wrote", write(blend_file, extract(data, scene)))
+
+
+if __name__ == "__main__":
+    import bpy
+    print("[scene] Wrote", write(bpy.data.filepath, extract(bpy.data, bpy.context.scene)))
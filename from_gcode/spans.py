@@ -0,0 +1,158 @@
+"""
+Timing spans: wall time, CPU time and memory growth per pipeline stage,
+appended as JSON lines to one log shared by every process of a run.
+
+    from spans import Span
+    with Span("path_follower/parse") as s:
+        path = parse_gcode(fn)
+        s.fields["lines"] = len(path)
+
+Logging is opt-in: spans are only written once a log is chosen, with
+$JUBILEE_SPANS or set_path() (sacred_runner.py gives every run its own, and
+passes it to Blender with --spans). Each finished span is one line:
+
+    {"stage": "gif/frame", "t": <unix start>, "wall_s": 0.41, "cpu_s": 0.02,
+     "rss_growth_mb": 0.0, "process_peak_rss_mb": 812.5, "pid": 4711, "frame": 12}
+
+The OS only reports a process's lifetime peak, so that is what
+process_peak_rss_mb is; rss_growth_mb is how far that peak rose during the
+span (0 for a stage that stayed under an earlier peak).
+
+path_follower.py, animate_path.py, animation_to_gif.py (inside Blender) and
+sacred_runner.py all write here; the runner reads its run's lines back into
+Sacred. Plain Python (no bpy).
+"""
+import os
+import sys
+import json
+import time
+
+# None: spans are not recorded
+SPANS_PATH = os.environ.get("JUBILEE_SPANS") or None
+
+
+def set_path(path):
+    """Send this process's spans to path from now on (None: stop recording)."""
+    global SPANS_PATH
+    SPANS_PATH = None if path is None else os.path.abspath(path)
+
+
+def _peak_rss_windows():
+    import ctypes
+    from ctypes import wintypes
+
+    class Counters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+            (name, ctypes.c_size_t) for name in (
+                "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage",
+                "PagefileUsage", "PeakPagefileUsage")]
+
+    counters = Counters(cb=ctypes.sizeof(Counters))
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.PeakWorkingSetSize / 2**20
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, in MB (None if unknown)."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            return _peak_rss_windows()
+        except (AttributeError, OSError):
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def emit(stage, wall_s, cpu_s=None, t=None, **fields):
+    """Append one finished span to the log (if one is set)."""
+    if SPANS_PATH is None:
+        return
+    record = {"stage": stage, "t": time.time() - wall_s if t is None else t,
+              "wall_s": wall_s, "cpu_s": cpu_s, "process_peak_rss_mb": peak_rss_mb(),
+              "pid": os.getpid(), **fields}
+    line = json.dumps(record) + "\n"
+    # One write per line, so processes sharing the log don't interleave
+    with open(SPANS_PATH, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+class Span:
+    """Times from creation to stop() (or the end of a with block).
+
+    Extra fields go in the constructor, in .fields, or in stop(); a span
+    left by an exception records its type as "error".
+    """
+
+    def __init__(self, stage, **fields):
+        self.stage = stage
+        self.fields = fields
+        self.t = time.time()
+        self.wall0 = time.perf_counter()
+        self.cpu0 = time.process_time()
+        self.rss0 = peak_rss_mb()
+        self.wall_s = None
+
+    def stop(self, **fields):
+        """Record the span (once); returns its wall time."""
+        if self.wall_s is None:
+            self.wall_s = time.perf_counter() - self.wall0
+            self.fields.update(fields)
+            rss = peak_rss_mb()
+            if rss is not None and self.rss0 is not None:
+                self.fields["rss_growth_mb"] = rss - self.rss0
+            emit(self.stage, self.wall_s, time.process_time() - self.cpu0, self.t, **self.fields)
+        return self.wall_s
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.fields["error"] = exc_type.__name__
+        self.stop()
+
+
+def log_size(path=None):
+    """Current size of the log: read_spans() from here gets only later spans."""
+    path = path or SPANS_PATH
+    return os.path.getsize(path) if path and os.path.exists(path) else 0
+
+
+def read_spans(path=None, offset=0):
+    """Spans logged after byte offset."""
+    path = path or SPANS_PATH
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    spans = []
+    for line in data.splitlines():
+        try:
+            spans.append(json.loads(line))
+        except ValueError:
+            # a line still being written by another process
+            continue
+    return spans
+
+
+def summarize(spans):
+    """Per-stage count, total wall/CPU time, largest memory growth and the
+    highest process peak seen at its end."""
+    stages = {}
+    for s in spans:
+        agg = stages.setdefault(s["stage"], {"count": 0, "wall_s": 0.0, "cpu_s": 0.0,
+                                             "rss_growth_mb": None, "process_peak_rss_mb": None})
+        agg["count"] += 1
+        agg["wall_s"] += s["wall_s"]
+        agg["cpu_s"] += s.get("cpu_s") or 0.0
+        for key in ("rss_growth_mb", "process_peak_rss_mb"):
+            if s.get(key) is not None:
+                agg[key] = max(agg[key] or 0.0, s[key])
+    return stages
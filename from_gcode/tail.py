@@ -0,0 +1,113 @@
+"""
+Incremental tail-following of a growing G-code log.
+
+A checkpoint next to the toolpath (<toolpath>.ckpt.json) records how many
+bytes of the log have been consumed, the next line number and the parser's
+modal state at that point (position, G90/G91, G92 offset, feedrate). A
+refresh reads only what was appended since, parses it from that state and
+appends the new samples to the toolpath, so parsing and sampling cost follow
+the new lines rather than the whole job.
+"""
+import os
+import json
+import hashlib
+
+from gcodedata import ParserState
+
+# Bytes read at a time when counting the lines of a whole log
+COUNT_CHUNK_BYTES = 1 << 22
+
+# Bytes hashed at the start of the log and just before the checkpoint offset,
+# to notice a log that was replaced rather than appended to
+SIGNATURE_BYTES = 4096
+
+
+def checkpoint_path(toolpath_path):
+    return toolpath_path + ".ckpt.json"
+
+
+def _signature(path, offset):
+    with open(path, "rb") as f:
+        head = f.read(min(offset, SIGNATURE_BYTES))
+        f.seek(max(0, offset - SIGNATURE_BYTES))
+        tail = f.read(min(offset, SIGNATURE_BYTES))
+    return hashlib.sha256(head + b"\0" + tail).hexdigest()
+
+
+def read_new_lines(path, offset=0):
+    """Complete lines written to path after byte offset, and the offset past them.
+
+    A trailing line without its newline is left for the next refresh.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    if end == 0:
+        return [], offset
+    return data[:end - 1].decode("utf-8", errors="replace").split("\n"), offset + end
+
+
+def count_complete_lines(path, offset=0):
+    """Number of complete lines after byte offset, and the offset past them.
+
+    Reads a chunk at a time, so a full pass can stream the log through
+    parse_gcode(end=...) instead of holding it in memory.
+    """
+    count = 0
+    end = offset
+    pos = offset
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            data = f.read(COUNT_CHUNK_BYTES)
+            if not data:
+                break
+            n = data.count(b"\n")
+            if n:
+                count += n
+                end = pos + data.rfind(b"\n") + 1
+            pos += len(data)
+    return count, end
+
+
+class Checkpoint:
+    """Where the last refresh of a toolpath stopped reading its G-code log.
+
+    mode describes how the samples were made (fps or distance per step and
+    the motion limits); a checkpoint made any other way is not resumed.
+    """
+
+    def __init__(self, source, offset, line, state, samples, mode, signature=None):
+        self.source = os.path.abspath(source)
+        self.offset = offset
+        self.line = line
+        self.state = state
+        self.samples = samples
+        self.mode = mode
+        self.signature = signature or _signature(source, offset)
+
+    def save(self, toolpath_path):
+        with open(checkpoint_path(toolpath_path), "w", encoding="utf-8") as f:
+            json.dump({"source": self.source, "offset": self.offset, "line": self.line,
+                       "state": self.state.to_dict(), "samples": self.samples,
+                       "mode": self.mode, "signature": self.signature}, f, indent=2)
+
+    def resumes(self, source, mode, samples):
+        """True if source is the same log, only grown, sampled the same way
+        into a toolpath that still holds `samples` samples."""
+        return (os.path.abspath(source) == self.source and mode == self.mode
+                and samples == self.samples and os.path.exists(source)
+                and os.path.getsize(source) >= self.offset
+                and _signature(source, self.offset) == self.signature)
+
+
+def load_checkpoint(toolpath_path):
+    """The toolpath's checkpoint, or None."""
+    try:
+        with open(checkpoint_path(toolpath_path), "r", encoding="utf-8") as f:
+            d = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return Checkpoint(d["source"], d["offset"], d["line"], ParserState.from_dict(d["state"]),
+                      d["samples"], d["mode"], d["signature"])
@@ -0,0 +1,196 @@
+"""
+Binary toolpath file (.tpath) shared by path_follower.py and the Blender scripts.
+
+Layout, all little-endian:
+
+    8 bytes   magic b"JTPATH01"
+    4 bytes   uint32 header length H
+    H bytes   UTF-8 JSON header, space-padded so the data starts on a
+              64-byte boundary
+    data      one contiguous block per column, in header order
+
+The header records the sample count, the columns and their dtypes, units,
+axis order, fps (null for distance-sampled paths) and the SHA-256 of the
+source G-code. Columns are stored one after another so each of them can be
+opened as its own np.memmap without copying.
+
+Each column block has room for "capacity" samples (count when absent).
+append_toolpath() writes new samples into that spare room and patches the
+count in the header, so tail-following appends cost the new samples only;
+when the room runs out the file is rewritten once with twice the capacity.
+Rewrites go to a temporary file that replaces the old one, so a reader
+never sees a half-written file and open memmaps keep the old data.
+"""
+import hashlib
+import json
+import os
+import struct
+import numpy as np
+
+MAGIC = b"JTPATH01"
+VERSION = 1
+ALIGN = 64
+# Spare header bytes so the count can grow without moving the columns
+HEADER_SLACK = 64
+DEFAULT_PATH = "pathout.tpath"
+
+
+class Toolpath:
+    """A (possibly memory-mapped) toolpath: header dict plus named columns."""
+
+    def __init__(self, header, columns):
+        self.header = header
+        self.columns = columns
+
+    def __len__(self):
+        return int(self.header["count"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @property
+    def fps(self):
+        return self.header.get("fps")
+
+    @property
+    def xyz(self):
+        """(n, 3) float64 copy in the header's axis order."""
+        return np.column_stack([self.columns[a.lower()] for a in self.header["axes"]]).astype(np.float64)
+
+
+def file_sha256(path, chunk_bytes=1 << 20):
+    """SHA-256 of a file, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_bytes), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _header_bytes(header, length=None):
+    """Magic, length and padded JSON; length pins the JSON block size (None
+    if the header does not fit it)."""
+    raw = json.dumps(header, sort_keys=True).encode("utf-8")
+    if length is None:
+        raw += b" " * HEADER_SLACK
+        raw += b" " * (-(len(MAGIC) + 4 + len(raw)) % ALIGN)
+    elif len(raw) > length:
+        return None
+    else:
+        raw += b" " * (length - len(raw))
+    return MAGIC + struct.pack("<I", len(raw)) + raw
+
+
+def write_toolpath(path, xyz, line=None, fps=None, source=None, source_sha256=None,
+                   units="mm", dtype="<f4"):
+    """Write an (n, 3) sample array (and optional G-code line column) to path.
+
+    The column data is assembled once and written in a single write() call.
+    """
+    xyz = np.asarray(xyz)
+    n = len(xyz)
+    dtype = np.dtype(dtype).newbyteorder("<")
+    columns = [("x", dtype, xyz[:, 0]), ("y", dtype, xyz[:, 1]), ("z", dtype, xyz[:, 2])]
+    if line is not None:
+        columns.append(("line", np.dtype("<u4"), np.asarray(line)))
+    if source is not None and source_sha256 is None:
+        source_sha256 = file_sha256(source)
+
+    header = {
+        "version": VERSION,
+        "count": n,
+        "units": units,
+        "axes": "XYZ",
+        "fps": fps,
+        "source": source,
+        "source_sha256": source_sha256,
+    }
+    _write(path, header, columns)
+
+
+def _write(path, header, columns, capacity=None):
+    """Header plus column blocks, assembled once and written in one call."""
+    n = header["count"]
+    capacity = max(n, capacity or 0)
+    header = dict(header, capacity=capacity, columns=[{"name": c, "dtype": d.str} for c, d, _ in columns])
+    data = np.zeros(sum(capacity * d.itemsize for _, d, _ in columns), dtype=np.uint8)
+    offset = 0
+    for _, d, values in columns:
+        data[offset:offset + n * d.itemsize].view(d)[:] = values
+        offset += capacity * d.itemsize
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_header_bytes(header))
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def append_toolpath(path, xyz, line=None, **header):
+    """Append samples (and their G-code lines) to an existing toolpath.
+
+    The samples go into the columns' spare capacity and only the header's
+    count is rewritten; a full file is rewritten with doubled capacity.
+    Keyword arguments update header fields. Returns the new sample count.
+    """
+    old_header, offset = read_header(path)
+    xyz = np.asarray(xyz)
+    count = int(old_header["count"])
+    capacity = int(old_header.get("capacity", count))
+    n = count + len(xyz)
+
+    def new_values(name, d):
+        if name == "line":
+            values = np.zeros(len(xyz)) if line is None else np.asarray(line)
+        else:
+            values = xyz[:, old_header["axes"].lower().index(name)]
+        return values.astype(d)
+
+    new_header = dict(old_header, count=n, **header)
+    head = _header_bytes(new_header, length=offset - len(MAGIC) - 4)
+    if n > capacity or head is None:
+        old = read_toolpath(path, mmap=False)
+        columns = [(c["name"], np.dtype(c["dtype"]),
+                    np.concatenate((old[c["name"]], new_values(c["name"], np.dtype(c["dtype"])))))
+                   for c in old_header["columns"]]
+        del new_header["columns"]
+        _write(path, new_header, columns, capacity=2 * n)
+        return n
+
+    with open(path, "r+b") as f:
+        for c in old_header["columns"]:
+            d = np.dtype(c["dtype"])
+            f.seek(offset + count * d.itemsize)
+            f.write(new_values(c["name"], d).tobytes())
+            offset += capacity * d.itemsize
+        # the count goes last: a crash before it leaves the old path intact
+        f.seek(0)
+        f.write(head)
+    return n
+
+
+def read_header(path):
+    """Return (header dict, byte offset of the first column)."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a toolpath file")
+        (hlen,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(hlen).decode("utf-8"))
+    return header, len(MAGIC) + 4 + hlen
+
+
+def read_toolpath(path, mmap=True):
+    """Open a toolpath file; columns are read-only np.memmap views by default."""
+    header, offset = read_header(path)
+    n = int(header["count"])
+    capacity = int(header.get("capacity", n))
+    columns = {}
+    for col in header["columns"]:
+        dtype = np.dtype(col["dtype"])
+        if n == 0:
+            columns[col["name"]] = np.empty(0, dtype=dtype)
+        elif mmap:
+            columns[col["name"]] = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(n,))
+        else:
+            columns[col["name"]] = np.fromfile(path, dtype=dtype, count=n, offset=offset)
+        offset += capacity * dtype.itemsize
+    return Toolpath(header, columns)
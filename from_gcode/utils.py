@@ -3,32 +3,32 @@ helper functions for path_follower
 Adapted from: https://github.com/TanmayChhatbar/blender_3d_print_animation/blob/main/utils.py
 Original author: Tanmay Chhatbar
 """
-from math import sqrt
+import os
+import json
 import numpy as np
 
-def _extract_numeric_after(token: str) -> float | None:
-    token = token.split(";", 1)[0]
-    parts = [p for p in token.strip().split() if p]
-    if not parts:
-        return None
-    try:
-        return float(parts[0])
-    except ValueError:
-        return None
+def arc_length(xyz):
+    """Cumulative travel distance at every vertex of an (n, 3) polyline."""
+    s = np.zeros(len(xyz))
+    if len(xyz) > 1:
+        np.cumsum(np.linalg.norm(np.diff(xyz, axis=0), axis=1), out=s[1:])
+    return s
 
-def find_coord(line, curcoord):
-    nl = curcoord.copy()
-    checks = ["X", "Y", "Z", "F"]
-    for i, axis in enumerate(checks):
-        if axis in line:
-            after = line.split(axis, 1)[1]
-            val = _extract_numeric_after(after)
-            if val is not None:
-                nl[i] = val
-    return nl
+def interp_polyline(xyz, s, t):
+    """Positions at travel distances t along a polyline with vertex distances s.
 
-def dis(loc1, loc2):
-    return sqrt(sum((np.array(loc1)-np.array(loc2))[0:3]**2))
+    Returns (points, seg) where seg[i] is the index of the vertex starting the
+    segment that holds sample i. Zero-length segments are skipped.
+    """
+    xyz = np.asarray(xyz, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)
+    if len(xyz) < 2:
+        return np.repeat(xyz[:1], len(t), axis=0), np.zeros(len(t), dtype=np.int64)
+    seg = np.clip(np.searchsorted(s, t, side="right") - 1, 0, len(xyz) - 2)
+    ds = s[seg + 1] - s[seg]
+    frac = np.divide(t - s[seg], ds, out=np.zeros_like(t), where=ds > 0)
+    pts = xyz[seg] + (xyz[seg + 1] - xyz[seg]) * np.clip(frac, 0.0, 1.0)[:, None]
+    return pts, seg
 
 
 # Get axis minimums from Blender constraints
@@ -53,4 +53,18 @@ def get_axis_max(obj, axis):
                 return constraint.max_y if constraint.use_max_y else 0.0
             elif axis == 'Z':
                 return constraint.max_z if constraint.use_max_z else 0.0
-    return 0.0
\ No newline at end of file
+    return 0.0
+
+# animation_config.json lives in the repo root, next to jubilee.blend
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "animation_config.json")
+
+def load_config(path=CONFIG_PATH):
+    """Read animation_config.json as a dict ({} if missing or unreadable)."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"[config] Could not read JSON config: {e}. Using defaults.")
+        return {}
@@ -0,0 +1,128 @@
+"""
+Soft-limit check of a toolpath against the axis travel.
+
+Every pose is compared with the per-axis travel that the Limit Location
+constraints allow (kinematics.Kinematics.travel_mm(), the same limits
+get_axis_min/get_axis_max read) in one vectorized pass. Blender would
+silently clamp these poses, so they are reported here instead, with the
+G-code lines that command them.
+
+    python validate.py [file.gcode | file.tpath] [--fail]
+
+exits with status 1 when --fail is given and the path leaves the travel.
+"""
+import sys
+import numpy as np
+
+from kinematics import load_model
+
+# Overshoot below this many mm is float noise from the mm <-> m round trip
+TOLERANCE_MM = 1e-6
+# How many offending G-code lines to list
+MAX_REPORT = 10
+
+
+class LimitReport:
+    """Result of check_travel(): per-axis overshoot stats and the first offending lines."""
+
+    def __init__(self, lo, hi, n_poses, axes, first):
+        self.lo = lo
+        self.hi = hi
+        self.n_poses = n_poses
+        self.axes = axes
+        self.first = first
+
+    @property
+    def ok(self):
+        return not self.axes
+
+    def to_dict(self):
+        return {
+            "ok": self.ok,
+            "poses": self.n_poses,
+            "travel_mm": {a: [float(self.lo[i]), float(self.hi[i])] for i, a in enumerate("XYZ")},
+            "axes": self.axes,
+            "first": self.first,
+        }
+
+    def summary(self):
+        if self.ok:
+            return f"[limits] All {self.n_poses} poses are within travel."
+        out = [f"[limits] Travel exceeded on {', '.join(self.axes)}:"]
+        for a, s in self.axes.items():
+            out.append(f"  {a}: {s['count']} of {self.n_poses} poses, up to {s['max_overshoot_mm']:.3f} mm "
+                       f"{s['side']} the {s['limit_mm']:g} mm limit (first at line {s['first_line']})")
+        out.append("  First offending lines:")
+        for v in self.first:
+            out.append(f"    line {v['line']}: {v['axis']}={v['value_mm']:.3f} mm, "
+                       f"{v['overshoot_mm']:.3f} mm past the limit")
+        return "\n".join(out)
+
+    def raise_if_failed(self):
+        if not self.ok:
+            raise RuntimeError(self.summary())
+
+
+def check_travel(xyz, line=None, model=None, tolerance=TOLERANCE_MM, max_report=MAX_REPORT):
+    """Check (n, 3) machine positions in mm against the travel of model.
+
+    line holds the G-code line of each pose (defaults to the pose index).
+    """
+    model = model or load_model()
+    xyz = np.asarray(xyz, dtype=np.float64)
+    line = np.arange(len(xyz)) if line is None else np.asarray(line)
+    lo, hi = model.travel_mm()
+    below = lo - xyz
+    above = xyz - hi
+    over = np.maximum(np.maximum(below, above), 0.0)
+    bad = over > tolerance
+
+    axes = {}
+    for i in np.flatnonzero(bad.any(axis=0)):
+        rows = np.flatnonzero(bad[:, i])
+        worst = rows[np.argmax(over[rows, i])]
+        side = "below" if below[worst, i] > 0 else "above"
+        axes["XYZ"[i]] = {
+            "count": int(len(rows)),
+            "max_overshoot_mm": float(over[worst, i]),
+            "side": side,
+            "limit_mm": float(lo[i] if side == "below" else hi[i]),
+            "first_line": int(line[rows[0]]),
+            "worst_line": int(line[worst]),
+        }
+
+    # First offending pose of each of the first max_report offending lines
+    first = []
+    rows = np.flatnonzero(bad.any(axis=1))
+    if len(rows):
+        _, keep = np.unique(line[rows], return_index=True)
+        for r in rows[np.sort(keep)[:max_report]]:
+            i = int(np.argmax(over[r]))
+            first.append({"line": int(line[r]), "axis": "XYZ"[i],
+                          "value_mm": float(xyz[r, i]), "overshoot_mm": float(over[r, i])})
+    return LimitReport(lo, hi, len(xyz), axes, first)
+
+
+def check_file(path, model=None):
+    """check_travel() for a .gcode file (every commanded vertex) or a .tpath toolpath."""
+    if path.endswith(".tpath"):
+        from toolpath import read_toolpath
+        tp = read_toolpath(path)
+        line = tp["line"] if "line" in tp.columns else None
+        return check_travel(tp.xyz, line, model)
+    from gcodedata import parse_gcode
+    p = parse_gcode(path)
+    return check_travel(p.xyz, p.line, model)
+
+
+def main():
+    args = [a for a in sys.argv[1:] if a != "--fail"]
+    fn = args[0] if args else "path.gcode"
+    report = check_file(fn)
+    print(report.summary())
+    if "--fail" in sys.argv and not report.ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
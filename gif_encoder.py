@@ -0,0 +1,116 @@
+"""
+GIF encoding with a two-pass ffmpeg palette (palettegen -> paletteuse).
+
+GifStreamEncoder keeps one ffmpeg process open and takes encoded frames
+(PNG bytes), or raw RGB frames of a fixed size, over stdin as they are
+rendered. That first pass scales the frames, builds the palette and keeps a
+single lossless FFV1 intermediate; the second pass maps the intermediate
+onto the palette. Memory stays at a few frames and nothing is written per
+frame.
+
+encode_png_sequence() does the same two passes for a folder of numbered
+PNGs (debug output, parallel workers).
+
+Plain Python (no bpy).
+"""
+import os
+import shutil
+import subprocess
+
+PALETTEUSE = "paletteuse=dither=sierra2_4a"
+
+
+def require_ffmpeg():
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg not found on PATH.")
+
+
+def _palette_filter(fps, scale_width):
+    return (f"[0:v]fps={fps},scale={scale_width}:-1:flags=lanczos,split[a][b];"
+            f"[a]palettegen=stats_mode=full[p]")
+
+
+def _apply_palette(intermediate, palette, gif_path, fps):
+    os.makedirs(os.path.dirname(os.path.abspath(gif_path)), exist_ok=True)
+    cmd = ["ffmpeg", "-y", "-loglevel", "error",
+           "-i", intermediate, "-i", palette,
+           "-lavfi", f"[0:v][1:v]{PALETTEUSE}", "-r", str(fps), gif_path]
+    print("[gif] Running:", " ".join(cmd))
+    subprocess.run(cmd, check=True)
+
+
+class GifStreamEncoder:
+    """Long-lived ffmpeg fed one PNG-encoded frame at a time, or raw rgb24
+    frames when frame_size=(width, height) is given."""
+
+    def __init__(self, gif_path, fps, scale_width, work_dir, frame_size=None):
+        require_ffmpeg()
+        self.gif_path = gif_path
+        self.fps = fps
+        os.makedirs(work_dir, exist_ok=True)
+        self.palette = os.path.join(work_dir, "palette.png")
+        self.intermediate = os.path.join(work_dir, "frames.mkv")
+        self.frames = 0
+        if frame_size is None:
+            source = ["-f", "image2pipe", "-framerate", str(fps), "-c:v", "png", "-i", "-"]
+        else:
+            source = ["-f", "rawvideo", "-pix_fmt", "rgb24", "-s", "{}x{}".format(*frame_size),
+                      "-framerate", str(fps), "-i", "-"]
+        cmd = ["ffmpeg", "-y", "-loglevel", "error", *source,
+               "-filter_complex", _palette_filter(fps, scale_width),
+               "-map", "[p]", "-update", "1", self.palette,
+               "-map", "[b]", "-c:v", "ffv1", self.intermediate]
+        print("[gif] Streaming to:", " ".join(cmd))
+        # stdin writes block while ffmpeg is busy, which bounds memory
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+    def write_frame(self, data, repeat=1):
+        """Send one frame (PNG or raw bytes), optionally several times."""
+        for _ in range(repeat):
+            self.proc.stdin.write(data)
+        self.frames += repeat
+
+    def close(self):
+        """Finish pass one, run pass two and clean up; returns the GIF path."""
+        self.proc.stdin.close()
+        if self.proc.wait() != 0:
+            raise RuntimeError("ffmpeg palette pass failed.")
+        try:
+            _apply_palette(self.intermediate, self.palette, self.gif_path, self.fps)
+        finally:
+            for path in (self.intermediate, self.palette):
+                if os.path.exists(path):
+                    os.unlink(path)
+        return self.gif_path
+
+    def abort(self):
+        if self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+
+
+def encode_png_sequence(input_pattern, gif_path, fps, scale_width, work_dir, start_number=1):
+    """Two-pass palette GIF from a numbered PNG sequence (e.g. frame_%04d.png).
+
+    start_number is the first frame's number; ffmpeg only looks for one in
+    0-4 on its own. Both passes read the PNGs from disk, so memory stays
+    bounded.
+    """
+    require_ffmpeg()
+    os.makedirs(work_dir, exist_ok=True)
+    palette = os.path.join(work_dir, "palette.png")
+    scale = f"fps={fps},scale={scale_width}:-1:flags=lanczos"
+    source = ["-framerate", str(fps), "-start_number", str(start_number), "-i", input_pattern]
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", *source,
+           "-vf", f"{scale},palettegen=stats_mode=full", "-update", "1", palette]
+    print("[gif] Running:", " ".join(cmd))
+    subprocess.run(cmd, check=True)
+    os.makedirs(os.path.dirname(os.path.abspath(gif_path)), exist_ok=True)
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", *source,
+           "-i", palette, "-lavfi", f"[0:v]{scale}[x];[x][1:v]{PALETTEUSE}", gif_path]
+    print("[gif] Running:", " ".join(cmd))
+    try:
+        subprocess.run(cmd, check=True)
+    finally:
+        os.unlink(palette)
+    return gif_path
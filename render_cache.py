@@ -0,0 +1,121 @@
+"""
+Content-addressed cache of rendered frames.
+
+A frame's key is the SHA-256 of everything that decides its pixels (axis
+poses, camera, resolution, engine, exposure, .blend hash), so a frame is
+only rendered when that combination has never been seen. Entries are PNG
+files named after their key; hits refresh the file's mtime and the oldest
+entries are evicted once the cache grows past its size budget (LRU).
+
+Plain Python (no bpy) so the runner and parallel workers can share it.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+
+def frame_key(parts):
+    """Stable hash of a JSON-serialisable description of a frame."""
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _place(src, dst):
+    """Hard-link src to dst (copy where links are not possible)."""
+    if os.path.exists(dst):
+        os.unlink(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class FrameCache:
+    """PNG frames on local disk, keyed by frame_key(), bounded to max_bytes."""
+
+    def __init__(self, root, max_bytes=2 << 30):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(root, exist_ok=True)
+        self._bytes = sum(size for _, size, _ in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + ".png")
+
+    def fetch(self, key, dst):
+        """Put the cached frame for key at dst; False on a miss."""
+        src = self._path(key)
+        try:
+            _place(src, dst)
+            os.utime(src)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def store(self, key, src):
+        """Add a freshly rendered frame, then evict down to the size budget."""
+        dst = self._path(key)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        # write-then-rename so parallel workers never see half a file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dst), suffix=".tmp")
+        os.close(fd)
+        shutil.copyfile(src, tmp)
+        try:
+            # a re-stored key replaces its file, so only the difference counts
+            old = os.path.getsize(dst)
+        except FileNotFoundError:
+            old = 0
+        os.replace(tmp, dst)
+        self._bytes += os.path.getsize(dst) - old
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        """(mtime, size, path) of every cached frame."""
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                if not name.endswith(".png"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield st.st_mtime, st.st_size, path
+
+    def evict(self):
+        """Drop least recently used entries until the cache is back under 90%
+        of max_bytes (the slack keeps a full cache from rescanning every frame)."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            self._bytes = total
+            return
+        for _, size, path in entries:
+            if total <= 0.9 * self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._bytes = total
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "root": self.root,
+            "max_bytes": self.max_bytes,
+        }
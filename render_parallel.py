@@ -0,0 +1,157 @@
+"""
+Parallel rendering: split a frame range over several background Blender
+processes, each running animation_to_gif.py on its own sub-range and output
+folder, then stitch their PNG frames into one GIF.
+
+Plain Python (no bpy); used by sacred_runner.py.
+"""
+import os
+import re
+import sys
+import shutil
+import subprocess
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "from_gcode"))
+from toolpath import read_header
+from scene_meta import load_scene_meta
+import gif_encoder
+
+# Marker printed by the probe expression below
+_RANGE_RE = re.compile(r"JUBILEE_FRAME_RANGE (-?\d+) (-?\d+)")
+_FRAME_RE = re.compile(r"frame_(\d+)\.png$")
+
+
+def probe_frame_range(blender_exe, blend_file):
+    """The scene's frame_start/frame_end, from the scene sidecar when it is
+    current, otherwise by asking Blender (without rendering)."""
+    meta = load_scene_meta(blend_file)
+    if meta is not None:
+        return meta["scene"]["frame_start"], meta["scene"]["frame_end"]
+    expr = ("import bpy; s = bpy.context.scene; "
+            "print('JUBILEE_FRAME_RANGE', s.frame_start, s.frame_end)")
+    out = subprocess.run([blender_exe, "-b", blend_file, "--python-expr", expr],
+                         check=True, capture_output=True, text=True).stdout
+    m = _RANGE_RE.search(out)
+    if m is None:
+        raise RuntimeError("Could not read the frame range from Blender's output.")
+    return int(m.group(1)), int(m.group(2))
+
+
+def blend_relative(path, blend_file):
+    """Resolve a Blender-style '//' path against the .blend folder."""
+    if path.startswith("//"):
+        return os.path.join(os.path.dirname(os.path.abspath(blend_file)), path[2:])
+    return path
+
+
+def toolpath_frame_range(toolpath_path, blend_file, first_frame=1):
+    """Frame range that playback.install() gives a toolpath ('//' is the .blend folder)."""
+    count = int(read_header(blend_relative(toolpath_path, blend_file))[0]["count"])
+    return first_frame, first_frame + max(count, 1) - 1
+
+
+def split_frames(start, end, workers, strategy="contiguous"):
+    """Split start..end (inclusive) into at most `workers` chunks.
+
+    contiguous: equal consecutive blocks (best for Eevee's per-process caches).
+    interleaved: worker k renders start+k, start+k+workers, ... which evens
+    out load when some parts of the animation are much heavier than others.
+    Returns a list of (frame_start, frame_end, frame_step).
+    """
+    n = end - start + 1
+    workers = max(1, min(workers, n))
+    if strategy == "interleaved":
+        chunks = []
+        for k in range(workers):
+            first = start + k
+            last = first + ((end - first) // workers) * workers
+            chunks.append((first, last, workers))
+        return chunks
+    if strategy != "contiguous":
+        raise ValueError(f"Unknown chunk strategy '{strategy}'")
+    size, extra = divmod(n, workers)
+    chunks = []
+    first = start
+    for k in range(workers):
+        last = first + size + (1 if k < extra else 0) - 1
+        chunks.append((first, last, 1))
+        first = last + 1
+    return chunks
+
+
+def render_parallel(blender_exe, blend_file, script_file, chunks, out_root,
+                    threads_per_worker=None, extra_args=()):
+    """Run one background Blender per chunk and wait for all of them.
+
+    Each worker renders PNGs into out_root/worker_NN and logs to
+    out_root/worker_NN.log. Returns one timing record per worker.
+    """
+    os.makedirs(out_root, exist_ok=True)
+    procs = []
+    for k, (first, last, step) in enumerate(chunks):
+        out_dir = os.path.join(out_root, f"worker_{k:02d}")
+        cmd = [blender_exe, "-b", blend_file]
+        if threads_per_worker:
+            cmd += ["-t", str(threads_per_worker)]
+        cmd += ["-P", script_file, "--",
+                "--frame-start", str(first), "--frame-end", str(last), "--frame-step", str(step),
+                "--output-dir", out_dir, "--no-gif", *extra_args]
+        log = open(os.path.join(out_root, f"worker_{k:02d}.log"), "w", encoding="utf-8")
+        print(f"[parallel] worker {k}: frames {first}-{last} step {step}")
+        procs.append((k, cmd, out_dir, log, time.perf_counter(),
+                      subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT)))
+
+    records = []
+    for k, cmd, out_dir, log, t0, proc in procs:
+        code = proc.wait()
+        log.close()
+        first, last, step = chunks[k]
+        records.append({
+            "worker": k,
+            "frame_start": first,
+            "frame_end": last,
+            "frame_step": step,
+            "frames": len(range(first, last + 1, step)),
+            "output_dir": out_dir,
+            "wall_s": time.perf_counter() - t0,
+            "returncode": code,
+            "cmd": " ".join(cmd),
+        })
+    failed = [r["worker"] for r in records if r["returncode"] != 0]
+    if failed:
+        raise RuntimeError(f"Render workers {failed} failed; see their logs in {out_root}")
+    return records
+
+
+def collect_frames(dirs):
+    """All frame_NNNN.png files under dirs as a frame-sorted list of (frame, path)."""
+    frames = []
+    for d in dirs:
+        for name in os.listdir(d):
+            m = _FRAME_RE.search(name)
+            if m:
+                frames.append((int(m.group(1)), os.path.join(d, name)))
+    frames.sort()
+    return frames
+
+
+def stitch_gif(frames, gif_path, fps, scale_width, work_dir):
+    """Encode (frame, path) pairs, in order, into a two-pass palette GIF.
+
+    The frames are hard-linked (copied where links are not possible) into a
+    single numbered sequence in work_dir first.
+    """
+    gif_encoder.require_ffmpeg()
+    if os.path.isdir(work_dir):
+        shutil.rmtree(work_dir)
+    os.makedirs(work_dir)
+    for i, (_, path) in enumerate(frames, start=1):
+        dst = os.path.join(work_dir, f"frame_{i:04d}.png")
+        try:
+            os.link(path, dst)
+        except OSError:
+            shutil.copy2(path, dst)
+
+    return gif_encoder.encode_png_sequence(os.path.join(work_dir, "frame_%04d.png"),
+                                           gif_path, fps, scale_width, work_dir, start_number=1)
@@ -0,0 +1,434 @@
+"""
+Local result store for Sacred runs, flushed to MongoDB in the background.
+
+    python result_store.py flush [--spool sacred_spool] [--url mongodb://...] [--db animate_jubilee]
+    python result_store.py status [--spool sacred_spool]
+
+SpoolObserver takes the place of Sacred's MongoObserver in
+sacred_runner.py. Every run event is written to a local spool folder, so a
+run never waits on (or loses its record to) a slow or absent database:
+
+    sacred_spool/
+        runs/<key>/run.json        the run document, rewritten on every event
+        runs/<key>/metrics.jsonl   one line per logged metric value
+        runs/<key>/flushed.json    how much of the run is already in Mongo
+        blobs/<sha256>             artifact contents, stored once
+
+flush() pushes what is new to Mongo in MongoObserver's layout: the "runs"
+collection, "metrics" (one document per run and metric name) and GridFS
+artifacts. Artifacts are content-addressed: a GIF or frame identical to one
+already uploaded (sha256 in the GridFS metadata) is referenced, not stored
+again. Runs that have ended and are fully flushed leave the spool, and so
+do blobs no spooled run refers to (once they are BLOB_GRACE_S old: an
+observer adds a blob before its run.json names it). A run that fails to
+flush is reported and left for the next flush; the other runs still go. Only one flush runs at a time per spool
+(flush.lock), so the runner's background thread, the flush it starts on exit
+and the CLI can overlap safely.
+
+db is a pymongo Database, or any stand-in with the same collection calls
+(mongomock works), so the flush can be tried without a server.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import argparse
+import datetime
+import threading
+import subprocess
+
+try:
+    from sacred.observers import RunObserver
+except ImportError:  # flushing only needs pymongo
+    RunObserver = object
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+SPOOL_DIR = os.path.join(REPO_ROOT, "sacred_spool")
+# A lock older than this is from a flush that died
+LOCK_STALE_S = 600
+# A blob added (or re-added) more recently than this is kept even when no
+# run.json refers to it yet
+BLOB_GRACE_S = 600
+FLUSH_INTERVAL_S = 30
+MONGO_TIMEOUT_MS = 2000
+ENDED = ("COMPLETED", "FAILED", "INTERRUPTED", "TIMEOUT")
+
+
+def _encode(obj):
+    if isinstance(obj, datetime.datetime):
+        return {"$date": obj.isoformat()}
+    if type(obj).__name__ == "ObjectId":
+        return {"$oid": str(obj)}
+    return str(obj)
+
+
+def _decode(d):
+    if len(d) == 1 and "$date" in d:
+        return datetime.datetime.fromisoformat(d["$date"])
+    if len(d) == 1 and "$oid" in d:
+        from bson import ObjectId
+        return ObjectId(d["$oid"])
+    return d
+
+
+def _dump(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, default=_encode)
+    os.replace(tmp, path)
+
+
+def _load(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f, object_hook=_decode)
+
+
+class Spool:
+    """The spool folder: run records and content-addressed blobs."""
+
+    def __init__(self, root=SPOOL_DIR):
+        self.root = os.path.abspath(root)
+        self.runs = os.path.join(self.root, "runs")
+        self.blobs = os.path.join(self.root, "blobs")
+        os.makedirs(self.runs, exist_ok=True)
+        os.makedirs(self.blobs, exist_ok=True)
+
+    def run_dir(self, key):
+        return os.path.join(self.runs, key)
+
+    def run_keys(self):
+        return sorted(os.listdir(self.runs))
+
+    def add_blob(self, path):
+        """Copy a file into blobs/ under its SHA-256 (once); returns the hash."""
+        tmp = os.path.join(self.blobs, f".{uuid.uuid4().hex}.tmp")
+        h = hashlib.sha256()
+        with open(path, "rb") as src, open(tmp, "wb") as dst:
+            for chunk in iter(lambda: src.read(1 << 20), b""):
+                h.update(chunk)
+                dst.write(chunk)
+        sha = h.hexdigest()
+        blob = os.path.join(self.blobs, sha)
+        if os.path.exists(blob):
+            os.unlink(tmp)
+            # fresh again, so a prune before our run.json names it keeps it
+            os.utime(blob)
+        else:
+            os.replace(tmp, blob)
+        return sha
+
+    def blob_path(self, sha):
+        return os.path.join(self.blobs, sha)
+
+
+class SpoolObserver(RunObserver):
+    """Sacred observer that only writes to the local spool."""
+
+    priority = 20
+
+    def __init__(self, spool):
+        self.spool = spool if isinstance(spool, Spool) else Spool(spool)
+        self.key = None
+        self.run = None
+
+    def _save(self):
+        self.run["version"] += 1
+        _dump(os.path.join(self.spool.run_dir(self.key), "run.json"), self.run)
+
+    def _new_run(self, _id, ex_info, command, host_info, config, meta_info, **fields):
+        # a started run keeps the key (and version count) it was queued under
+        self.key = str(_id) if _id is not None else f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(self.spool.run_dir(self.key), exist_ok=True)
+        queued = _load(os.path.join(self.spool.run_dir(self.key), "run.json"), {})
+        self.run = {
+            "key": self.key, "version": queued.get("version", 0),
+            "experiment": dict(ex_info), "command": command, "host": dict(host_info),
+            "config": config, "meta": meta_info, "resources": [], "artifacts": [],
+            "captured_out": "", "info": {}, "heartbeat": None,
+        }
+        if "queue_time" in queued:
+            self.run["queue_time"] = queued["queue_time"]
+        self.run.update(fields)
+        self._save()
+        return self.key
+
+    def queued_event(self, ex_info, command, host_info, queue_time, config, meta_info, _id):
+        return self._new_run(_id, ex_info, command, host_info, config, meta_info,
+                             queue_time=queue_time, status="QUEUED")
+
+    def started_event(self, ex_info, command, host_info, start_time, config, meta_info, _id):
+        return self._new_run(_id, ex_info, command, host_info, config, meta_info,
+                             start_time=start_time, status="RUNNING")
+
+    def heartbeat_event(self, info, captured_out, beat_time, result):
+        self.run.update(info=info, captured_out=captured_out, heartbeat=beat_time, result=result)
+        self._save()
+
+    def completed_event(self, stop_time, result):
+        self.run.update(stop_time=stop_time, result=result, status="COMPLETED")
+        self._save()
+
+    def interrupted_event(self, interrupt_time, status):
+        self.run.update(stop_time=interrupt_time, status=status)
+        self._save()
+
+    def failed_event(self, fail_time, fail_trace):
+        self.run.update(stop_time=fail_time, fail_trace=fail_trace, status="FAILED")
+        self._save()
+
+    def resource_event(self, filename):
+        self.run["resources"].append([filename, self.spool.add_blob(filename)])
+        self._save()
+
+    def artifact_event(self, name, filename, metadata=None, content_type=None):
+        self.run["artifacts"].append({"name": name, "sha256": self.spool.add_blob(filename),
+                                      "metadata": metadata or {}, "content_type": content_type})
+        self._save()
+
+    def log_metrics(self, metrics_by_name, info):
+        lines = []
+        for name, m in metrics_by_name.items():
+            for step, value, t in zip(m["steps"], m["values"], m["timestamps"]):
+                lines.append(json.dumps({"name": name, "step": step, "value": value, "t": t}, default=_encode))
+        if lines:
+            with open(os.path.join(self.spool.run_dir(self.key), "metrics.jsonl"), "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+
+def connect(url, db_name, timeout_ms=MONGO_TIMEOUT_MS):
+    """pymongo Database that gives up after timeout_ms instead of hanging."""
+    import pymongo
+    client = pymongo.MongoClient(url, serverSelectionTimeoutMS=timeout_ms)
+    return client[db_name]
+
+
+class _Lock:
+    """Exclusive flush lock; acquire() is False while another flush holds it."""
+
+    def __init__(self, path):
+        self.path = path
+        self.held = False
+
+    def acquire(self):
+        try:
+            if time.time() - os.path.getmtime(self.path) > LOCK_STALE_S:
+                os.unlink(self.path)
+        except OSError:
+            pass
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        self.held = True
+        return True
+
+    def release(self):
+        if self.held:
+            os.unlink(self.path)
+            self.held = False
+
+
+def _upload_blob(db, sha, path, filename):
+    """GridFS id of the blob with this hash, uploading it if Mongo has none."""
+    import gridfs
+    fs = gridfs.GridFS(db)
+    existing = db["fs.files"].find_one({"metadata.sha256": sha}, {"_id": 1})
+    if existing is not None:
+        return existing["_id"], False
+    with open(path, "rb") as f:
+        return fs.put(f, filename=filename, metadata={"sha256": sha}), True
+
+
+def _next_id(db):
+    last = db.runs.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    return (last["_id"] + 1) if last and isinstance(last["_id"], int) else 1
+
+
+def _flush_run(db, spool, key, stats):
+    """Push one run's new events; returns True once it is fully in Mongo."""
+    import pymongo
+    folder = spool.run_dir(key)
+    run = _load(os.path.join(folder, "run.json"))
+    if run is None:
+        return False
+    state_path = os.path.join(folder, "flushed.json")
+    state = _load(state_path, {"mongo_id": None, "version": -1, "metrics_offset": 0, "metrics": {}, "blobs": {}})
+
+    if state["mongo_id"] is None:
+        # claim an id the way MongoObserver does; retry if another run got it
+        while True:
+            _id = _next_id(db)
+            try:
+                db.runs.insert_one({"_id": _id, "status": "QUEUED", "spool_key": key})
+                break
+            except pymongo.errors.DuplicateKeyError:
+                continue
+        state["mongo_id"] = _id
+        _dump(state_path, state)
+    _id = state["mongo_id"]
+
+    artifacts = []
+    for a in run["artifacts"]:
+        if a["sha256"] not in state["blobs"]:
+            file_id, uploaded = _upload_blob(db, a["sha256"], spool.blob_path(a["sha256"]),
+                                             f"artifact://runs/{_id}/{a['name']}")
+            state["blobs"][a["sha256"]] = file_id
+            stats["uploaded" if uploaded else "deduplicated"] += 1
+        artifacts.append({"name": a["name"], "file_id": state["blobs"][a["sha256"]]})
+    resources = []
+    for filename, sha in run["resources"]:
+        if sha not in state["blobs"]:
+            state["blobs"][sha] = _upload_blob(db, sha, spool.blob_path(sha), filename)[0]
+        resources.append([filename, state["blobs"][sha]])
+
+    new_names = False
+    metrics_path = os.path.join(folder, "metrics.jsonl")
+    if os.path.exists(metrics_path):
+        with open(metrics_path, "rb") as f:
+            f.seek(state["metrics_offset"])
+            data = f.read()
+        # only whole lines; a partial one is finished by the next flush
+        data = data[:data.rfind(b"\n") + 1]
+        by_name = {}
+        for line in data.splitlines():
+            m = json.loads(line, object_hook=_decode)
+            by_name.setdefault(m["name"], []).append(m)
+        if by_name:
+            ops = [pymongo.UpdateOne({"run_id": _id, "name": name},
+                                     {"$push": {"steps": {"$each": [m["step"] for m in ms]},
+                                                "values": {"$each": [m["value"] for m in ms]},
+                                                "timestamps": {"$each": [m["t"] for m in ms]}}},
+                                     upsert=True) for name, ms in by_name.items()]
+            db.metrics.bulk_write(ops, ordered=False)
+            for name in by_name:
+                if name not in state["metrics"]:
+                    new_names = True
+                    doc = db.metrics.find_one({"run_id": _id, "name": name}, {"_id": 1})
+                    state["metrics"][name] = str(doc["_id"])
+            stats["metric_values"] += sum(len(ms) for ms in by_name.values())
+        state["metrics_offset"] += len(data)
+
+    if run["version"] != state["version"] or new_names:
+        doc = {k: v for k, v in run.items() if k not in ("key", "version")}
+        doc.update(_id=_id, artifacts=artifacts, resources=resources,
+                   metrics=[{"id": i, "name": n} for n, i in state["metrics"].items()])
+        db.runs.replace_one({"_id": _id}, doc, upsert=True)
+        state["version"] = run["version"]
+        stats["runs"] += 1
+    _dump(state_path, state)
+    return run["status"] in ENDED and state["version"] == _load(os.path.join(folder, "run.json"))["version"]
+
+
+def flush(db, spool=SPOOL_DIR):
+    """Push everything new in the spool to db.
+
+    Returns counts (runs updated, metric values, blobs uploaded or
+    deduplicated, runs done), or None if another flush holds the lock.
+    """
+    spool = spool if isinstance(spool, Spool) else Spool(spool)
+    lock = _Lock(os.path.join(spool.root, "flush.lock"))
+    if not lock.acquire():
+        return None
+    stats = {"runs": 0, "metric_values": 0, "uploaded": 0, "deduplicated": 0, "done": 0, "failed": 0}
+    try:
+        for key in spool.run_keys():
+            try:
+                done = _flush_run(db, spool, key, stats)
+            except Exception as e:
+                print(f"[store] Run {key} not flushed, will retry: {type(e).__name__}: {e}")
+                stats["failed"] += 1
+                continue
+            if done:
+                shutil.rmtree(spool.run_dir(key), ignore_errors=True)
+                stats["done"] += 1
+        if stats["done"]:
+            _prune_blobs(spool)
+    finally:
+        lock.release()
+    return stats
+
+
+def _prune_blobs(spool):
+    """Drop blobs that no run left in the spool refers to, unless they are
+    younger than BLOB_GRACE_S (still on their way into a run.json)."""
+    wanted = set()
+    for key in spool.run_keys():
+        run = _load(os.path.join(spool.run_dir(key), "run.json"), {})
+        wanted.update(a["sha256"] for a in run.get("artifacts", []))
+        wanted.update(sha for _, sha in run.get("resources", []))
+    cutoff = time.time() - BLOB_GRACE_S
+    for name in os.listdir(spool.blobs):
+        if name in wanted or name.startswith("."):
+            continue
+        try:
+            if os.path.getmtime(spool.blob_path(name)) < cutoff:
+                os.unlink(spool.blob_path(name))
+        except FileNotFoundError:
+            pass
+
+
+def start_flusher(spool, url, db_name, interval=FLUSH_INTERVAL_S):
+    """Daemon thread that flushes every interval seconds while the run goes
+    on; a database that is down only costs a failed attempt."""
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                flush(connect(url, db_name), spool)
+            except Exception as e:
+                print(f"[store] Flush to {url} failed, results stay in the spool: {e}")
+
+    thread = threading.Thread(target=loop, name="result-store-flush", daemon=True)
+    thread.start()
+    return thread
+
+
+def flush_detached(spool, url, db_name):
+    """Start `result_store.py flush` in its own process and return at once."""
+    cmd = [sys.executable, os.path.abspath(__file__), "flush",
+           "--spool", spool.root if isinstance(spool, Spool) else spool, "--url", url, "--db", db_name]
+    kwargs = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    return subprocess.Popen(cmd, **kwargs)
+
+
+def main(argv):
+    cfg = {}
+    config_file = os.path.join(REPO_ROOT, "animation_config.json")
+    if os.path.exists(config_file):
+        with open(config_file, "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+    parser = argparse.ArgumentParser(prog="result_store.py")
+    parser.add_argument("command", choices=("flush", "status"))
+    parser.add_argument("--spool", default=os.path.join(REPO_ROOT, cfg.get("spool_dir", "sacred_spool")))
+    parser.add_argument("--url", default=cfg.get("mongo_url", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default=cfg.get("mongo_db_name", "animate_jubilee"))
+    args = parser.parse_args(argv)
+
+    spool = Spool(args.spool)
+    if args.command == "status":
+        for key in spool.run_keys():
+            run = _load(os.path.join(spool.run_dir(key), "run.json"), {})
+            state = _load(os.path.join(spool.run_dir(key), "flushed.json"), {})
+            print(f"[store] {key}: {run.get('status')}, Mongo id {state.get('mongo_id')}")
+        print(f"[store] {len(spool.run_keys())} runs, {len(os.listdir(spool.blobs))} blobs in {spool.root}")
+        return
+    stats = flush(connect(args.url, args.db), spool)
+    if stats is None:
+        print("[store] Another flush is running.")
+    else:
+        print(f"[store] Flushed to {args.url}: {stats}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,76 @@
+"""
+Region-of-interest rendering: the math half.
+
+animation_to_gif.py renders the static scene once as a background plate,
+then renders each frame's moving parts only inside the screen rectangle
+their bounding boxes project to, and composites that crop over the plate.
+This module holds the parts that need no bpy: projecting bounding boxes to
+a pixel rectangle and alpha-compositing a crop into the plate.
+
+Pixel rectangles are (x0, y0, x1, y1), end-exclusive, with y counted from
+the bottom like Blender's render border and Image.pixels.
+
+Plain Python (no bpy).
+"""
+import numpy as np
+
+# Pixels added around the projected boxes (antialiasing filter, rounding)
+MARGIN_PX = 6
+
+
+def box_corners(bound_box):
+    """(8, 4) homogeneous local corners from an object's bound_box."""
+    corners = np.ones((8, 4))
+    corners[:, :3] = np.asarray(bound_box, dtype=np.float64).reshape(8, 3)
+    return corners
+
+
+def project_region(view_proj, matrices, corners, width, height, margin=MARGIN_PX):
+    """Pixel rectangle covering the boxes `corners` (k, 8, 4) placed by the
+    world matrices (k, 4, 4), seen through view_proj (4, 4).
+
+    Returns None if nothing is in front of the camera, and the full frame if
+    a box crosses the camera plane (its projection is unbounded).
+    """
+    if len(matrices) == 0:
+        return None
+    world = np.einsum("kij,knj->kni", matrices, corners).reshape(-1, 4)
+    clip = world @ view_proj.T
+    w = clip[:, 3]
+    if np.all(w <= 0):
+        return None
+    if np.any(w <= 1e-9):
+        return 0, 0, width, height
+    ndc = clip[:, :2] / w[:, None]
+    x = (ndc[:, 0] + 1) * 0.5 * width
+    y = (ndc[:, 1] + 1) * 0.5 * height
+    x0 = int(np.clip(np.floor(x.min()) - margin, 0, width))
+    x1 = int(np.clip(np.ceil(x.max()) + margin, 0, width))
+    y0 = int(np.clip(np.floor(y.min()) - margin, 0, height))
+    y1 = int(np.clip(np.ceil(y.max()) + margin, 0, height))
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1, y1
+
+
+def composite(plate, crop, x0, y0):
+    """Plate (H, W, 4) with a straight-alpha RGBA crop laid over it at (x0, y0)."""
+    out = plate.copy()
+    h = min(crop.shape[0], plate.shape[0] - y0)
+    w = min(crop.shape[1], plate.shape[1] - x0)
+    if h <= 0 or w <= 0:
+        return out
+    fg = crop[:h, :w]
+    alpha = fg[:, :, 3:4]
+    region = out[y0:y0 + h, x0:x0 + w]
+    region[:, :, :3] = fg[:, :, :3] * alpha + region[:, :, :3] * (1 - alpha)
+    region[:, :, 3] = 1.0
+    return out
+
+
+def area_fraction(region, width, height):
+    """Share of the frame a pixel rectangle covers (0 for None)."""
+    if region is None:
+        return 0.0
+    x0, y0, x1, y1 = region
+    return (x1 - x0) * (y1 - y0) / float(width * height)
@@ -1,12 +1,26 @@
 
 import os
 import json
+import atexit
+import tempfile
 import subprocess
 from sacred import Experiment
 from sacred.observers import MongoObserver
 
+import render_parallel
+import draft_preview
+import result_store
+from worker_client import WorkerClient, PORT as WORKER_PORT
+# from_gcode/ is on sys.path via render_parallel
+from validate import check_file
+from kinematics import Kinematics
+from scene_meta import load_scene_meta, sidecar_path
+import spans
+from spans import Span
+
 REPO_ROOT = os.path.dirname(__file__)
-CONFIG_FILE = os.path.join(REPO_ROOT, "animation_config.json")
+# sweep.py points each run at its own copy of the config
+CONFIG_FILE = os.environ.get("JUBILEE_CONFIG", os.path.join(REPO_ROOT, "animation_config.json"))
 
 # Only read config, never write
 with open(CONFIG_FILE, "r", encoding="utf-8") as f:
@@ -16,14 +30,28 @@ _DEFAULT_EXPERIMENT_NAME = _BASE.get("experiment_name", "jubilee_blender_gif")
 _DEFAULT_MONGO_URL = _BASE.get("mongo_url", "mongodb://localhost:27017")
 _DEFAULT_MONGO_DB = _BASE.get("mongo_db_name", "animate_jubilee")
 
+# "spool" records runs locally and flushes them to Mongo in the background
+# (result_store.py); "mongo" writes straight to Mongo as before
+_RESULT_STORE = _BASE.get("result_store", "spool")
+_SPOOL_DIR = os.path.join(REPO_ROOT, _BASE.get("spool_dir", "sacred_spool"))
+
 ex = Experiment(_DEFAULT_EXPERIMENT_NAME)
 
-try:
-    ex.observers.append(MongoObserver(url=_DEFAULT_MONGO_URL,
-                                      db_name=_DEFAULT_MONGO_DB))
-    print(f"[sacred] MongoObserver attached ({_DEFAULT_MONGO_URL}, db='{_DEFAULT_MONGO_DB}').")
-except Exception as e:
-    print(f"[sacred] Could not attach MongoObserver: {e}")
+if _RESULT_STORE == "spool":
+    _spool = result_store.Spool(_SPOOL_DIR)
+    ex.observers.append(result_store.SpoolObserver(_spool))
+    result_store.start_flusher(_spool, _DEFAULT_MONGO_URL, _DEFAULT_MONGO_DB,
+                               _BASE.get("spool_flush_interval_s", result_store.FLUSH_INTERVAL_S))
+    # whatever the thread has not pushed yet goes in a process of its own
+    atexit.register(result_store.flush_detached, _spool, _DEFAULT_MONGO_URL, _DEFAULT_MONGO_DB)
+    print(f"[sacred] Spooling runs to {_spool.root}, flushed to {_DEFAULT_MONGO_URL} (db='{_DEFAULT_MONGO_DB}').")
+else:
+    try:
+        ex.observers.append(MongoObserver(url=_DEFAULT_MONGO_URL,
+                                          db_name=_DEFAULT_MONGO_DB))
+        print(f"[sacred] MongoObserver attached ({_DEFAULT_MONGO_URL}, db='{_DEFAULT_MONGO_DB}').")
+    except Exception as e:
+        print(f"[sacred] Could not attach MongoObserver: {e}")
 
 
 
@@ -45,6 +73,147 @@ def cfg():
     target_object_name = _BASE.get("target_object_name", "XY-carriage")
     camera_offset = _BASE.get("camera_offset", [0.7, -1.2, 1.1])
     camera_lens = _BASE.get("camera_lens", 50)
+    # "dolly" or "pan" tracks the target over the whole toolpath (follow_camera.py)
+    camera_follow = _BASE.get("camera_follow", None)
+
+    # Parallel rendering: >1 splits the frame range over that many Blender processes
+    render_workers = _BASE.get("render_workers", 1)
+    chunk_strategy = _BASE.get("chunk_strategy", "contiguous")  # or "interleaved"
+    # Frame range for parallel runs; None asks Blender for the scene's range
+    frame_start = _BASE.get("frame_start", None)
+    frame_end = _BASE.get("frame_end", None)
+    # False pipes frames straight into the GIF encoder (single worker only)
+    keep_pngs = _BASE.get("keep_pngs", False)
+    # Send single-process runs to a running blender_worker.py when it has
+    # blend_file loaded (falls back to a fresh Blender otherwise)
+    use_worker = _BASE.get("use_worker", True)
+    worker_port = _BASE.get("worker_port", WORKER_PORT)
+    # Folder for this run's frames and GIF (set by sweep.py); None keeps
+    # render_gif/ and docs/jubilee_test.gif
+    run_dir = _BASE.get("run_dir", None)
+    # True skips Blender and draws the toolpath preview (draft_preview.py) instead
+    draft = _BASE.get("draft", False)
+
+
+def run_parallel(_run, blender_exe, blend_file, script_file, test_mode, test_max_frames,
+                 fps, scale_width, render_workers, chunk_strategy, frame_start, frame_end,
+                 out_root, gif_path, spans_file):
+    """Render with several background Blenders and stitch the GIF; returns the first frame's path."""
+    if frame_start is None or frame_end is None:
+        if _BASE.get("playback_mode") == "handler":
+            probed = render_parallel.toolpath_frame_range(
+                _BASE.get("toolpath", "//from_gcode/pathout.tpath"), blend_file)
+        else:
+            probed = render_parallel.probe_frame_range(blender_exe, blend_file)
+        frame_start = probed[0] if frame_start is None else frame_start
+        frame_end = probed[1] if frame_end is None else frame_end
+    if test_mode:
+        frame_end = min(frame_end, frame_start + test_max_frames - 1)
+
+    chunks = render_parallel.split_frames(frame_start, frame_end, render_workers, chunk_strategy)
+    threads = max(1, (os.cpu_count() or 1) // len(chunks))
+    records = render_parallel.render_parallel(blender_exe, blend_file, script_file, chunks, out_root,
+                                              threads_per_worker=threads,
+                                              extra_args=["--config", os.path.abspath(CONFIG_FILE),
+                                                          "--spans", spans_file])
+
+    _run.info["parallel"] = {
+        "workers": len(chunks),
+        "chunk_strategy": chunk_strategy,
+        "threads_per_worker": threads,
+        "frame_start": frame_start,
+        "frame_end": frame_end,
+        "chunks": records,
+    }
+    for r in records:
+        _run.log_scalar("worker_wall_s", r["wall_s"], r["worker"])
+        _run.log_scalar("worker_s_per_frame", r["wall_s"] / max(r["frames"], 1), r["worker"])
+
+    frames = render_parallel.collect_frames([r["output_dir"] for r in records])
+    with Span("runner/stitch", frames=len(frames)):
+        render_parallel.stitch_gif(frames, gif_path, fps, scale_width, os.path.join(out_root, "stitched"))
+    return frames[0][1] if frames else None
+
+
+def check_limits(_run, blend_file, model):
+    """Validate the handler-mode toolpath before any Blender time is spent."""
+    limit_check = _BASE.get("limit_check", "warn")
+    if limit_check == "off" or _BASE.get("playback_mode") != "handler":
+        return
+    path = render_parallel.blend_relative(_BASE.get("toolpath", "//from_gcode/pathout.tpath"), blend_file)
+    if not os.path.exists(path):
+        return
+    report = check_file(path, model)
+    print(report.summary())
+    _run.info["limits"] = report.to_dict()
+    if limit_check == "fail":
+        report.raise_if_failed()
+
+
+def log_spans(_run, spans_file, offset):
+    """Ingest the spans this run appended to spans_file (runner and Blender)."""
+    records = spans.read_spans(spans_file, offset)
+    if not records:
+        return
+    for r in records:
+        if r["stage"] == "gif/frame":
+            _run.log_scalar("frame_render_s", r["wall_s"], r.get("frame"))
+    stages = spans.summarize(records)
+    for stage, agg in stages.items():
+        if stage != "gif/frame":
+            _run.log_scalar(f"{stage}/wall_s", agg["wall_s"])
+            _run.log_scalar(f"{stage}/cpu_s", agg["cpu_s"])
+            if agg["rss_growth_mb"] is not None:
+                _run.log_scalar(f"{stage}/rss_growth_mb", agg["rss_growth_mb"])
+    peaks = [agg["process_peak_rss_mb"] for agg in stages.values() if agg["process_peak_rss_mb"] is not None]
+    if peaks:
+        _run.log_scalar("process_peak_rss_mb", max(peaks))
+    # What the Blender process spent outside the script: start-up and loading the .blend
+    if "runner/blender" in stages and stages.get("gif/main", {}).get("count") == 1:
+        startup = stages["runner/blender"]["wall_s"] - stages["gif/main"]["wall_s"]
+        stages["runner/blender"]["startup_s"] = startup
+        _run.log_scalar("blender_startup_s", startup)
+    _run.info["spans"] = {"path": spans_file, "stages": stages}
+
+
+def log_render_stats(_run, render_dir):
+    """Sum the render_stats.json files left by animation_to_gif.py (one per worker)."""
+    frames = {"frames": 0, "unique_poses": 0, "duplicated": 0}
+    cache = {"hits": 0, "misses": 0, "evictions": 0}
+    roi = {"frames": 0, "mean_area": 0.0, "max_area": 0.0}
+    found = cached = False
+    for dirpath, _, names in os.walk(render_dir):
+        if "render_stats.json" not in names:
+            continue
+        with open(os.path.join(dirpath, "render_stats.json"), "r", encoding="utf-8") as f:
+            stats = json.load(f)
+        found = True
+        for k in frames:
+            frames[k] += stats.get(k, 0)
+        if "cache" in stats:
+            cached = True
+            for k in cache:
+                cache[k] += stats["cache"].get(k, 0)
+        if stats.get("roi", {}).get("frames"):
+            n = roi["frames"] + stats["roi"]["frames"]
+            roi["mean_area"] = (roi["mean_area"] * roi["frames"]
+                                + stats["roi"]["mean_area"] * stats["roi"]["frames"]) / n
+            roi["max_area"] = max(roi["max_area"], stats["roi"]["max_area"])
+            roi["frames"] = n
+    if not found:
+        return
+    _run.info["render_frames"] = frames
+    _run.log_scalar("frames_rendered", frames["unique_poses"])
+    _run.log_scalar("frames_duplicated", frames["duplicated"])
+    if cached:
+        lookups = cache["hits"] + cache["misses"]
+        cache["hit_rate"] = cache["hits"] / lookups if lookups else 0.0
+        _run.info["render_cache"] = cache
+        _run.log_scalar("render_cache_hits", cache["hits"])
+        _run.log_scalar("render_cache_misses", cache["misses"])
+    if roi["frames"]:
+        _run.info["roi_render"] = roi
+        _run.log_scalar("roi_mean_area", roi["mean_area"])
 
 
 @ex.automain
@@ -59,16 +228,52 @@ def run(_run,
         render_res_x,
         render_res_y,
         render_res_percent,
-        target_object_name):
+        target_object_name,
+        render_workers,
+        chunk_strategy,
+        frame_start,
+        frame_end,
+        keep_pngs,
+        use_worker,
+        worker_port,
+        run_dir,
+        draft):
     """Sacred entry: write JSON config (including paths), then call Blender."""
 
 
     _run.info["config_file"] = CONFIG_FILE
 
+    if run_dir:
+        os.makedirs(run_dir, exist_ok=True)
+        render_dir = os.path.join(run_dir, "render_gif")
+        gif_path = os.path.join(run_dir, "animation.gif")
+    else:
+        render_dir = os.path.join(REPO_ROOT, "render_gif")
+        gif_path = os.path.join(REPO_ROOT, "docs", "jubilee_test.gif")
+    render_dir = os.path.abspath(render_dir)
+    gif_path = os.path.abspath(gif_path)
+    _run.info["run_dir"] = run_dir
+
+    # Everything this run times (here and inside Blender) is appended to one
+    # log in its run folder, or a temporary one removed once it is in Sacred;
+    # only what comes after `spans_offset` belongs to this run
+    if run_dir:
+        spans_file = os.path.abspath(os.path.join(run_dir, "spans.jsonl"))
+    else:
+        fd, spans_file = tempfile.mkstemp(prefix="jubilee-spans-", suffix=".jsonl")
+        os.close(fd)
+    spans.set_path(spans_file)
+    spans_offset = spans.log_size(spans_file)
+
+    script_args = ["--config", os.path.abspath(CONFIG_FILE), "--output-dir", render_dir, "--gif", gif_path,
+                   "--spans", spans_file]
+    if not keep_pngs:
+        script_args.append("--stream")
     cmd = [
         blender_exe,
         "-b", blend_file,
         "-P", script_file,
+        "--", *script_args,
     ]
 
     _run.info["blender_cmd"] = " ".join(cmd)
@@ -76,16 +281,60 @@ def run(_run,
     _run.info["mongo_url"] = _DEFAULT_MONGO_URL
     _run.info["mongo_db_name"] = _DEFAULT_MONGO_DB
 
-    print("[sacred] Running:", " ".join(cmd))
-    subprocess.run(cmd, check=True)
+    try:
+        # Limits, names and frame range without opening the .blend (Blender only
+        # runs here when the sidecar is missing or stale)
+        with Span("runner/scene_meta"):
+            meta = load_scene_meta(blend_file, blender_exe)
+        model = None
+        if meta is not None:
+            model = Kinematics.from_spec(meta["kinematics"])
+            _run.info["scene_meta"] = {"path": sidecar_path(blend_file), "blend_sha256": meta["blend"]["sha256"]}
+
+        with Span("runner/check_limits"):
+            check_limits(_run, blend_file, model)
+
+        if draft:
+            toolpath = render_parallel.blend_relative(_BASE.get("toolpath", "//from_gcode/pathout.tpath"), blend_file)
+            with Span("runner/draft"):
+                draft_preview.render_preview(toolpath, gif_path, fps,
+                                             size=_BASE.get("draft_size", draft_preview.DRAFT_SIZE),
+                                             max_frames=_BASE.get("draft_max_frames", draft_preview.DRAFT_MAX_FRAMES),
+                                             model=model, work_dir=os.path.join(render_dir, "_draft"))
+            first_frame = None
+        elif render_workers > 1:
+            with Span("runner/parallel", workers=render_workers):
+                first_frame = run_parallel(_run, blender_exe, blend_file, script_file, test_mode, test_max_frames,
+                                           fps, scale_width, render_workers, chunk_strategy, frame_start, frame_end,
+                                           render_dir, gif_path, spans_file)
+        else:
+            first_frame = os.path.join(render_dir, "frame_0001.png")
+            worker = WorkerClient(worker_port)
+            if use_worker and worker.serves(blend_file):
+                print(f"[sacred] Sending the job to the Blender worker on port {worker_port}")
+                with Span("runner/worker"):
+                    reply = worker.run(script_file, script_args)
+                _run.info["worker"] = {"port": worker_port, "wall_s": reply["wall_s"], "result": reply["result"]}
+                _run.log_scalar("worker_job_wall_s", reply["wall_s"])
+            else:
+                print("[sacred] Running:", " ".join(cmd))
+                with Span("runner/blender"):
+                    subprocess.run(cmd, check=True)
+    finally:
+        # read back even after a failure, and never leave a temporary log behind
+        try:
+            log_spans(_run, spans_file, spans_offset)
+        finally:
+            if not run_dir:
+                spans.set_path(None)
+                os.remove(spans_file)
+                _run.info.get("spans", {}).pop("path", None)
+    log_render_stats(_run, render_dir)
 
-    # The Blender script writes the GIF to docs/jubilee_test.gif by default
-    gif_path = os.path.join(os.path.dirname(__file__), "docs", "jubilee_test.gif")
     if os.path.exists(gif_path):
         _run.add_artifact(gif_path, name="animation.gif")
         _run.info["gif_path"] = gif_path
 
-    first_frame = os.path.join(os.path.dirname(__file__), "render_gif", "frame_0001.png")
-    if os.path.exists(first_frame):
+    if first_frame and os.path.exists(first_frame):
         _run.add_artifact(first_frame, name="first_frame.png")
         _run.info["first_frame_path"] = first_frame
@@ -0,0 +1,122 @@
+"""
+Parameter sweep: one Sacred run per combination of config overrides, a few
+at a time.
+
+    python sweep.py grid.json [--jobs 2] [--base animation_config.json]
+
+grid.json maps config keys to the values to try, e.g.
+
+    {"camera_offset": [[0.5, 0, 1.1], [0.7, -1.2, 1.1]],
+     "resolution": [[300, 300], [800, 800]],
+     "fps": [12, 24],
+     "toolpath": ["//from_gcode/a.tpath", "//from_gcode/b.tpath"]}
+
+and every combination becomes a run ("resolution" sets render_res_x and
+render_res_y together). Each run gets its own folder under
+sweeps/<timestamp>/ with its own animation_config.json (the base config plus
+its overrides), frames, GIF and log, and is a separate sacred_runner.py
+process, so runs share nothing but the render cache. sweep.json in the sweep
+folder lists the runs, their overrides and how they ended.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILE = os.path.join(REPO_ROOT, "animation_config.json")
+SWEEP_ROOT = os.path.join(REPO_ROOT, "sweeps")
+
+# Grid keys that set several config keys at once
+ALIASES = {"resolution": ("render_res_x", "render_res_y")}
+
+
+def expand_grid(grid):
+    """All combinations of the grid's values, as config override dicts."""
+    keys = list(grid)
+    runs = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        overrides = {}
+        for key, value in zip(keys, values):
+            if key in ALIASES:
+                overrides.update(zip(ALIASES[key], value))
+            else:
+                overrides[key] = value
+        runs.append(overrides)
+    return runs
+
+
+def prepare_run(base, overrides, run_dir):
+    """Write run_dir/animation_config.json (base + overrides); returns its path."""
+    os.makedirs(run_dir, exist_ok=True)
+    cfg = dict(base, **overrides, run_dir=run_dir)
+    path = os.path.join(run_dir, "animation_config.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cfg, f, indent=2)
+    return path
+
+
+def run_one(config_path, run_dir):
+    """Run sacred_runner.py on one run's config; returns (returncode, wall_s)."""
+    env = dict(os.environ, JUBILEE_CONFIG=config_path)
+    cmd = [sys.executable, os.path.join(REPO_ROOT, "sacred_runner.py")]
+    t0 = time.perf_counter()
+    with open(os.path.join(run_dir, "sacred.log"), "w", encoding="utf-8") as log:
+        proc = subprocess.run(cmd, cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return proc.returncode, time.perf_counter() - t0
+
+
+def sweep(grid, base, jobs=2, out_root=SWEEP_ROOT):
+    """Run every grid point, at most `jobs` at once; returns the run records."""
+    runs = expand_grid(grid)
+    sweep_dir = os.path.join(out_root, time.strftime("%Y%m%d-%H%M%S"))
+    if jobs > 1 and "use_worker" not in grid:
+        # A worker runs one job at a time; it would serialise the sweep
+        base = dict(base, use_worker=False)
+
+    records = []
+    for i, overrides in enumerate(runs):
+        run_dir = os.path.join(sweep_dir, f"run_{i:03d}")
+        records.append({"run": i, "run_dir": run_dir, "overrides": overrides,
+                        "config": prepare_run(base, overrides, run_dir)})
+    print(f"[sweep] {len(records)} runs, {jobs} at a time, in {sweep_dir}")
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(run_one, r["config"], r["run_dir"]): r for r in records}
+        for future in as_completed(futures):
+            r = futures[future]
+            r["returncode"], r["wall_s"] = future.result()
+            status = "ok" if r["returncode"] == 0 else f"FAILED ({r['returncode']})"
+            print(f"[sweep] run_{r['run']:03d} {status} in {r['wall_s']:.1f} s  {r['overrides']}")
+
+    with open(os.path.join(sweep_dir, "sweep.json"), "w", encoding="utf-8") as f:
+        json.dump({"grid": grid, "jobs": jobs, "runs": records}, f, indent=2)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="sweep.py")
+    parser.add_argument("grid", help="JSON file mapping config keys to lists of values")
+    parser.add_argument("--base", default=CONFIG_FILE, help="config the overrides apply to")
+    parser.add_argument("--jobs", type=int, help="runs at once (default: sweep_jobs in the config)")
+    args = parser.parse_args()
+
+    with open(args.grid, "r", encoding="utf-8") as f:
+        grid = json.load(f)
+    with open(args.base, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    jobs = max(1, args.jobs or int(base.get("sweep_jobs", 2)))
+
+    records = sweep(grid, base, jobs)
+    failed = [r for r in records if r["returncode"] != 0]
+    if failed:
+        print(f"[sweep] {len(failed)} of {len(records)} runs failed; see sacred.log in their folders.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from gcodedata import parse_lines
+
+
+def arc_points(lines, **kw):
+    """XY of every chord point of the last move, from the pose before it."""
+    p = parse_lines(lines, **kw)
+    last = p.line[-1]
+    rows = np.flatnonzero(p.line == last)
+    return p.xyz[rows[0] - 1:], p
+
+
+def radii(points, centre):
+    return np.hypot(points[:, 0] - centre[0], points[:, 1] - centre[1])
+
+
+def sagitta(points, centre):
+    """Largest gap between each chord's midpoint and the arc."""
+    mid = (points[1:] + points[:-1]) / 2
+    r = radii(points[:1], centre)[0]
+    return np.max(r - radii(mid, centre))
+
+
+def test_ij_quarter_circle_ccw():
+    pts, _ = arc_points(["G1 X10 Y0", "G3 X0 Y10 I-10 J0"])
+    np.testing.assert_allclose(radii(pts, (0, 0)), 10)
+    np.testing.assert_allclose(pts[-1, :2], [0, 10])
+    # counter-clockwise: the angle only grows
+    assert np.all(np.diff(np.arctan2(pts[:, 1], pts[:, 0])) > 0)
+    assert sagitta(pts, (0, 0)) <= 0.01 + 1e-12
+
+
+def test_ij_clockwise_goes_the_other_way():
+    pts, _ = arc_points(["G1 X10 Y0", "G2 X0 Y10 I-10 J0"])
+    # three quarters round, through negative Y
+    assert pts[:, 1].min() == pytest.approx(-10, abs=0.05)
+    assert np.all(np.diff(np.unwrap(np.arctan2(pts[:, 1], pts[:, 0]))) < 0)
+
+
+@pytest.mark.parametrize("r, short", [(10, True), (-10, False)])
+def test_signed_r_picks_the_short_or_long_arc(r, short):
+    pts, _ = arc_points(["G1 X10 Y0", f"G2 X0 Y-10 R{r}"])
+    centre = (0, 0) if short else (10, -10)
+    np.testing.assert_allclose(radii(pts, centre), 10, atol=1e-9)
+    sweep = abs(np.unwrap(np.arctan2(pts[:, 1] - centre[1], pts[:, 0] - centre[0]))[-1]
+                - np.arctan2(pts[0, 1] - centre[1], pts[0, 0] - centre[0]))
+    assert sweep == pytest.approx(np.pi / 2 if short else 3 * np.pi / 2)
+
+
+def test_full_circle_with_helical_z():
+    pts, _ = arc_points(["G1 X5 Y0 Z0", "G2 X5 Y0 Z2 I-5 J0"], arc_max_segments=1000)
+    np.testing.assert_allclose(radii(pts, (0, 0)), 5)
+    # same start and end with I/J is one whole turn, clockwise
+    turn = np.unwrap(np.arctan2(pts[:, 1], pts[:, 0]))
+    assert turn[-1] - turn[0] == pytest.approx(-2 * np.pi)
+    np.testing.assert_allclose(pts[-1], [5, 0, 2])
+    assert np.all(np.diff(pts[:, 2]) > 0)
+    assert sagitta(pts, (0, 0)) <= 0.01 + 1e-12
+
+
+def test_tolerance_and_segment_cap():
+    fine, _ = arc_points(["G1 X10", "G3 X-10 Y0 I-10 J0"], arc_tolerance=0.001)
+    coarse, _ = arc_points(["G1 X10", "G3 X-10 Y0 I-10 J0"], arc_tolerance=0.1)
+    assert len(fine) > len(coarse)
+    capped, p = arc_points(["G1 X10", "G3 X-10 Y0 I-10 J0"], arc_tolerance=1e-6, arc_max_segments=8)
+    assert len(capped) == 8 + 1
+    assert (p.line == 2).sum() == 8
+
+
+def test_relative_arc_endpoint():
+    pts, _ = arc_points(["G1 X10 Y0", "G91", "G3 X-10 Y10 I-10 J0"])
+    np.testing.assert_allclose(pts[-1, :2], [0, 10])
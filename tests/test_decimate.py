@@ -0,0 +1,52 @@
+import time
+
+import numpy as np
+
+from decimate import rdp_mask, decimate_channel
+from keyframes import INTERPOLATION
+
+
+def max_error(frames, values, keep):
+    return np.abs(np.interp(frames, frames[keep], values[keep]) - values).max()
+
+
+def test_keeps_ends_and_corners():
+    frames = np.arange(9, dtype=np.float64)
+    values = np.array([0, 1, 2, 3, 4, 3, 2, 1, 0], dtype=np.float64)
+    assert np.flatnonzero(rdp_mask(frames, values, 0.01)).tolist() == [0, 4, 8]
+
+
+def test_error_within_tolerance():
+    rng = np.random.default_rng(0)
+    frames = np.arange(5000, dtype=np.float64)
+    for values in (np.cumsum(rng.standard_normal(5000)), 50 * np.sin(frames / 40)):
+        keep = rdp_mask(frames, values, 0.05)
+        assert keep[0] and keep[-1]
+        assert max_error(frames, values, keep) <= 0.05
+
+
+def test_holds_are_constant():
+    frames = np.arange(6, dtype=np.float64)
+    f, v, interp = decimate_channel(frames, [0, 0, 0, 5, 5, 5], 0.01)
+    assert f.tolist() == [0, 2, 3, 5]
+    assert interp.tolist() == [INTERPOLATION["CONSTANT"], INTERPOLATION["LINEAR"],
+                               INTERPOLATION["CONSTANT"], INTERPOLATION["LINEAR"]]
+
+
+def test_flat_channel_collapses():
+    f, v, _ = decimate_channel(np.arange(100.0), np.full(100, 3.0), 0.01)
+    assert f.tolist() == [0.0] and v.tolist() == [3.0]
+
+
+def test_repetitive_path_is_not_quadratic():
+    # back-and-forth moves with eased ends, like the "corners" benchmark job:
+    # splitting one corner per pass took about a minute here
+    n, leg = 200_000, 100
+    t = (np.arange(n) % leg) / leg
+    ease = t * t * (3 - 2 * t)
+    values = np.where((np.arange(n) // leg) % 2 == 0, ease, 1 - ease) * 300.0
+    frames = np.arange(n, dtype=np.float64)
+    t0 = time.perf_counter()
+    keep = rdp_mask(frames, values, 0.01)
+    assert time.perf_counter() - t0 < 5.0
+    assert max_error(frames, values, keep) <= 0.01
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from follow_camera import dead_zone
+
+
+def dead_zone_loop(values, radius):
+    out = np.array(values, dtype=np.float64)
+    for t in range(1, len(out)):
+        out[t] = np.clip(out[t - 1], out[t] - radius, out[t] + radius)
+    return out
+
+
+@pytest.mark.parametrize("n", [2, 3, 100, 1025])
+def test_matches_the_frame_loop(n):
+    rng = np.random.default_rng(n)
+    values = np.cumsum(rng.standard_normal((n, 3)), axis=0)
+    np.testing.assert_allclose(dead_zone(values, 0.7), dead_zone_loop(values, 0.7))
+    np.testing.assert_allclose(dead_zone(values[:, 0], 2.0), dead_zone_loop(values[:, 0], 2.0))
+
+
+def test_small_moves_hold_the_aim():
+    jitter = 5 + 0.004 * np.sin(np.arange(200))
+    out = dead_zone(jitter, 0.01)
+    assert np.all(out == out[0])
+
+
+def test_aim_trails_by_the_radius():
+    ramp = np.linspace(0, 10, 101)
+    out = dead_zone(ramp, 0.5)
+    assert np.all(np.abs(out - ramp) <= 0.5 + 1e-12)
+    np.testing.assert_allclose(out[10:], ramp[10:] - 0.5)
+
+
+def test_degenerate_inputs():
+    values = np.arange(5.0)
+    assert dead_zone(values, 0).tolist() == values.tolist()
+    assert dead_zone(values[:1], 1).tolist() == [0.0]
+    assert dead_zone(values, 1) is not values
@@ -0,0 +1,65 @@
+import numpy as np
+
+from gcodedata import ParserState, parse_gcode, parse_lines
+
+
+def xyz(lines, **kw):
+    return parse_lines(lines, **kw).xyz.tolist()
+
+
+def test_absolute_moves_fill_missing_axes():
+    assert xyz(["G1 X10 Y5", "G1 Z2", "G0 X1"]) == [[0, 0, 0], [10, 5, 0], [10, 5, 2], [1, 5, 2]]
+
+
+def test_relative_moves_accumulate():
+    assert xyz(["G1 X10", "G91", "G1 X1 Y1", "G1 X1", "G90", "G1 X0"]) == \
+        [[0, 0, 0], [10, 0, 0], [11, 1, 0], [12, 1, 0], [0, 1, 0]]
+
+
+def test_g92_renames_work_coordinates():
+    # after G92 X0 at machine X10, X5 means machine X15
+    assert xyz(["G1 X10 Y10", "G92 X0", "G1 X5 Y5"]) == [[0, 0, 0], [10, 10, 0], [15, 5, 0]]
+
+
+def test_g28_homes_given_axes_and_clears_their_offset():
+    assert xyz(["G1 X10 Y10 Z10", "G92 X0", "G28 X", "G1 X5"]) == \
+        [[0, 0, 0], [10, 10, 10], [0, 10, 10], [5, 10, 10]]
+    assert xyz(["G1 X10 Y10 Z10", "G28"])[-1] == [0, 0, 0]
+
+
+def test_feed_is_modal_and_comments_are_skipped():
+    p = parse_lines(["G1 X1 F600 ; first", "; comment only", "G1X2", "M104 S200", "G1 X3 F1200"])
+    assert p.f.tolist() == [0, 600, 600, 1200]
+    assert p.line.tolist() == [0, 1, 3, 5]
+
+
+def test_line_numbers_and_checksums_are_stripped():
+    lines = ["N10 G1 X5*12", "N11 G1 Y2 F600 *97", "N12G1Z1*3", "n13 G91", "N14 G1 X1", "N15*40", "M117 N5"]
+    p = parse_lines(lines)
+    assert p.xyz.tolist() == [[0, 0, 0], [5, 0, 0], [5, 2, 0], [5, 2, 1], [6, 2, 1]]
+    assert p.line.tolist() == [0, 1, 2, 3, 5]
+    assert p.f.tolist() == [0, 0, 600, 600, 600]
+
+
+def test_state_carries_across_calls():
+    state = ParserState()
+    parse_lines(["G91", "G1 X1 F300", "G92 Y0"], state=state)
+    p = parse_lines(["G1 X1"], state=state, include_start=False)
+    assert p.xyz.tolist() == [[2, 0, 0]]
+    assert state.relative and state.feed == 300
+    assert ParserState.from_dict(state.to_dict()).pos.tolist() == [2, 0, 0]
+
+
+def test_chunked_file_matches_in_memory(tmp_path):
+    rng = np.random.default_rng(0)
+    lines = []
+    for i in range(500):
+        lines.append(rng.choice(["G90", "G91", "G92 X0", "G28 Y"]) if i % 37 == 0 else
+                     f"G1 X{rng.uniform(-5, 5):.3f} Y{rng.uniform(-5, 5):.3f} F{1000 + i}")
+    fn = tmp_path / "job.gcode"
+    fn.write_text("\n".join(lines) + "\n")
+    whole = parse_lines(lines)
+    for chunk_bytes in (64, 1 << 22):
+        chunked = parse_gcode(str(fn), chunk_bytes=chunk_bytes)
+        np.testing.assert_allclose(chunked.xyz, whole.xyz)
+        np.testing.assert_array_equal(chunked.line, whole.line)
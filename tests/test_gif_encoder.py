@@ -0,0 +1,27 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from gif_encoder import encode_png_sequence
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs ffmpeg on PATH")
+
+
+def gif_frames(path, size=16):
+    raw = subprocess.run(["ffmpeg", "-loglevel", "error", "-i", path, "-f", "rawvideo",
+                          "-pix_fmt", "gray", "-"], check=True, capture_output=True).stdout
+    return len(raw) // (size * size)
+
+
+@pytest.mark.parametrize("first", [1, 10, 250])
+def test_sequence_starting_past_the_default_range(tmp_path, first):
+    subprocess.run(["ffmpeg", "-loglevel", "error", "-f", "lavfi", "-i", "testsrc=size=16x16:rate=12",
+                    "-frames:v", "6", "-start_number", str(first), str(tmp_path / "frame_%04d.png")],
+                   check=True)
+    gif = str(tmp_path / "out.gif")
+    encode_png_sequence(str(tmp_path / "frame_%04d.png"), gif, 12, 16, str(tmp_path / "_gif"),
+                        start_number=first)
+    assert gif_frames(gif) == 6
+    assert not os.path.exists(tmp_path / "_gif" / "palette.png")
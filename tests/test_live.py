@@ -0,0 +1,54 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from livefeed import LATENCY_TARGET_MS, PUMP_INTERVAL, LiveFeed
+from live_sender import send
+
+# X grows with every line, so poses applied out of order would show
+LINES = [f"G1 X{i * 0.01:.2f} Y{(i * 3) % 100} F6000" for i in range(20000)]
+
+
+@pytest.fixture
+def feed():
+    """A headless LiveFeed on a free localhost port, pumped at 60 Hz; yields (port, poses)."""
+    feed = LiveFeed(port=0)
+    poses = []
+    stop = threading.Event()
+
+    def loop():
+        while not stop.is_set():
+            feed.pump(lambda pos: poses.append(pos[0]))
+            time.sleep(PUMP_INTERVAL)
+
+    pumper = threading.Thread(target=loop, daemon=True)
+    pumper.start()
+    yield feed.server.getsockname()[1], poses
+    stop.set()
+    pumper.join()
+    feed.close()
+
+
+def check_order(lines, lat, poses):
+    assert np.isfinite(lat).all()
+    assert np.all(np.diff(poses) > 0)
+    assert poses[-1] == pytest.approx(float(lines[-1].split()[1][1:]))
+
+
+def test_windowed_sender_meets_latency_target(feed):
+    port, poses = feed
+    # a 16-line window acks about 16 lines per pump, so keep the job short
+    lines = LINES[:2000]
+    lat = send(lines, port=port, window=16)
+    check_order(lines, lat, poses)
+    assert np.percentile(lat, 95) <= LATENCY_TARGET_MS
+
+
+def test_unpaced_flood_stays_in_order(feed):
+    port, poses = feed
+    lat = send(LINES, port=port)
+    check_order(LINES, lat, poses)
+    # coalesced into a few poses per pump rather than one per line
+    assert len(poses) < len(LINES) / 100
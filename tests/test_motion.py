@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from motion import plan_motion, sample_at_fps, sample_plan
+
+
+def test_single_move_trapezoid():
+    # 100 mm in X at F3000 (50 mm/s): from and to the 15 mm/s jerk speed at 1000 mm/s^2
+    plan = plan_motion([[0, 0, 0], [100, 0, 0]], [0, 3000])
+    assert plan.v0[0] == pytest.approx(15) and plan.v1[0] == pytest.approx(15)
+    assert plan.vp[0] == pytest.approx(50)
+    d_ramp = (50 ** 2 - 15 ** 2) / 2000
+    assert plan.total_time == pytest.approx(2 * 0.035 + (100 - 2 * d_ramp) / 50)
+
+
+def test_short_move_never_reaches_cruise():
+    plan = plan_motion([[0, 0, 0], [1, 0, 0]], [0, 6000])
+    assert plan.vp[0] < 100
+    assert plan.t_cruise[0] == pytest.approx(0, abs=1e-12)
+    d = (plan.vp[0] ** 2 - plan.v0[0] ** 2) / 2000 + (plan.vp[0] ** 2 - plan.v1[0] ** 2) / 2000
+    assert d == pytest.approx(1)
+
+
+def test_junction_speeds():
+    # straight through keeps cruising; a right angle slows to the jerk limit
+    straight = plan_motion([[0, 0, 0], [50, 0, 0], [100, 0, 0]], [0, 3000, 3000])
+    assert straight.v1[0] == pytest.approx(50)
+    corner = plan_motion([[0, 0, 0], [50, 0, 0], [50, 50, 0]], [0, 3000, 3000])
+    assert corner.v1[0] == pytest.approx(15)
+
+
+def test_axis_speed_cap_and_default_feed():
+    z = plan_motion([[0, 0, 0], [0, 0, 100]], [0, 6000])
+    assert z.vp[0] == pytest.approx(16)
+    x = plan_motion([[0, 0, 0], [100, 0, 0]], [0, 0], default_feed=1200)
+    assert x.vp[0] == pytest.approx(20)
+
+
+def test_zero_length_moves_are_dropped():
+    plan = plan_motion([[0, 0, 0], [0, 0, 0], [10, 0, 0], [10, 0, 0], [10, 10, 0]], [0] * 5)
+    assert plan.vertex.tolist() == [1, 3]
+    assert plan_motion([[1, 2, 3]], [0]).total_time == 0
+
+
+def test_samples_follow_the_profile():
+    xyz = np.array([[0, 0, 0], [100, 0, 0], [100, 60, 0], [0, 60, 5]], dtype=np.float64)
+    plan = plan_motion(xyz, [0, 6000, 3000, 6000])
+    points, vertex = sample_at_fps(plan, 240)
+    assert points[0].tolist() == [0, 0, 0]
+    np.testing.assert_allclose(points[-1], xyz[-1], atol=1e-9)
+    assert np.all(np.diff(vertex) >= 0)
+    speed = np.linalg.norm(np.diff(points, axis=0), axis=1) * 240
+    assert speed.max() <= plan.vp.max() * (1 + 1e-9)
+    # within a move, speed changes no faster than that move's acceleration
+    t = np.arange(0, plan.total_time, 0.001)
+    p, k = sample_plan(plan, t)
+    v = np.linalg.norm(np.diff(p, axis=0), axis=1) / 0.001
+    same = k[:-2] == k[2:]
+    accel = np.abs(np.diff(v)) / 0.001
+    assert np.all(accel[same] <= plan.accel[k[:-2]][same] * 1.01)
@@ -0,0 +1,32 @@
+import os
+
+from render_cache import FrameCache, frame_key
+
+
+def test_restoring_a_key_counts_its_bytes_once(tmp_path):
+    frame = tmp_path / "frame.png"
+    frame.write_bytes(bytes(1000))
+    cache = FrameCache(str(tmp_path / "cache"), max_bytes=2500)
+    key = frame_key({"x": 1})
+    for _ in range(5):
+        cache.store(key, str(frame))
+    assert cache._bytes == 1000 and cache.evictions == 0
+
+    frame.write_bytes(bytes(400))
+    cache.store(key, str(frame))
+    assert cache._bytes == 400
+
+
+def test_evicts_least_recently_used(tmp_path):
+    frame = tmp_path / "frame.png"
+    frame.write_bytes(bytes(1000))
+    cache = FrameCache(str(tmp_path / "cache"), max_bytes=2500)
+    keys = [frame_key({"x": i}) for i in range(3)]
+    cache.store(keys[0], str(frame))
+    cache.store(keys[1], str(frame))
+    os.utime(cache._path(keys[0]), (1, 1))
+    cache.store(keys[2], str(frame))
+    assert cache.evictions >= 1 and cache._bytes <= 0.9 * 2500
+    assert cache.fetch(keys[1], str(tmp_path / "out1.png"))
+    assert cache.fetch(keys[2], str(tmp_path / "out2.png"))
+    assert not cache.fetch(keys[0], str(tmp_path / "out0.png"))
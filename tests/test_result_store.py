@@ -0,0 +1,137 @@
+import datetime
+import json
+import os
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+pytest.importorskip("gridfs")
+import mongomock.gridfs
+
+import result_store
+from result_store import Spool, SpoolObserver, flush
+
+EX = {"name": "animate_jubilee"}
+HOST = {"hostname": "test"}
+T0 = datetime.datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def db():
+    mongomock.gridfs.enable_gridfs_integration()
+    return mongomock.MongoClient().db
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return Spool(str(tmp_path / "spool"))
+
+
+def start(spool, _id=None):
+    obs = SpoolObserver(spool)
+    obs.started_event(EX, "run", HOST, T0, {"fps": 24}, {}, _id)
+    return obs
+
+
+def metric(obs, name, steps, values):
+    obs.log_metrics({name: {"steps": steps, "values": values, "timestamps": [T0] * len(steps)}}, {})
+
+
+def test_identical_artifacts_are_stored_once(db, spool, tmp_path):
+    gif = tmp_path / "out.gif"
+    gif.write_bytes(b"GIF89a" + bytes(1000))
+    a, b = start(spool), start(spool)
+    a.artifact_event("out.gif", str(gif))
+    b.artifact_event("out.gif", str(gif))
+    stats = flush(db, spool)
+    assert (stats["uploaded"], stats["deduplicated"]) == (1, 1)
+    assert db["fs.files"].count_documents({}) == 1
+    ids = {r["artifacts"][0]["file_id"] for r in db.runs.find()}
+    assert len(ids) == 1
+    assert len(os.listdir(spool.blobs)) == 1
+
+
+def test_partial_metrics_line_waits_for_next_flush(db, spool):
+    obs = start(spool)
+    metric(obs, "frames", [0, 1], [10, 11])
+    path = os.path.join(spool.run_dir(obs.key), "metrics.jsonl")
+    line = json.dumps({"name": "frames", "step": 2, "value": 12, "t": {"$date": T0.isoformat()}})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line[:10])
+    assert flush(db, spool)["metric_values"] == 2
+    assert db.metrics.find_one({"name": "frames"})["values"] == [10, 11]
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line[10:] + "\n")
+    metric(obs, "frames", [3], [13])
+    assert flush(db, spool)["metric_values"] == 2
+    doc = db.metrics.find_one({"name": "frames"})
+    assert doc["steps"] == [0, 1, 2, 3] and doc["values"] == [10, 11, 12, 13]
+    run = db.runs.find_one()
+    assert run["metrics"] == [{"id": str(doc["_id"]), "name": "frames"}]
+
+
+def test_ended_runs_leave_the_spool_and_blobs_are_pruned(db, spool, tmp_path, monkeypatch):
+    monkeypatch.setattr(result_store, "BLOB_GRACE_S", 0)
+    shared, own = tmp_path / "shared.png", tmp_path / "own.png"
+    shared.write_bytes(b"shared")
+    own.write_bytes(b"own")
+    a, b = start(spool), start(spool)
+    a.artifact_event("shared.png", str(shared))
+    a.artifact_event("own.png", str(own))
+    b.artifact_event("shared.png", str(shared))
+    a.completed_event(T0, 1)
+
+    stats = flush(db, spool)
+    assert stats["done"] == 1
+    assert spool.run_keys() == [b.key]
+    assert os.listdir(spool.blobs) == [b.run["artifacts"][0]["sha256"]]
+    assert db.runs.find_one({"spool_key": {"$exists": False}, "status": "COMPLETED"})["result"] == 1
+
+    b.failed_event(T0, ["trace"])
+    assert flush(db, spool)["done"] == 1
+    assert spool.run_keys() == [] and os.listdir(spool.blobs) == []
+    assert sorted(r["status"] for r in db.runs.find()) == ["COMPLETED", "FAILED"]
+
+
+def test_queued_run_is_recorded_then_started(db, spool):
+    obs = SpoolObserver(spool)
+    key = obs.queued_event(EX, "run", HOST, T0, {"fps": 24}, {}, "q1")
+    flush(db, spool)
+    assert db.runs.find_one()["status"] == "QUEUED"
+
+    start(spool, "q1").completed_event(T0, None)
+    assert flush(db, spool)["done"] == 1
+    run = db.runs.find_one()
+    assert key == "q1" and run["status"] == "COMPLETED" and run["queue_time"] == T0
+
+
+def test_blob_not_yet_in_run_json_survives_a_prune(db, spool, tmp_path):
+    frame = tmp_path / "frame.png"
+    frame.write_bytes(b"frame")
+    a = start(spool)
+    a.artifact_event("frame.png", str(frame))
+    a.completed_event(T0, None)
+    # another run has copied the same file in but not saved its run.json yet
+    sha = spool.add_blob(str(frame))
+    b = start(spool)
+    assert flush(db, spool)["done"] == 1
+    assert os.listdir(spool.blobs) == [sha]
+
+    b.run["artifacts"].append({"name": "frame.png", "sha256": sha, "metadata": {}, "content_type": None})
+    b.completed_event(T0, None)
+    assert flush(db, spool)["done"] == 1
+
+
+def test_one_broken_run_does_not_stop_the_others(db, spool, tmp_path):
+    gif = tmp_path / "a.gif"
+    gif.write_bytes(b"GIF89a")
+    broken, fine = start(spool, "0-broken"), start(spool, "1-fine")
+    broken.artifact_event("a.gif", str(gif))
+    os.unlink(spool.blob_path(broken.run["artifacts"][0]["sha256"]))
+    broken.completed_event(T0, None)
+    fine.completed_event(T0, None)
+    stats = flush(db, spool)
+    assert (stats["failed"], stats["done"]) == (1, 1)
+    assert spool.run_keys() == ["0-broken"]
+    assert db.runs.find_one({"status": "COMPLETED"})["_id"] is not None
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+import spans
+from spans import Span, read_spans, summarize
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_nothing_is_logged_without_a_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(spans, "SPANS_PATH", None)
+    with Span("test/off"):
+        pass
+    assert list(tmp_path.iterdir()) == []
+    assert read_spans() == [] and spans.log_size() == 0
+
+
+def test_span_records_growth_not_just_the_process_peak(tmp_path):
+    # a fresh process, since earlier tests have already raised this one's
+    # peak; Linux still hands a child the parent's peak at fork, so the big
+    # stage allocates 64 MB past whatever the peak starts at
+    log = tmp_path / "spans.jsonl"
+    script = (
+        "import numpy as np\n"
+        "from spans import Span, peak_rss_mb\n"
+        "with Span('test/small'):\n"
+        "    pass\n"
+        "with Span('test/big'):\n"
+        "    np.ones(int((peak_rss_mb() or 0) + 64) * 2**20 // 8).sum()\n"
+    )
+    env = dict(os.environ, JUBILEE_SPANS=str(log), PYTHONPATH=os.path.join(REPO_ROOT, "from_gcode"))
+    subprocess.run([sys.executable, "-c", script], env=env, check=True)
+    small, big = read_spans(str(log))
+    if small.get("process_peak_rss_mb") is None:
+        return  # no memory counters on this platform
+    assert "peak_rss_mb" not in small
+    assert small["rss_growth_mb"] < 16
+    assert big["rss_growth_mb"] > 48
+    assert big["process_peak_rss_mb"] >= small["process_peak_rss_mb"] + 48
+
+    stages = summarize([small, big, dict(big, rss_growth_mb=1.0)])
+    assert stages["test/big"]["count"] == 2
+    assert stages["test/big"]["rss_growth_mb"] == big["rss_growth_mb"]
@@ -0,0 +1,110 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import fake_bpy
+from gcodedata import parse_gcode, parse_lines
+from keyframes import INTERPOLATION, append_fcurve, write_fcurve
+from path_follower import refresh_tail
+from tail import count_complete_lines, load_checkpoint
+from toolpath import DEFAULT_PATH, append_toolpath, read_toolpath, write_toolpath
+
+CFG = {"fps": 24}
+
+
+def test_append_fills_capacity_in_place(tmp_path):
+    fn = str(tmp_path / "p.tpath")
+    rng = np.random.default_rng(1)
+    xyz = rng.random((5, 3)).astype(np.float32)
+    lines = np.arange(5)
+    write_toolpath(fn, xyz, line=lines)
+    for step in range(30):
+        more = rng.random((step % 4 + 1, 3)).astype(np.float32)
+        size = os.path.getsize(fn)
+        capacity = read_toolpath(fn).header["capacity"]
+        n = append_toolpath(fn, more, line=np.arange(len(xyz), len(xyz) + len(more)))
+        xyz = np.concatenate((xyz, more))
+        lines = np.arange(len(xyz))
+        if n <= capacity:
+            assert os.path.getsize(fn) == size
+        for mmap in (True, False):
+            tp = read_toolpath(fn, mmap=mmap)
+            assert len(tp) == n == len(xyz)
+            np.testing.assert_array_equal(tp.xyz, xyz)
+            np.testing.assert_array_equal(tp["line"], lines)
+
+
+def test_growing_rewrite_replaces_the_file(tmp_path):
+    fn = str(tmp_path / "p.tpath")
+    xyz = np.arange(12, dtype=np.float32).reshape(4, 3)
+    write_toolpath(fn, xyz)
+    before = read_toolpath(fn)
+    append_toolpath(fn, xyz + 100)
+    # a reader's memmaps keep the file they opened; no temporary file is left
+    np.testing.assert_array_equal(before.xyz, xyz)
+    assert os.listdir(tmp_path) == ["p.tpath"]
+    assert len(read_toolpath(fn)) == 8
+
+
+def test_append_fcurve_sets_only_new_keys():
+    fc = fake_bpy.FCurves()
+    write_fcurve(fc, "location", 0, np.arange(1000.0), np.arange(1000.0))
+    fake_bpy.reset()
+    append_fcurve(fc, "location", 0, np.array([999.0, 1000.0, 1001.0]), np.array([999.0, 5.0, 6.0]),
+                  np.array([INTERPOLATION["CONSTANT"], 1, 1], dtype=np.int32))
+    kps = fc.find("location", 0).keyframe_points
+    assert len(kps) == 1001 + 1
+    assert kps.co[-2:].tolist() == [[1000.0, 5.0], [1001.0, 6.0]]
+    assert kps[998].interpolation == "LINEAR" and kps[999].interpolation == "CONSTANT"
+    assert fake_bpy.calls["keyframe_points.foreach_get"] == 0
+    assert fake_bpy.calls["keyframe_points.foreach_set"] == 0
+    assert fake_bpy.calls["keyframe.set"] == 2 * 2 + 1
+
+
+def test_append_fcurve_after_a_dropped_hold():
+    fc = fake_bpy.FCurves()
+    write_fcurve(fc, "location", 1, np.array([0.0, 10.0]), np.array([0.0, 1.0]))
+    append_fcurve(fc, "location", 1, np.array([20.0, 30.0, 40.0]), np.array([1.0, 2.0, 3.0]))
+    assert fc.find("location", 1).keyframe_points.co[:, 0].tolist() == [0, 10, 20, 30, 40]
+
+
+def test_count_complete_lines_leaves_partial_line(tmp_path):
+    fn = tmp_path / "log.gcode"
+    fn.write_bytes(b"G1 X1\nG1 X2\nG1 X")
+    assert count_complete_lines(str(fn)) == (2, 12)
+    assert count_complete_lines(str(fn), 6) == (1, 12)
+
+
+def test_streamed_full_pass_then_resume(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    body = "".join(f"G1 X{i % 50} Y{(i * 7) % 30} F3000\n" for i in range(300))
+    log = tmp_path / "job.gcode"
+    log.write_text("G90\n" + body + "G1 X9")  # last line still being written
+    refresh_tail(str(log), CFG, 0.5)
+    ck = load_checkpoint(DEFAULT_PATH)
+    assert ck.line == 302 and ck.offset == len("G90\n" + body)
+
+    with open(log, "a") as f:
+        f.write(" Y9\nG91\nG1 X1\nG1 Y1\n")
+    refresh_tail(str(log), CFG, 0.5)
+    tailed = read_toolpath(DEFAULT_PATH)
+
+    os.remove(DEFAULT_PATH)
+    refresh_tail(str(log), CFG, 0.5)
+    full = read_toolpath(DEFAULT_PATH)
+    np.testing.assert_allclose(tailed.xyz[-1], full.xyz[-1])
+    assert load_checkpoint(DEFAULT_PATH).line == 306
+
+
+def test_parse_gcode_end_matches_parse_lines(tmp_path):
+    text = "G21\nG1 X1 Y2 F600\n\nG91 ; relative\nG1 X1\nG1 Z0.2\nG1 X"
+    fn = tmp_path / "a.gcode"
+    fn.write_text(text)
+    _, end = count_complete_lines(str(fn))
+    streamed = parse_gcode(str(fn), end=end, chunk_bytes=8)
+    whole = parse_lines(text[:end - 1].split("\n"))
+    for c in ("x", "y", "z", "line"):
+        np.testing.assert_array_equal(getattr(streamed, c), getattr(whole, c))
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from toolpath import ALIGN, file_sha256, read_header, read_toolpath, write_toolpath
+
+
+@pytest.fixture
+def xyz():
+    return np.random.default_rng(4).uniform(-200, 200, (1000, 3))
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip(tmp_path, xyz, mmap):
+    fn = str(tmp_path / "p.tpath")
+    write_toolpath(fn, xyz, line=np.arange(1000) * 3, fps=24, dtype="<f8")
+    tp = read_toolpath(fn, mmap=mmap)
+    assert len(tp) == 1000 and tp.fps == 24
+    np.testing.assert_array_equal(tp.xyz, xyz)
+    np.testing.assert_array_equal(tp["line"], np.arange(1000) * 3)
+    if mmap:
+        assert isinstance(tp["x"], np.memmap) and not tp["x"].flags.writeable
+
+
+def test_float32_default_and_no_line_column(tmp_path, xyz):
+    fn = str(tmp_path / "p.tpath")
+    write_toolpath(fn, xyz)
+    tp = read_toolpath(fn)
+    assert tp["x"].dtype == np.dtype("<f4")
+    assert [c["name"] for c in tp.header["columns"]] == ["x", "y", "z"]
+    np.testing.assert_allclose(tp.xyz, xyz, rtol=1e-6)
+
+
+def test_header_records_source_and_alignment(tmp_path, xyz):
+    src = tmp_path / "job.gcode"
+    src.write_text("G1 X1\n")
+    fn = str(tmp_path / "p.tpath")
+    write_toolpath(fn, xyz, source=str(src))
+    header, offset = read_header(fn)
+    assert header["source_sha256"] == file_sha256(str(src))
+    assert header["units"] == "mm" and header["axes"] == "XYZ"
+    assert offset % ALIGN == 0
+
+
+def test_empty_and_foreign_files(tmp_path):
+    fn = str(tmp_path / "p.tpath")
+    write_toolpath(fn, np.empty((0, 3)))
+    assert len(read_toolpath(fn)) == 0 and read_toolpath(fn).xyz.shape == (0, 3)
+    bad = tmp_path / "pathout.csv"
+    bad.write_text("x,y,z\n")
+    with pytest.raises(ValueError):
+        read_toolpath(str(bad))
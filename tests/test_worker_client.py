@@ -0,0 +1,106 @@
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+
+import pytest
+
+import worker_client
+from worker_client import WorkerClient, read_token, repo_script, write_token
+
+
+def test_only_repo_scripts(tmp_path):
+    assert repo_script(os.path.join(worker_client.REPO_ROOT, "animation_to_gif.py"))
+    assert not repo_script(os.path.join(worker_client.REPO_ROOT, "animation_config.json"))
+    assert not repo_script(os.path.join(worker_client.REPO_ROOT, "..", "elsewhere.py"))
+    outside = tmp_path / "evil.py"
+    outside.write_text("import os\n")
+    assert not repo_script(str(outside))
+
+
+def test_token_file_is_private(tmp_path, monkeypatch):
+    monkeypatch.setattr(worker_client, "REPO_ROOT", str(tmp_path))
+    assert read_token(7999) is None
+    write_token(7999, "abc")
+    write_token(7999, "def")
+    assert read_token(7999) == "def"
+    if os.name == "posix":
+        mode = stat.S_IMODE(os.stat(worker_client.token_path(7999)).st_mode)
+        assert mode == 0o600
+
+
+@pytest.fixture
+def fake_worker():
+    """A one-shot-per-connection server that checks the token like blender_worker."""
+    server = socket.create_server(("127.0.0.1", 0))
+    seen = []
+
+    def serve():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            with conn, conn.makefile("rwb") as stream:
+                request = json.loads(stream.readline())
+                seen.append(request)
+                ok = request.get("token") == "s3cret"
+                reply = {"ok": True, "blend": "x.blend", "pid": 1} if ok else {"ok": False, "error": "token"}
+                stream.write(json.dumps(reply).encode() + b"\n")
+                stream.flush()
+
+    threading.Thread(target=serve, daemon=True).start()
+    yield server.getsockname()[1], seen
+    server.close()
+
+
+def test_client_sends_the_token(fake_worker, tmp_path, monkeypatch):
+    monkeypatch.setattr(worker_client, "REPO_ROOT", str(tmp_path))
+    port, seen = fake_worker
+    assert WorkerClient(port, token="wrong").ping() is None
+    assert WorkerClient(port, token="s3cret").ping()["blend"] == "x.blend"
+    # a client in another process finds the token saved by start_worker()
+    write_token(port, "s3cret")
+    assert WorkerClient(port).serves("x.blend")
+    assert [r["token"] for r in seen] == ["wrong", "s3cret", "s3cret"]
+
+
+def free_port():
+    with socket.create_server(("127.0.0.1", 0)) as s:
+        return s.getsockname()[1]
+
+
+def raw_call(port, payload):
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+        sock.sendall(payload)
+        with sock.makefile("rb") as stream:
+            return json.loads(stream.readline())
+
+
+def test_worker_survives_bad_requests(monkeypatch):
+    # the accept loop only needs bpy.data.filepath; the benchmarks' stand-in has it
+    sys.path.insert(0, os.path.join(worker_client.REPO_ROOT, "benchmarks"))
+    import fake_bpy
+    monkeypatch.setitem(sys.modules, "bpy", fake_bpy)
+    monkeypatch.setenv(worker_client.TOKEN_ENV, "s3cret")
+    import blender_worker
+
+    port = free_port()
+    server = threading.Thread(target=blender_worker.serve, args=(port,), daemon=True)
+    server.start()
+    client = WorkerClient(port, token="s3cret")
+    for _ in range(50):
+        if client.ping() is not None:
+            break
+        threading.Event().wait(0.1)
+
+    assert raw_call(port, b"not json\n")["error"] == "Bad request"
+    assert raw_call(port, b"\xff\xfe\n")["error"] == "Bad request"
+    assert raw_call(port, b"[1, 2]\n")["error"] == "Bad request"
+    assert not raw_call(port, b'{"cmd": "ping"}\n')["ok"]
+    assert client.ping()["pid"] == os.getpid()
+    assert client.shutdown()["ok"]
+    server.join(5)
+    assert not server.is_alive()
@@ -0,0 +1,125 @@
+"""
+Client for blender_worker.py: send render jobs to a Blender that already has
+the .blend loaded instead of starting a new one per run.
+
+Every request carries the worker's token. start_worker() makes one, hands
+it to the worker in its environment and saves it to a file only this user
+can read (.blender_worker.<port>.token in the repo), where clients in other
+processes pick it up. The worker only runs scripts from this repository.
+
+Plain Python (no bpy); used by sacred_runner.py.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import secrets
+import subprocess
+
+HOST = "127.0.0.1"
+PORT = 7420
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+TOKEN_ENV = "JUBILEE_WORKER_TOKEN"
+
+
+def token_path(port=PORT):
+    return os.path.join(REPO_ROOT, f".blender_worker.{port}.token")
+
+
+def write_token(port, token):
+    """Save the token for port's worker, readable by this user only."""
+    path = token_path(port)
+    if os.path.exists(path):
+        os.unlink(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+
+
+def read_token(port=PORT):
+    """The token of port's worker, or None if none was saved."""
+    try:
+        with open(token_path(port), "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def repo_script(path):
+    """True if path is a .py file inside this repository (after resolving links)."""
+    real = os.path.realpath(path)
+    root = os.path.realpath(REPO_ROOT)
+    return real.endswith(".py") and os.path.commonpath([real, root]) == root and os.path.isfile(real)
+
+
+class WorkerClient:
+    """One request per connection, newline-delimited JSON.
+
+    token defaults to the one saved for port when the worker was started.
+    """
+
+    def __init__(self, port=PORT, host=HOST, token=None):
+        self.host = host
+        self.port = port
+        self.token = token
+
+    def _call(self, request, timeout=None):
+        request = dict(request, token=self.token or read_token(self.port) or "")
+        with socket.create_connection((self.host, self.port), timeout=timeout) as sock:
+            sock.settimeout(timeout)
+            with sock.makefile("rwb") as stream:
+                stream.write(json.dumps(request).encode() + b"\n")
+                stream.flush()
+                line = stream.readline()
+        if not line:
+            raise RuntimeError("Blender worker closed the connection.")
+        return json.loads(line)
+
+    def ping(self, timeout=1.0):
+        """The worker's status ({"blend": ..., "pid": ...}), or None if none is
+        listening or it refuses our token."""
+        try:
+            status = self._call({"cmd": "ping"}, timeout=timeout)
+        except OSError:
+            return None
+        return status if status.get("ok") else None
+
+    def serves(self, blend_file):
+        """True if a worker is up with blend_file loaded."""
+        status = self.ping()
+        return (status is not None and
+                os.path.normcase(os.path.abspath(status["blend"])) == os.path.normcase(os.path.abspath(blend_file)))
+
+    def run(self, script_file, args=()):
+        """Run script_file in the worker (as `-P script -- args`); returns its result."""
+        reply = self._call({"cmd": "run", "script": os.path.abspath(script_file), "args": list(args)})
+        if not reply["ok"]:
+            raise RuntimeError(f"Blender worker job failed: {reply['error']}")
+        return reply
+
+    def shutdown(self):
+        return self._call({"cmd": "shutdown"}, timeout=5.0)
+
+
+def start_worker(blender_exe, blend_file, port=PORT, log_path=None, timeout=120.0):
+    """Launch a background worker and wait until it answers; returns the Popen."""
+    worker = os.path.join(REPO_ROOT, "blender_worker.py")
+    token = secrets.token_hex(16)
+    write_token(port, token)
+    log = open(log_path or os.devnull, "w", encoding="utf-8")
+    proc = subprocess.Popen([blender_exe, "-b", blend_file, "-P", worker, "--", "--port", str(port)],
+                            stdout=log, stderr=subprocess.STDOUT, env=dict(os.environ, **{TOKEN_ENV: token}))
+    client = WorkerClient(port, token=token)
+    deadline = time.monotonic() + timeout
+    while client.ping() is None:
+        if proc.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("Blender worker did not start; see its log.")
+        time.sleep(0.2)
+    return proc
+
+
+if __name__ == "__main__":
+    # worker_client.py <blender_exe> <blend_file>: start a worker and leave it running
+    proc = start_worker(sys.argv[1], sys.argv[2], log_path="blender_worker.log")
+    print(f"[worker] Blender worker pid {proc.pid} listening on {HOST}:{PORT}")